@@ -0,0 +1,73 @@
+"""Measure peak memory and throughput of writing item exports of growing size.
+
+Synthetic HubSpot contact pages are generated one at a time and written through the
+export writer exactly as a running export does, closing a gzip member every
+EXPORT_CHUNK_ITEMS items. Peak traced memory should stay flat as --items grows.
+
+Usage (from the backend directory):
+    python benchmarks/export_memory.py --items 100000 1000000 --format csv
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config.config import config
+from src.services.hubspot_service import create_integration_item_metadata_object
+from src.utils.export_writer import ExportWriter
+
+def synthetic_pages(count: int, page_size: int):
+    for start in range(0, count, page_size):
+        yield [
+            create_integration_item_metadata_object(
+                {
+                    "id": str(100000 + i),
+                    "properties": {"firstname": f"First{i}", "lastname": f"Last{i}"},
+                    "createdAt": "2024-01-01T00:00:00.000Z",
+                    "updatedAt": f"2024-06-{1 + i % 28:02d}T12:30:00.000Z",
+                },
+                "Contact",
+            ).model_dump(mode="json")
+            for i in range(start, min(start + page_size, count))
+        ]
+
+def export(count: int, fmt: str, page_size: int, path: str):
+    writer = ExportWriter(path, fmt, config.EXPORT_COMPRESSION_LEVEL)
+    pending = chunks = 0
+    for page in synthetic_pages(count, page_size):
+        writer.write(page)
+        pending += len(page)
+        if pending >= config.EXPORT_CHUNK_ITEMS:
+            writer.end_chunk()
+            pending, chunks = 0, chunks + 1
+    if pending:
+        writer.end_chunk()
+        chunks += 1
+    writer.close()
+    return chunks
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'items':>10}{'chunks':>8}{'file MB':>10}{'seconds':>10}{'items/s':>12}{'peak MB':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for count in args.items:
+            path = os.path.join(directory, f"export-{count}.{args.format}.gz")
+            tracemalloc.start()
+            started = time.perf_counter()
+            chunks = export(count, args.format, args.page_size, path)
+            elapsed = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{count:>10}{chunks:>8}{os.path.getsize(path) / 1e6:>10.1f}{elapsed:>10.2f}{count / elapsed:>12.0f}{peak / 1e6:>10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Compare HubSpot contact crawls with default pages and with projected, adaptively sized pages.
+
+A fake contacts endpoint serves --contacts records with HubSpot's paging rules (10 records by
+default, at most 100), its default property set unless properties is given, a latency of
+--base-latency plus --record-latency per record, and rate-limit headers. Reports requests per
+10k contacts, bytes received, crawl time and the page sizes used. --slow-factor multiplies the
+latency of the second half of the portal to show page size shrinking and recovering.
+Requires the Redis server configured in .env (circuit breaker state).
+
+Usage (from the backend directory):
+    python benchmarks/hubspot_paging.py --contacts 20000 [--slow-factor 40]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from collections import Counter
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config.config import config
+from src.constants.hubspot_constants import HUBSPOT_CONSTANTS
+from src.middleware.context import VectorShiftContext
+from src.repositories.hubspot_repository import iter_hubspot_pages
+from src.utils.http_client import HttpClient
+from src.utils.page_size import AdaptivePageSize
+
+DEFAULT_PROPERTIES = ("createdate", "email", "firstname", "hs_object_id", "lastmodifieddate", "lastname")
+RATE_LIMIT_MAX = 190
+
+class FakeContacts:
+    def __init__(self, args):
+        self.args = args
+        self.requests = 0
+        self.bytes = 0
+        self.sizes = Counter()
+
+    def contact(self, index: int, properties) -> dict:
+        values = {
+            "createdate": "2024-01-01T00:00:00.000Z", "email": f"contact{index}@example.com", "firstname": f"First{index}",
+            "hs_object_id": str(index), "lastmodifieddate": "2024-06-01T12:30:00.000Z", "lastname": f"Last{index}",
+        }
+        return {
+            "id": str(index),
+            "properties": {name: values.get(name) for name in properties},
+            "createdAt": "2024-01-01T00:00:00.000Z",
+            "updatedAt": "2024-06-01T12:30:00.000Z",
+            "archived": False,
+        }
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        params = request.url.params
+        start = int(params.get("after") or 0)
+        limit = min(int(params.get("limit") or 10), 100)
+        properties = params["properties"].split(",") if "properties" in params else DEFAULT_PROPERTIES
+        end = min(start + limit, self.args.contacts)
+        latency = self.args.base_latency + self.args.record_latency * (end - start)
+        if start >= self.args.contacts // 2:
+            latency *= self.args.slow_factor
+        await asyncio.sleep(latency)
+        self.requests += 1
+        self.sizes[limit] += 1
+        body = {"results": [self.contact(index, properties) for index in range(start, end)]}
+        if end < self.args.contacts:
+            body["paging"] = {"next": {"after": str(end)}}
+        response = httpx.Response(200, json=body, headers={
+            HUBSPOT_CONSTANTS.RATE_LIMIT_MAX_HEADER: str(RATE_LIMIT_MAX),
+            HUBSPOT_CONSTANTS.RATE_LIMIT_REMAINING_HEADER: str(max(0, RATE_LIMIT_MAX - self.requests % RATE_LIMIT_MAX)),
+        })
+        self.bytes += len(response.content)
+        return response
+
+async def crawl(args, adaptive: bool) -> dict:
+    fake = FakeContacts(args)
+    HttpClient.get_instance().client = httpx.AsyncClient(transport=httpx.MockTransport(fake.handle))
+    ctx = VectorShiftContext()
+    page_size, properties = None, ()
+    if adaptive:
+        page_size = AdaptivePageSize(HUBSPOT_CONSTANTS.MIN_PAGE_SIZE, HUBSPOT_CONSTANTS.MAX_PAGE_SIZE, args.target_latency, config.HUBSPOT_RATE_LIMIT_RESERVE)
+        properties = HUBSPOT_CONSTANTS.CONTACT_PROPERTIES
+    contacts = 0
+    started = time.perf_counter()
+    async for page, _ in iter_hubspot_pages(ctx, "fake-token", HUBSPOT_CONSTANTS.CONTACTS_API_URL, None, properties, page_size):
+        contacts += len(page)
+    return {
+        "contacts": contacts,
+        "requests": fake.requests,
+        "mb": fake.bytes / 1e6,
+        "seconds": time.perf_counter() - started,
+        "sizes": ",".join(f"{size}x{count}" for size, count in sorted(fake.sizes.items())),
+    }
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--contacts", type=int, default=20000)
+    parser.add_argument("--base-latency", type=float, default=0.005)
+    parser.add_argument("--record-latency", type=float, default=0.0002)
+    parser.add_argument("--slow-factor", type=float, default=1.0)
+    parser.add_argument("--target-latency", type=float, default=config.HUBSPOT_PAGE_TARGET_LATENCY)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    print(f"{'crawl':<11}{'contacts':>10}{'requests':>10}{'req/10k':>9}{'MB':>8}{'seconds':>9}  page sizes")
+    for name, adaptive in (("default", False), ("projected", True)):
+        r = await crawl(args, adaptive)
+        print(f"{name:<11}{r['contacts']:>10}{r['requests']:>10}{r['requests'] * 10000 / r['contacts']:>9.0f}"
+              f"{r['mb']:>8.1f}{r['seconds']:>9.1f}  {r['sizes']}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,242 @@
+"""Load-test complete OAuth logins over HTTP against a local fake provider.
+
+Starts the backend (one uvicorn worker) and a fake authorization/token server in their own
+processes, points the provider's authorization, token and redirect URLs at them, then runs
+--users simulated users through the whole flow with --concurrency in flight:
+
+    POST /authorize -> GET provider /authorize (302) -> GET /oauth2callback -> POST /credentials
+
+The fake provider checks every code and PKCE verifier and can add latency or failures to
+its token endpoint. Reports logins/s, end-to-end and per-step latency percentiles, Redis
+commands per login (from the server's INFO counters, so it needs a Redis no other client
+is using) and failures by step and status. Requires the Redis server configured in .env.
+
+Usage (from the backend directory):
+    python benchmarks/oauth_load.py --provider airtable --users 5000 --concurrency 200 [--stateless]
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import logging
+import multiprocessing
+import os
+import random
+import secrets
+import sys
+import time
+from collections import Counter
+from urllib.parse import urlencode
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PROVIDERS = ("hubspot", "airtable", "notion")
+STEPS = ("authorize", "provider", "callback", "credentials")
+
+def fake_provider_app(token_latency: float, token_error_rate: float):
+    from starlette.applications import Starlette
+    from starlette.requests import Request
+    from starlette.responses import JSONResponse, PlainTextResponse, RedirectResponse
+    from starlette.routing import Route
+
+    codes = {}
+
+    async def authorize(request: Request):
+        params = request.query_params
+        if not params.get("redirect_uri") or not params.get("state"):
+            return PlainTextResponse("redirect_uri and state are required", 400)
+        code = secrets.token_urlsafe(16)
+        codes[code] = (params.get("code_challenge"), params["redirect_uri"])
+        return RedirectResponse(f"{params['redirect_uri']}?{urlencode({'code': code, 'state': params['state']})}", 302)
+
+    async def token(request: Request):
+        if request.headers.get("content-type", "").startswith("application/json"):
+            body = await request.json()
+        else:
+            body = dict(await request.form())
+        if token_latency:
+            await asyncio.sleep(token_latency)
+        if token_error_rate and random.random() < token_error_rate:
+            return JSONResponse({"error": "temporarily_unavailable"}, 500)
+        challenge, redirect_uri = codes.pop(body.get("code"), (None, None))
+        if redirect_uri is None or redirect_uri != body.get("redirect_uri"):
+            return JSONResponse({"error": "invalid_grant"}, 400)
+        if challenge:
+            digest = hashlib.sha256((body.get("code_verifier") or "").encode("utf-8")).digest()
+            if base64.urlsafe_b64encode(digest).decode("utf-8").rstrip("=") != challenge:
+                return JSONResponse({"error": "invalid_grant", "error_description": "PKCE verification failed"}, 400)
+        return JSONResponse({"access_token": secrets.token_urlsafe(24), "refresh_token": secrets.token_urlsafe(24), "expires_in": 1800})
+
+    async def token_info(request: Request):
+        return JSONResponse({"hub_id": 1, "token": request.path_params["token"]})
+
+    async def healthz(request: Request):
+        return PlainTextResponse("ok")
+
+    return Starlette(routes=[
+        Route("/authorize", authorize),
+        Route("/token", token, methods=["POST"]),
+        Route("/access-tokens/{token}", token_info),
+        Route("/healthz", healthz),
+    ])
+
+def run_fake_provider(port: int, token_latency: float, token_error_rate: float):
+    import uvicorn
+    logging.disable(logging.INFO)
+    uvicorn.run(fake_provider_app(token_latency, token_error_rate), host="127.0.0.1", port=port, log_level="warning", access_log=False)
+
+def run_backend(provider: str, port: int, provider_url: str, stateless: bool):
+    os.environ.update(HTTP_WARMUP="false", OAUTH_STATELESS_STATE="true" if stateless else "false")
+    os.environ.setdefault("OAUTH_STATE_SECRET", "benchmark-secret")
+    import uvicorn
+    from src.constants.hubspot_constants import HUBSPOT_CONSTANTS
+    from src.constants.airtable_constants import AIRTABLE_CONSTANTS
+    from src.constants.notion_constants import NOTION_CONSTANTS
+    from src.app.application import app
+    logging.disable(logging.INFO)
+
+    constants = {"hubspot": HUBSPOT_CONSTANTS, "airtable": AIRTABLE_CONSTANTS, "notion": NOTION_CONSTANTS}[provider]
+    constants.AUTHORIZATION_URL = f"{provider_url}/authorize"
+    constants.TOKEN_URL = f"{provider_url}/token"
+    constants.TOKEN_INFO_URL = f"{provider_url}/access-tokens"
+    constants.REDIRECT_URI = f"http://127.0.0.1:{port}/api/v1/integrations/{provider}/oauth2callback"
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning", access_log=False)
+
+async def wait_until_ready(url: str, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(url)).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not become ready")
+
+async def redis_commands_processed(redis_client) -> int:
+    return int((await redis_client.info("stats"))["total_commands_processed"])
+
+class LoadResult:
+    def __init__(self):
+        self.latencies = []
+        self.step_latencies = {step: [] for step in STEPS}
+        self.failures = Counter()
+
+async def login(client: httpx.AsyncClient, base_url: str, provider: str, user_id: str, org_id: str, result: LoadResult):
+    # Sent as multipart, like the browser's FormData
+    form = {"user_id": (None, user_id), "org_id": (None, org_id)}
+    api_url = f"{base_url}/api/v1/integrations/{provider}"
+    started = step_started = time.perf_counter()
+    for step in STEPS:
+        try:
+            if step == "authorize":
+                response = await client.post(f"{api_url}/authorize", files=form)
+            elif step == "provider":
+                response = await client.get(response.json()["data"]["auth_url"])
+            elif step == "callback":
+                response = await client.get(response.headers["location"])
+            else:
+                response = await client.post(f"{api_url}/credentials", files=form)
+        except (httpx.HTTPError, KeyError, ValueError) as e:
+            result.failures[(step, type(e).__name__)] += 1
+            return
+        if response.status_code != (302 if step == "provider" else 200):
+            result.failures[(step, response.status_code)] += 1
+            return
+        now = time.perf_counter()
+        result.step_latencies[step].append(now - step_started)
+        step_started = now
+    if not response.json()["data"].get("access_token"):
+        result.failures[("credentials", "no access_token")] += 1
+        return
+    result.latencies.append(time.perf_counter() - started)
+
+async def run_load(base_url: str, args) -> tuple:
+    result = LoadResult()
+    queue = asyncio.Queue()
+    for index in range(args.users):
+        queue.put_nowait(index)
+
+    async def worker(client: httpx.AsyncClient):
+        while not queue.empty():
+            index = queue.get_nowait()
+            await login(client, base_url, args.provider, f"load-user{index}", f"load-org{index % args.orgs}", result)
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(args.concurrency)))
+        return result, time.perf_counter() - started
+
+def percentile(values: list, fraction: float) -> float:
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * fraction))] * 1000
+
+def report(args, result: LoadResult, elapsed: float, redis_ops):
+    completed = len(result.latencies)
+    mode = "stateless" if args.stateless else "redis"
+    print(f"{args.provider}, {mode} state: {args.users} users, concurrency {args.concurrency}, {elapsed:.1f}s")
+    print(f"logins/s {completed / elapsed:.0f}, completed {completed}, failed {args.users - completed} "
+          f"({(args.users - completed) / args.users:.1%})")
+    if redis_ops is None:
+        print("redis commands/login n/a (the server does not report total_commands_processed)")
+    else:
+        print(f"redis commands/login {redis_ops / max(completed, 1):.1f}")
+    print(f"{'step':<13}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for name, values in [("end-to-end", result.latencies)] + list(result.step_latencies.items()):
+        values.sort()
+        print(f"{name:<13}{percentile(values, 0.5):>9.1f}{percentile(values, 0.9):>9.1f}{percentile(values, 0.99):>9.1f}{percentile(values, 1):>9.1f}")
+    for (step, reason), count in result.failures.most_common():
+        print(f"failed at {step}: {reason} x{count}")
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--provider", choices=PROVIDERS, default="airtable")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--orgs", type=int, default=100, help="users are spread over this many orgs (admission limits are per org)")
+    parser.add_argument("--stateless", action="store_true", help="run the backend with OAUTH_STATELESS_STATE=true")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="seconds the fake token endpoint waits before answering")
+    parser.add_argument("--token-error-rate", type=float, default=0.0, help="fraction of token requests the fake provider fails with 500")
+    parser.add_argument("--backend-port", type=int, default=8111)
+    parser.add_argument("--provider-port", type=int, default=8112)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    from src.config.config import config
+    import redis.asyncio as redis
+    redis_client = redis.Redis(host=config.REDIS_HOST, port=config.REDIS_PORT, password=config.REDIS_PASSWORD or None)
+
+    spawn = multiprocessing.get_context("spawn")
+    provider_url = f"http://127.0.0.1:{args.provider_port}"
+    base_url = f"http://127.0.0.1:{args.backend_port}"
+    processes = [
+        spawn.Process(target=run_fake_provider, args=(args.provider_port, args.token_latency, args.token_error_rate), daemon=True),
+        spawn.Process(target=run_backend, args=(args.provider, args.backend_port, provider_url, args.stateless), daemon=True),
+    ]
+    for process in processes:
+        process.start()
+    try:
+        await wait_until_ready(f"{provider_url}/healthz")
+        await wait_until_ready(f"{base_url}/readyz")
+        try:
+            commands_before = await redis_commands_processed(redis_client)
+        except Exception:
+            commands_before = None
+        result, elapsed = await run_load(base_url, args)
+        redis_ops = None
+        if commands_before is not None:
+            # Less the INFO call that took the first reading
+            redis_ops = await redis_commands_processed(redis_client) - commands_before - 1
+        report(args, result, elapsed, redis_ops)
+    finally:
+        await redis_client.aclose()
+        for process in processes:
+            process.terminate()
+            process.join(timeout=30)
+
+if __name__ == "__main__":
+    asyncio.run(main())
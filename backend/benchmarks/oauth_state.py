@@ -0,0 +1,93 @@
+"""Measure authorize/callback throughput with Redis-backed and stateless OAuth state.
+
+The token endpoint is replaced by an in-process fake, so the numbers isolate our own
+state handling and Redis traffic. Requires the Redis server configured in .env.
+
+Usage (from the backend directory):
+    python benchmarks/oauth_state.py --logins 2000 --concurrency 50
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from urllib.parse import urlparse, parse_qs
+import httpx
+from starlette.requests import Request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config.config import config
+from src.middleware.context import VectorShiftContext
+from src.utils.http_client import HttpClient
+from src.services import hubspot_service, airtable_service, notion_service
+
+PROVIDERS = {
+    "hubspot": (hubspot_service.authorize_hubspot, hubspot_service.oauth2callback_hubspot),
+    "airtable": (airtable_service.authorize_airtable, airtable_service.oauth2callback_airtable),
+    "notion": (notion_service.authorize_notion, notion_service.oauth2callback_notion),
+}
+
+def fake_token_endpoint(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, json={"access_token": "fake-access", "refresh_token": "fake-refresh", "expires_in": 1800})
+
+def callback_request(code: str, state: str) -> Request:
+    query = httpx.QueryParams({"code": code, "state": state})
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": [], "query_string": str(query).encode("utf-8")})
+
+async def login(provider: str, index: int) -> None:
+    authorize, callback = PROVIDERS[provider]
+    ctx = VectorShiftContext()
+    ctx.user_id, ctx.org_id = f"user{index}", "bench-org"
+    auth_url = await authorize(ctx)
+    state = parse_qs(urlparse(auth_url).query)["state"][0]
+    await callback(ctx, callback_request("fake-code", state))
+
+async def run(provider: str, logins: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    errors = 0
+
+    async def one(index: int):
+        nonlocal errors
+        async with semaphore:
+            try:
+                await login(provider, index)
+            except Exception:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(logins)))
+    return {"rate": logins / (time.perf_counter() - started), "errors": errors}
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    HttpClient.get_instance().client = httpx.AsyncClient(transport=httpx.MockTransport(fake_token_endpoint))
+    redis_client = VectorShiftContext().redis_client.client
+    execute_command = redis_client.execute_command
+    redis_ops = 0
+
+    async def counting_execute_command(*command_args, **options):
+        nonlocal redis_ops
+        redis_ops += 1
+        return await execute_command(*command_args, **options)
+
+    redis_client.execute_command = counting_execute_command
+    config.OAUTH_STATE_SECRET = config.OAUTH_STATE_SECRET or "benchmark-secret"
+
+    print(f"{'provider':<10}{'mode':<11}{'logins/s':>10}{'redis ops/login':>17}{'errors':>8}")
+    for provider in PROVIDERS:
+        for stateless in (False, True):
+            config.OAUTH_STATELESS_STATE = stateless
+            redis_ops = 0
+            result = await run(provider, args.logins, args.concurrency)
+            mode = "stateless" if stateless else "redis"
+            print(f"{provider:<10}{mode:<11}{result['rate']:>10.0f}{redis_ops / args.logins:>17.1f}{result['errors']:>8}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,107 @@
+"""Compare plain JSON item snapshots with the chunked columnar encoding.
+
+Reports stored size, encode and decode time and time-to-first-item for a synthetic
+HubSpot contact snapshot. With --redis the snapshot is also written to the Redis
+server configured in .env, reporting MEMORY USAGE and read times over the network.
+
+Usage (from the backend directory):
+    python benchmarks/snapshot_encoding.py --items 500000 [--redis]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config.config import config
+from src.services.hubspot_service import create_integration_item_metadata_object
+from src.utils.snapshot_codec import encode_chunk, decode_chunk
+from src.middleware.context import VectorShiftContext
+from src.repositories.item_snapshot_repository import store_item_snapshot, iter_item_snapshot
+
+def synthetic_items(count: int):
+    return [
+        create_integration_item_metadata_object(
+            {
+                "id": str(100000 + i),
+                "properties": {"firstname": f"First{i}", "lastname": f"Last{i}"},
+                "createdAt": "2024-01-01T00:00:00.000Z",
+                "updatedAt": f"2024-06-{1 + i % 28:02d}T12:30:00.000Z",
+            },
+            "Contact",
+        ).model_dump(mode="json")
+        for i in range(count)
+    ]
+
+def timed(run):
+    started = time.perf_counter()
+    result = run()
+    return result, time.perf_counter() - started
+
+def in_process(items):
+    size = config.SNAPSHOT_CHUNK_ITEMS
+    encoded_json, json_encode = timed(lambda: json.dumps(items).encode("utf-8"))
+    chunks, columnar_encode = timed(lambda: [
+        encode_chunk(items[start:start + size], config.SNAPSHOT_COMPRESSION_LEVEL) for start in range(0, len(items), size)
+    ])
+    _, json_decode = timed(lambda: json.loads(encoded_json))
+    _, columnar_decode = timed(lambda: [item for chunk in chunks for item in decode_chunk(chunk)])
+    _, columnar_first = timed(lambda: decode_chunk(chunks[0])[0])
+    return {
+        "json": (len(encoded_json), json_encode, json_decode, json_decode),
+        "columnar": (sum(len(chunk) for chunk in chunks), columnar_encode, columnar_decode, columnar_first),
+    }
+
+async def through_redis(items):
+    ctx = VectorShiftContext()
+    client = ctx.redis_client.client
+    json_key, columnar_key = "benchmark_snapshot:json", "benchmark_snapshot:columnar"
+
+    started = time.perf_counter()
+    await client.set(json_key, json.dumps(items), ex=600)
+    json_write = time.perf_counter() - started
+    started = time.perf_counter()
+    await store_item_snapshot(ctx, columnar_key, items, 600)
+    columnar_write = time.perf_counter() - started
+
+    started = time.perf_counter()
+    json.loads(await client.get(json_key))
+    json_read = json_first = time.perf_counter() - started
+    started = time.perf_counter()
+    columnar_first = None
+    async for chunk in iter_item_snapshot(ctx, columnar_key):
+        columnar_first = columnar_first or time.perf_counter() - started
+    columnar_read = time.perf_counter() - started
+
+    columnar_keys = [columnar_key] + [f"{columnar_key}:chunk:{chunk}" for chunk in json.loads(await client.get(columnar_key))["chunks"]]
+    json_memory = await client.memory_usage(json_key)
+    columnar_memory = sum([await client.memory_usage(key) or 0 for key in columnar_keys])
+    await client.delete(json_key, *columnar_keys)
+    await client.close()
+    return {
+        "json": (json_memory, json_write, json_read, json_first),
+        "columnar": (columnar_memory, columnar_write, columnar_read, columnar_first),
+    }
+
+def report(title: str, results: dict, size_label: str):
+    print(title)
+    print(f"{'format':<10}{size_label:>14}{'write s':>10}{'read s':>10}{'first item ms':>15}")
+    for name, (size, write, read, first) in results.items():
+        print(f"{name:<10}{size / 1e6:>14.1f}{write:>10.3f}{read:>10.3f}{first * 1000:>15.1f}")
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=100000)
+    parser.add_argument("--redis", action="store_true", help="also measure against the configured Redis server")
+    args = parser.parse_args()
+    items = synthetic_items(args.items)
+
+    report(f"in process, {args.items} items", in_process(items), "size MB")
+    if args.redis:
+        report(f"\nthrough Redis, {args.items} items", await through_redis(items), "memory MB")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,96 @@
+"""Send locally generated, correctly signed webhook deliveries to a running backend.
+
+Useful for exercising the webhook path end to end and for measuring how fast the
+handlers accept bursts. Signing secrets are read from the same .env as the server.
+
+Usage (from the backend directory, with the server running):
+    python benchmarks/webhook_ingest.py --provider hubspot --deliveries 1000 --events 50 --account 12345
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import os
+import random
+import sys
+import time
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config.config import config
+
+def hubspot_delivery(url: str, account: str, events: int):
+    now = int(time.time() * 1000)
+    body = json.dumps([
+        {
+            "objectId": random.randint(1, 100000),
+            "subscriptionType": random.choice(["contact.creation", "contact.propertyChange", "contact.deletion"]),
+            "portalId": int(account),
+            "occurredAt": now + i,
+        }
+        for i in range(events)
+    ]).encode("utf-8")
+    timestamp = str(now)
+    message = b"POST" + url.encode("utf-8") + body + timestamp.encode("utf-8")
+    signature = base64.b64encode(hmac.new(config.HUBSPOT_CLIENT_SECRET.encode("utf-8"), message, hashlib.sha256).digest()).decode("utf-8")
+    return body, {"X-HubSpot-Signature-v3": signature, "X-HubSpot-Request-Timestamp": timestamp, "Content-Type": "application/json"}
+
+def notion_delivery(url: str, account: str, events: int):
+    body = json.dumps({
+        "id": f"evt-{random.randint(1, 10**9)}",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "workspace_id": account,
+        "type": random.choice(["page.created", "page.properties_updated", "page.deleted"]),
+        "entity": {"id": f"page-{random.randint(1, 100000)}", "type": "page"},
+    }).encode("utf-8")
+    signature = "sha256=" + hmac.new(config.NOTION_WEBHOOK_VERIFICATION_TOKEN.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    return body, {"X-Notion-Signature": signature, "Content-Type": "application/json"}
+
+def airtable_delivery(url: str, account: str, events: int):
+    body = json.dumps({"base": {"id": account}, "webhook": {"id": "achBenchmark"}, "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())}).encode("utf-8")
+    signature = "hmac-sha256=" + hmac.new(base64.b64decode(config.AIRTABLE_WEBHOOK_MAC_SECRET), body, hashlib.sha256).hexdigest()
+    return body, {"X-Airtable-Content-MAC": signature, "Content-Type": "application/json"}
+
+BUILDERS = {"hubspot": hubspot_delivery, "notion": notion_delivery, "airtable": airtable_delivery}
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--base-url", default=f"http://localhost:{config.APP_PORT}")
+    parser.add_argument("--provider", choices=sorted(BUILDERS), default="hubspot")
+    parser.add_argument("--account", default="12345", help="portal id, workspace id or base id")
+    parser.add_argument("--deliveries", type=int, default=1000)
+    parser.add_argument("--events", type=int, default=50, help="events per HubSpot delivery")
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    path = f"/api/v1/integrations/{args.provider}/webhook"
+    url = f"{args.base_url}{path}"
+    # The backend checks HubSpot signatures against the URL under PUBLIC_BASE_URL, not the one it was reached on
+    signed_url = f"{config.PUBLIC_BASE_URL.rstrip('/')}{path}"
+    semaphore = asyncio.Semaphore(args.concurrency)
+    statuses = {}
+    latencies = []
+
+    async def send(client: httpx.AsyncClient):
+        body, headers = BUILDERS[args.provider](signed_url, args.account, args.events)
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post(url, content=body, headers=headers)
+            latencies.append(time.perf_counter() - started)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    async with httpx.AsyncClient(timeout=30) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(send(client) for _ in range(args.deliveries)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(f"deliveries/s: {args.deliveries / elapsed:.0f}")
+    print(f"p50 ms: {latencies[len(latencies) // 2] * 1000:.2f}  p99 ms: {latencies[int(len(latencies) * 0.99) - 1] * 1000:.2f}")
+    print(f"status codes: {statuses}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
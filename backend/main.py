@@ -1,6 +1,38 @@
-from src.app.application import app
+import argparse
+import importlib.util
 from src.config.config import config
 
+def _has_module(name: str) -> bool:
+    return importlib.util.find_spec(name) is not None
+
+def server_options(mode: str, host: str = None, port: int = None, workers: int = None) -> dict:
+    """Build the uvicorn options for the development or production server."""
+    if mode == "dev":
+        return {
+            "host": host or "localhost",
+            "port": port or config.APP_PORT,
+            "reload": True,
+        }
+    return {
+        "host": host or config.APP_HOST,
+        "port": port or config.APP_PORT,
+        "workers": workers or config.WORKERS,
+        "loop": "uvloop" if _has_module("uvloop") else "asyncio",
+        "http": "httptools" if _has_module("httptools") else "h11",
+        "timeout_graceful_shutdown": config.GRACEFUL_SHUTDOWN_TIMEOUT,
+        "access_log": False,
+        "proxy_headers": True,
+    }
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the VectorShift backend")
+    parser.add_argument("--mode", choices=["dev", "prod"], default="prod" if config.APP_ENV == "production" else "dev")
+    parser.add_argument("--host", default=None)
+    parser.add_argument("--port", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("src.app.application:app", host="localhost", port=config.APP_PORT, reload=True)
\ No newline at end of file
+    args = parse_args()
+    uvicorn.run("src.app.application:app", **server_options(args.mode, args.host, args.port, args.workers))
\ No newline at end of file
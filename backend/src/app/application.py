@@ -1,16 +1,69 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse, PlainTextResponse
 from .routes import map_urls
+from .lifecycle import server_state
 from ..middleware.context import VectorShiftContextMiddleware
+from ..utils.response import MSResponse, return_error, return_success
+from ..utils.admission import AdmissionRejectedError
+from ..utils.circuit_breaker import refresh_breaker_metrics
+from ..services.webhook_service import webhook_processor
+from ..services.item_feed_service import item_feed
+from ..services.export_service import export_runner
+from ..utils.transform_pool import shutdown_pool
+from ..oplog.metrics import metrics
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await server_state.warm_up()
+    server_state.install_signal_handlers()
+    # Open change streams would otherwise hold the drain for its full timeout
+    server_state.on_drain(item_feed.stop)
+    webhook_processor.start()
+    yield
+    # In-flight requests were drained from the signal handler, before uvicorn closed the listener
+    server_state.ready = False
+    await item_feed.stop()
+    await webhook_processor.stop()
+    await export_runner.stop()
+    shutdown_pool()
+    await server_state.close()
+
+app = FastAPI(lifespan=lifespan)
+
+# Shed load with 503 + Retry-After when admission queues are full
+@app.exception_handler(AdmissionRejectedError)
+async def admission_rejected(request: Request, exc: AdmissionRejectedError):
+    return JSONResponse(
+        MSResponse(success=False, data=None, errors=[str(exc)]).model_dump(),
+        status_code=503,
+        headers={"Retry-After": str(exc.retry_after)},
+    )
 
 # Optional: Add a root route
 @app.get("/")
 async def read_root():
     return {"message": "Welcome to VectorShift Backend API. Use /api/v1/integrations/... for endpoints."}
 
+# Liveness and readiness probes
+@app.get("/healthz")
+async def liveness(response: Response):
+    return return_success(response, {"status": "alive"})
+
+@app.get("/readyz")
+async def readiness(response: Response):
+    if not server_state.ready or server_state.draining:
+        return return_error(response, ["draining" if server_state.draining else "warming up"], 503)
+    return return_success(response, {"status": "ready", "in_flight": server_state.in_flight})
+
+# Prometheus-style metrics for this worker
+@app.get("/metrics", response_class=PlainTextResponse)
+async def read_metrics():
+    await refresh_breaker_metrics()
+    return metrics.render()
+
 # Register middleware
-app.add_middleware(VectorShiftContextMiddleware)  
+app.add_middleware(VectorShiftContextMiddleware, server_state=server_state)  
 
 # Register routes
 map_urls(app)
\ No newline at end of file
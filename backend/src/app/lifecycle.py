@@ -0,0 +1,106 @@
+import asyncio
+import functools
+import signal
+import threading
+import time
+from ..config.config import config
+from ..db.connection import RedisClient
+from ..utils.http_client import HttpClient
+from ..oplog.oplog import info, error
+
+# Upstream hosts whose connection pools are opened before the worker reports ready
+WARMUP_URLS = [
+    "https://api.hubapi.com",
+    "https://api.airtable.com",
+    "https://api.notion.com",
+]
+
+class ServerState:
+    """Per-worker readiness and in-flight request tracking used by the probes and graceful drain."""
+
+    def __init__(self):
+        self.ready = False
+        self.draining = False
+        self.in_flight = 0
+        self._drain_task = None
+        self._drain_callbacks = []
+
+    async def warm_up(self):
+        """Open Redis and upstream HTTP connections, then mark the worker ready."""
+        redis_client = RedisClient.get_instance()
+        try:
+            await asyncio.gather(*(redis_client.ping() for _ in range(config.REDIS_WARMUP_CONNECTIONS)))
+        except Exception as e:
+            error(f"Redis warm-up failed: {str(e)}")
+        await redis_client.start_invalidation_listener()
+        if config.HTTP_WARMUP:
+            await HttpClient.get_instance().warm_up(WARMUP_URLS)
+        self.ready = True
+        info("Worker warmed up and ready")
+
+    def on_drain(self, callback):
+        """Register a coroutine function run once probes have seen the worker draining, e.g. to end open streams."""
+        self._drain_callbacks.append(callback)
+
+    def install_signal_handlers(self):
+        """Drain on SIGTERM/SIGINT before passing the signal on to uvicorn.
+
+        uvicorn closes the listener as soon as it sees the signal and only runs the lifespan
+        shutdown after its own graceful timeout, when nothing is left to drain. Wrapping its
+        handlers keeps the worker serving, with /readyz answering 503, until the drain is done.
+        """
+        if threading.current_thread() is not threading.main_thread():
+            return
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            previous = signal.getsignal(sig)
+            if callable(previous):
+                signal.signal(sig, functools.partial(self._handle_exit, loop, previous))
+
+    def _handle_exit(self, loop, previous, sig, frame):
+        if self.draining:
+            # A second signal skips the rest of the drain
+            previous(sig, frame)
+            return
+        self.ready = False
+        self.draining = True
+        loop.call_soon_threadsafe(self._start_drain, previous, sig, frame)
+
+    def _start_drain(self, previous, sig, frame):
+        self._drain_task = asyncio.get_running_loop().create_task(self._drain_then_exit(previous, sig, frame))
+
+    async def _drain_then_exit(self, previous, sig, frame):
+        try:
+            await self.drain()
+        finally:
+            previous(sig, frame)
+
+    async def drain(self, timeout: float = None):
+        """Stop reporting ready, keep serving for DRAIN_READINESS_DELAY so probes notice, then wait for in-flight requests.
+
+        Drain callbacks run after the delay, when load balancers no longer route new streams here.
+        """
+        timeout = config.GRACEFUL_SHUTDOWN_TIMEOUT if timeout is None else timeout
+        self.ready = False
+        self.draining = True
+        info(f"Draining: not ready, {self.in_flight} requests in flight")
+        await asyncio.sleep(config.DRAIN_READINESS_DELAY)
+        for callback in self._drain_callbacks:
+            try:
+                await callback()
+            except Exception as e:
+                error(f"Drain callback failed: {str(e)}")
+        deadline = time.monotonic() + timeout
+        while self.in_flight and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+        if self.in_flight:
+            error(f"Shutting down with {self.in_flight} requests still in flight")
+        else:
+            info("All in-flight requests drained")
+
+    async def close(self):
+        """Release the Redis and HTTP pools once nothing else needs them."""
+        await HttpClient.get_instance().close()
+        await RedisClient.get_instance().close()
+
+server_state = ServerState()
\ No newline at end of file
@@ -1,6 +1,8 @@
-from fastapi import APIRouter, Request, Response, Form, HTTPException
+from fastapi import APIRouter, Request, Response, Form, Header, HTTPException
 from fastapi.responses import HTMLResponse
 from ..middleware.context import VectorShiftContext
+from ..utils.admission import admit
+from ..utils.deadline import DEADLINE_HEADER
 from ..controllers.hubspot_controller import (
     authorize_hubspot,
     oauth2callback_hubspot,
@@ -18,7 +20,16 @@ from ..controllers.notion_controller import (
     oauth2callback_notion,
     get_notion_credentials,
     get_items_notion,
+    crawl_notion_content,
 )
+from ..controllers.webhook_controller import (
+    receive_hubspot_webhook,
+    receive_airtable_webhook,
+    receive_notion_webhook,
+)
+from ..controllers.feed_controller import stream_item_changes
+from ..controllers.profile_controller import get_profiles, download_profile, get_traces, download_trace
+from ..controllers.export_controller import start_export, resume_export, get_export_status, download_export
 import json
 
 router = APIRouter(prefix="/api/v1")
@@ -27,12 +38,14 @@ router = APIRouter(prefix="/api/v1")
 @router.post("/integrations/hubspot/authorize")
 async def hubspot_authorize(user_id: str = Form(...), org_id: str = Form(...), response: Response = None):
     ctx = await VectorShiftContext.get(user_id=user_id, org_id=org_id)
-    return await authorize_hubspot(ctx, response)
+    async with admit(org_id):
+        return await authorize_hubspot(ctx, response)
 
 @router.get("/integrations/hubspot/oauth2callback")
 async def hubspot_oauth2callback(request: Request, response: Response = None):
     ctx = await VectorShiftContext.get(request=request)
-    return await oauth2callback_hubspot(ctx, request, response)
+    async with admit():
+        return await oauth2callback_hubspot(ctx, request, response)
 
 @router.post("/integrations/hubspot/credentials")
 async def hubspot_credentials(user_id: str = Form(...), org_id: str = Form(...), response: Response = None):
@@ -40,24 +53,28 @@ async def hubspot_credentials(user_id: str = Form(...), org_id: str = Form(...),
     return await get_hubspot_credentials(ctx, response)
 
 @router.post("/integrations/hubspot/items")
-async def hubspot_items(credentials: str = Form(...), response: Response = None):
-    ctx = await VectorShiftContext.get()
+async def hubspot_items(credentials: str = Form(...), user_id: str = Form(None), org_id: str = Form(None), cursor: str = Form(None), timeout: float = Header(None, alias=DEADLINE_HEADER), response: Response = None):
+    ctx = await VectorShiftContext.get(user_id=user_id, org_id=org_id)
+    ctx.set_deadline(timeout)
     try:
         credentials_data = json.loads(credentials)
     except json.JSONDecodeError:
         raise HTTPException(status_code=400, detail="Invalid credentials format")
-    return await get_hubspot_items(ctx, credentials_data, response)
+    async with admit(org_id):
+        return await get_hubspot_items(ctx, credentials_data, response, cursor)
 
 # Airtable Routes
 @router.post("/integrations/airtable/authorize")
 async def airtable_authorize(user_id: str = Form(...), org_id: str = Form(...), response: Response = None):
     ctx = await VectorShiftContext.get(user_id=user_id, org_id=org_id)
-    return await authorize_airtable(ctx, response)
+    async with admit(org_id):
+        return await authorize_airtable(ctx, response)
 
 @router.get("/integrations/airtable/oauth2callback")
 async def airtable_oauth2callback(request: Request, response: Response = None):
     ctx = await VectorShiftContext.get(request=request)
-    return await oauth2callback_airtable(ctx, request, response)
+    async with admit():
+        return await oauth2callback_airtable(ctx, request, response)
 
 @router.post("/integrations/airtable/credentials")
 async def airtable_credentials(user_id: str = Form(...), org_id: str = Form(...), response: Response = None):
@@ -65,24 +82,28 @@ async def airtable_credentials(user_id: str = Form(...), org_id: str = Form(...)
     return await get_airtable_credentials(ctx, response)
 
 @router.post("/integrations/airtable/items")
-async def airtable_items(credentials: str = Form(...), response: Response = None):
-    ctx = await VectorShiftContext.get()
+async def airtable_items(credentials: str = Form(...), user_id: str = Form(None), org_id: str = Form(None), cursor: str = Form(None), refresh: bool = Form(False), timeout: float = Header(None, alias=DEADLINE_HEADER), response: Response = None):
+    ctx = await VectorShiftContext.get(user_id=user_id, org_id=org_id)
+    ctx.set_deadline(timeout)
     try:
         credentials_data = json.loads(credentials)
     except json.JSONDecodeError:
         raise HTTPException(status_code=400, detail="Invalid credentials format")
-    return await get_items_airtable(ctx, credentials_data, response)
+    async with admit(org_id):
+        return await get_items_airtable(ctx, credentials_data, response, cursor, refresh)
 
 # Notion Routes
 @router.post("/integrations/notion/authorize")
 async def notion_authorize(user_id: str = Form(...), org_id: str = Form(...), response: Response = None):
     ctx = await VectorShiftContext.get(user_id=user_id, org_id=org_id)
-    return await authorize_notion(ctx, response)
+    async with admit(org_id):
+        return await authorize_notion(ctx, response)
 
 @router.get("/integrations/notion/oauth2callback")
 async def notion_oauth2callback(request: Request, response: Response = None):
     ctx = await VectorShiftContext.get(request=request)
-    return await oauth2callback_notion(ctx, request, response)
+    async with admit():
+        return await oauth2callback_notion(ctx, request, response)
 
 @router.post("/integrations/notion/credentials")
 async def notion_credentials(user_id: str = Form(...), org_id: str = Form(...), response: Response = None):
@@ -90,13 +111,92 @@ async def notion_credentials(user_id: str = Form(...), org_id: str = Form(...),
     return await get_notion_credentials(ctx, response)
 
 @router.post("/integrations/notion/items")
-async def notion_items(credentials: str = Form(...), response: Response = None):
-    ctx = await VectorShiftContext.get()
+async def notion_items(credentials: str = Form(...), user_id: str = Form(None), org_id: str = Form(None), cursor: str = Form(None), timeout: float = Header(None, alias=DEADLINE_HEADER), response: Response = None):
+    ctx = await VectorShiftContext.get(user_id=user_id, org_id=org_id)
+    ctx.set_deadline(timeout)
+    try:
+        credentials_data = json.loads(credentials)
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid credentials format")
+    async with admit(org_id):
+        return await get_items_notion(ctx, credentials_data, response, cursor)
+
+@router.post("/integrations/notion/content")
+async def notion_content(credentials: str = Form(...), user_id: str = Form(None), org_id: str = Form(None), page_ids: str = Form(None), force: bool = Form(False), response: Response = None):
+    ctx = await VectorShiftContext.get(user_id=user_id, org_id=org_id)
     try:
         credentials_data = json.loads(credentials)
     except json.JSONDecodeError:
         raise HTTPException(status_code=400, detail="Invalid credentials format")
-    return await get_items_notion(ctx, credentials_data, response)
+    # The controller holds the slot until the streamed crawl finishes
+    return await crawl_notion_content(ctx, credentials_data, response, page_ids.split(",") if page_ids else None, force, admit(org_id))
+
+# Webhook Routes
+@router.post("/integrations/hubspot/webhook")
+async def hubspot_webhook(request: Request, response: Response = None):
+    return await receive_hubspot_webhook(request, response)
+
+@router.post("/integrations/airtable/webhook")
+async def airtable_webhook(request: Request, response: Response = None):
+    return await receive_airtable_webhook(request, response)
+
+@router.post("/integrations/notion/webhook")
+async def notion_webhook(request: Request, response: Response = None):
+    return await receive_notion_webhook(request, response)
+
+# Change Feed Routes
+@router.get("/integrations/items/changes")
+async def items_changes(request: Request, user_id: str, org_id: str, last_event_id: str = None, response: Response = None):
+    ctx = await VectorShiftContext.get(user_id=user_id, org_id=org_id)
+    return await stream_item_changes(ctx, request, response, last_event_id)
+
+# Export Routes
+@router.post("/integrations/{provider}/exports")
+async def exports_start(provider: str, credentials: str = Form(...), user_id: str = Form(...), org_id: str = Form(...), format: str = Form("ndjson"), response: Response = None):
+    ctx = await VectorShiftContext.get(user_id=user_id, org_id=org_id)
+    try:
+        credentials_data = json.loads(credentials)
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid credentials format")
+    async with admit(org_id):
+        return await start_export(ctx, provider, format, credentials_data, response)
+
+@router.post("/integrations/exports/{export_id}/resume")
+async def exports_resume(export_id: str, credentials: str = Form(...), user_id: str = Form(...), org_id: str = Form(...), response: Response = None):
+    ctx = await VectorShiftContext.get(user_id=user_id, org_id=org_id)
+    try:
+        credentials_data = json.loads(credentials)
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid credentials format")
+    async with admit(org_id):
+        return await resume_export(ctx, export_id, credentials_data, response)
+
+@router.get("/integrations/exports/{export_id}")
+async def exports_status(export_id: str, user_id: str, org_id: str, response: Response = None):
+    ctx = await VectorShiftContext.get(user_id=user_id, org_id=org_id)
+    return await get_export_status(ctx, export_id, response)
+
+@router.get("/integrations/exports/{export_id}/download")
+async def exports_download(request: Request, export_id: str, user_id: str, org_id: str, response: Response = None):
+    ctx = await VectorShiftContext.get(user_id=user_id, org_id=org_id)
+    return await download_export(ctx, export_id, request, response)
+
+# Profiling and Tracing Routes
+@router.get("/profiles")
+async def profiles_list(request: Request, response: Response = None):
+    return await get_profiles(request, response)
+
+@router.get("/profiles/{profile_id}")
+async def profiles_download(request: Request, profile_id: str, response: Response = None):
+    return await download_profile(request, response, profile_id)
+
+@router.get("/traces")
+async def traces_list(request: Request, response: Response = None):
+    return await get_traces(request, response)
+
+@router.get("/traces/{trace_id}")
+async def traces_download(request: Request, trace_id: str, response: Response = None):
+    return await download_trace(request, response, trace_id)
 
 def map_urls(app):
     """Register all routes with the FastAPI application."""
@@ -4,10 +4,77 @@ from dotenv import load_dotenv
 load_dotenv()
 
 class Config:
+    APP_ENV = os.getenv("APP_ENV", "development")
+    APP_HOST = os.getenv("APP_HOST", "localhost")
     APP_PORT = int(os.getenv("APP_PORT", 8000))
+    WORKERS = int(os.getenv("WORKERS", os.cpu_count() or 1))
+    GRACEFUL_SHUTDOWN_TIMEOUT = int(os.getenv("GRACEFUL_SHUTDOWN_TIMEOUT", 30))
+    DRAIN_READINESS_DELAY = float(os.getenv("DRAIN_READINESS_DELAY", 5))
     REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
     REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
     REDIS_PASSWORD = os.getenv("REDIS_PASSWORD", "")
+    REDIS_WARMUP_CONNECTIONS = int(os.getenv("REDIS_WARMUP_CONNECTIONS", 4))
+    L1_CACHE_ENABLED = os.getenv("L1_CACHE_ENABLED", "false").lower() == "true"
+    L1_CACHE_MAX_ENTRIES = int(os.getenv("L1_CACHE_MAX_ENTRIES", 10000))
+    L1_CACHE_MAX_BYTES = int(os.getenv("L1_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+    L1_CACHE_TTL = float(os.getenv("L1_CACHE_TTL", 5))
+    TRANSFORM_POOL_WORKERS = int(os.getenv("TRANSFORM_POOL_WORKERS", 0))
+    TRANSFORM_OFFLOAD_THRESHOLD = int(os.getenv("TRANSFORM_OFFLOAD_THRESHOLD", 500))
+    TRANSFORM_CHUNK_SIZE = int(os.getenv("TRANSFORM_CHUNK_SIZE", 1000))
+    TRANSFORM_MAX_PENDING_PAGES = int(os.getenv("TRANSFORM_MAX_PENDING_PAGES", 4))
+    FEED_MAX_EVENTS = int(os.getenv("FEED_MAX_EVENTS", 1000))
+    FEED_EVENT_MAX_ITEMS = int(os.getenv("FEED_EVENT_MAX_ITEMS", 200))
+    FEED_HEARTBEAT_INTERVAL = float(os.getenv("FEED_HEARTBEAT_INTERVAL", 15))
+    FEED_SUBSCRIBER_QUEUE_SIZE = int(os.getenv("FEED_SUBSCRIBER_QUEUE_SIZE", 100))
+    FEED_MAX_SUBSCRIBERS = int(os.getenv("FEED_MAX_SUBSCRIBERS", 1000))
+    PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+    PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0))
+    PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", 5))
+    PROFILE_STORAGE = os.getenv("PROFILE_STORAGE", "redis")
+    PROFILE_DIR = os.getenv("PROFILE_DIR", "/tmp/vectorshift-profiles")
+    PROFILE_TTL = int(os.getenv("PROFILE_TTL", 86400))
+    TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", 0))
+    TRACE_MAX_SPANS = int(os.getenv("TRACE_MAX_SPANS", 10000))
+    HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", 100))
+    HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", 20))
+    HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", 5))
+    HTTP_WARMUP = os.getenv("HTTP_WARMUP", "true").lower() == "true"
+    REQUEST_DEADLINE = float(os.getenv("REQUEST_DEADLINE", 0))
+    REQUEST_DEADLINE_RESERVE = float(os.getenv("REQUEST_DEADLINE_RESERVE", 0.5))
+    CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", 5))
+    CIRCUIT_RESET_TIMEOUT = int(os.getenv("CIRCUIT_RESET_TIMEOUT", 30))
+    CIRCUIT_STATE_TTL = float(os.getenv("CIRCUIT_STATE_TTL", 1))
+    ITEMS_SNAPSHOT_EXPIRE_TIME = int(os.getenv("ITEMS_SNAPSHOT_EXPIRE_TIME", 86400))
+    AIRTABLE_SCHEMA_MAX_AGE = int(os.getenv("AIRTABLE_SCHEMA_MAX_AGE", 3600))
+    HUBSPOT_PAGE_TARGET_LATENCY = float(os.getenv("HUBSPOT_PAGE_TARGET_LATENCY", 2))
+    HUBSPOT_RATE_LIMIT_RESERVE = float(os.getenv("HUBSPOT_RATE_LIMIT_RESERVE", 0.2))
+    NOTION_RATE_LIMIT = float(os.getenv("NOTION_RATE_LIMIT", 3))
+    NOTION_CRAWL_WORKERS = int(os.getenv("NOTION_CRAWL_WORKERS", 3))
+    NOTION_CRAWL_MAX_DEPTH = int(os.getenv("NOTION_CRAWL_MAX_DEPTH", 5))
+    NOTION_CRAWL_MAX_BLOCKS = int(os.getenv("NOTION_CRAWL_MAX_BLOCKS", 2000))
+    SNAPSHOT_CHUNK_ITEMS = int(os.getenv("SNAPSHOT_CHUNK_ITEMS", 5000))
+    SNAPSHOT_COMPRESSION_LEVEL = int(os.getenv("SNAPSHOT_COMPRESSION_LEVEL", 6))
+    SNAPSHOT_CHUNK_GRACE = int(os.getenv("SNAPSHOT_CHUNK_GRACE", 60))
+    EXPORT_DIR = os.getenv("EXPORT_DIR", "/tmp/vectorshift-exports")
+    EXPORT_CHUNK_ITEMS = int(os.getenv("EXPORT_CHUNK_ITEMS", 10000))
+    EXPORT_COMPRESSION_LEVEL = int(os.getenv("EXPORT_COMPRESSION_LEVEL", 6))
+    EXPORT_TTL = int(os.getenv("EXPORT_TTL", 86400))
+    EXPORT_MAX_RUNNING = int(os.getenv("EXPORT_MAX_RUNNING", 4))
+    EXPORT_STALE_AFTER = int(os.getenv("EXPORT_STALE_AFTER", 300))
+    ADMISSION_GLOBAL_LIMIT = int(os.getenv("ADMISSION_GLOBAL_LIMIT", 200))
+    ADMISSION_ORG_LIMIT = int(os.getenv("ADMISSION_ORG_LIMIT", 10))
+    ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", 100))
+    ADMISSION_MAX_WAIT = float(os.getenv("ADMISSION_MAX_WAIT", 10))
+    ADMISSION_LEASE_TTL = int(os.getenv("ADMISSION_LEASE_TTL", 60))
+    WEBHOOK_QUEUE_SIZE = int(os.getenv("WEBHOOK_QUEUE_SIZE", 10000))
+    WEBHOOK_BATCH_SIZE = int(os.getenv("WEBHOOK_BATCH_SIZE", 500))
+    WEBHOOK_BATCH_WINDOW = float(os.getenv("WEBHOOK_BATCH_WINDOW", 0.5))
+    WEBHOOK_MAX_AGE = int(os.getenv("WEBHOOK_MAX_AGE", 300))
+    PUBLIC_BASE_URL = os.getenv("PUBLIC_BASE_URL", "http://localhost:8000")
+    NOTION_WEBHOOK_VERIFICATION_TOKEN = os.getenv("NOTION_WEBHOOK_VERIFICATION_TOKEN", "")
+    AIRTABLE_WEBHOOK_MAC_SECRET = os.getenv("AIRTABLE_WEBHOOK_MAC_SECRET", "")
+    OAUTH_STATELESS_STATE = os.getenv("OAUTH_STATELESS_STATE", "false").lower() == "true"
+    OAUTH_STATE_SECRET = os.getenv("OAUTH_STATE_SECRET", "")
     HUBSPOT_CLIENT_ID = os.getenv("HUBSPOT_CLIENT_ID", "XXX")
     HUBSPOT_CLIENT_SECRET = os.getenv("HUBSPOT_CLIENT_SECRET", "XXX")
     AIRTABLE_CLIENT_ID = os.getenv("AIRTABLE_CLIENT_ID", "XXX")
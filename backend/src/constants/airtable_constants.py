@@ -7,6 +7,7 @@ class AirtableConstants:
     
     # API Endpoints
     BASES_API_URL = "https://api.airtable.com/v0/meta/bases"
+    WEBHOOK_PAYLOADS_URL = "https://api.airtable.com/v0/bases/{base_id}/webhooks/{webhook_id}/payloads"
     
     # OAuth Parameters
     REDIRECT_URI = "http://localhost:8000/api/v1/integrations/airtable/oauth2callback"
@@ -17,10 +18,20 @@ class AirtableConstants:
     STATE_KEY_PREFIX = "airtable_state"
     VERIFIER_KEY_PREFIX = "airtable_verifier"
     CREDENTIALS_KEY_PREFIX = "airtable_credentials"
+    NONCE_KEY_PREFIX = "airtable_oauth_nonce"
+    ITEMS_KEY_PREFIX = "airtable_items"
+    WEBHOOK_INDEX_PREFIX = "airtable_webhook_index"
+    WEBHOOK_TOKEN_PREFIX = "airtable_webhook_token"
+    WEBHOOK_CURSOR_PREFIX = "airtable_webhook_cursor"
+    SCHEMA_KEY_PREFIX = "airtable_schema"
+    SCHEMA_VERSION_PREFIX = "airtable_schema_version"
     
     # Expiration Time (in seconds)
     REDIS_EXPIRE_TIME = 600
     
+    # Webhooks
+    WEBHOOK_SIGNATURE_HEADER = "X-Airtable-Content-MAC"
+    
     # HTTP Headers
     CONTENT_TYPE = "application/x-www-form-urlencoded"
     AUTH_HEADER = "Basic"
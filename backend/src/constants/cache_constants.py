@@ -0,0 +1,25 @@
+from typing import Dict
+from .hubspot_constants import HUBSPOT_CONSTANTS
+from .airtable_constants import AIRTABLE_CONSTANTS
+from .notion_constants import NOTION_CONSTANTS
+from .profile_constants import PROFILE_CONSTANTS
+from .export_constants import EXPORT_CONSTANTS
+
+class CacheConstants:
+    # Pub/sub channel carrying keys whose local copies must be dropped on every worker
+    INVALIDATION_CHANNEL = "l1_cache_invalidation"
+    
+    # Local cache TTL (in seconds) per Redis key prefix; 0 bypasses the local cache.
+    # Single-use keys are read once and deleted, so caching them only wastes memory.
+    PREFIX_TTLS: Dict[str, float] = {
+        prefix: 0
+        for constants in (HUBSPOT_CONSTANTS, AIRTABLE_CONSTANTS, NOTION_CONSTANTS)
+        for prefix in (constants.STATE_KEY_PREFIX, constants.VERIFIER_KEY_PREFIX, constants.CREDENTIALS_KEY_PREFIX, constants.NONCE_KEY_PREFIX)
+    }
+    PREFIX_TTLS[AIRTABLE_CONSTANTS.WEBHOOK_CURSOR_PREFIX] = 0
+    PREFIX_TTLS[PROFILE_CONSTANTS.PROFILE_KEY_PREFIX] = 0
+    PREFIX_TTLS[PROFILE_CONSTANTS.TRACE_KEY_PREFIX] = 0
+    PREFIX_TTLS[EXPORT_CONSTANTS.EXPORT_KEY_PREFIX] = 0
+
+# Export the constants class for use
+CACHE_CONSTANTS = CacheConstants()
\ No newline at end of file
@@ -0,0 +1,18 @@
+class ExportConstants:
+    # Redis key prefix of export manifests
+    EXPORT_KEY_PREFIX = "item_export"
+    
+    # Format -> file extension inside the .gz
+    FORMATS = {
+        "ndjson": "ndjson",
+        "csv": "csv",
+    }
+    
+    # Export statuses; interrupted and failed exports can be resumed
+    RUNNING = "running"
+    COMPLETED = "completed"
+    INTERRUPTED = "interrupted"
+    FAILED = "failed"
+
+# Export the constants class for use
+EXPORT_CONSTANTS = ExportConstants()
\ No newline at end of file
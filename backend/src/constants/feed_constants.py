@@ -0,0 +1,25 @@
+from typing import Dict
+from .hubspot_constants import HUBSPOT_CONSTANTS
+from .airtable_constants import AIRTABLE_CONSTANTS
+from .notion_constants import NOTION_CONSTANTS
+
+class FeedConstants:
+    # Redis stream per (org, user) holding recent change events for resume
+    FEED_KEY_PREFIX = "item_feed"
+    
+    # Pub/sub channel carrying every new event to all workers
+    CHANNEL = "item_feed_events"
+    
+    # SSE event names
+    ITEMS_EVENT = "items"
+    RESET_EVENT = "reset"
+    
+    # Snapshot key prefix -> provider named in events
+    PROVIDER_BY_SNAPSHOT_PREFIX: Dict[str, str] = {
+        HUBSPOT_CONSTANTS.ITEMS_KEY_PREFIX: "hubspot",
+        AIRTABLE_CONSTANTS.ITEMS_KEY_PREFIX: "airtable",
+        NOTION_CONSTANTS.ITEMS_KEY_PREFIX: "notion",
+    }
+
+# Export the constants class for use
+FEED_CONSTANTS = FeedConstants()
\ No newline at end of file
@@ -7,20 +7,39 @@ class HubSpotConstants:
     
     # API Endpoints
     CONTACTS_API_URL = "https://api.hubapi.com/crm/v3/objects/contacts"
+    CONTACTS_BATCH_READ_URL = "https://api.hubapi.com/crm/v3/objects/contacts/batch/read"
+    TOKEN_INFO_URL = "https://api.hubapi.com/oauth/v1/access-tokens"
     
     # OAuth Parameters
     REDIRECT_URI = "http://localhost:8000/api/v1/integrations/hubspot/oauth2callback"
     SCOPE = "crm.objects.contacts.read crm.objects.contacts.write crm.schemas.custom.read"
     CODE_CHALLENGE_METHOD = "S256"
     
+    # Contacts crawl: the properties create_integration_item_metadata_object reads, and the page size bounds
+    CONTACT_PROPERTIES = ("firstname", "lastname")
+    MIN_PAGE_SIZE = 10
+    MAX_PAGE_SIZE = 100
+    RATE_LIMIT_REMAINING_HEADER = "X-HubSpot-RateLimit-Remaining"
+    RATE_LIMIT_MAX_HEADER = "X-HubSpot-RateLimit-Max"
+    
     # Redis Key Prefixes
     STATE_KEY_PREFIX = "hubspot_state"
     VERIFIER_KEY_PREFIX = "hubspot_verifier"
     CREDENTIALS_KEY_PREFIX = "hubspot_credentials"
+    NONCE_KEY_PREFIX = "hubspot_oauth_nonce"
+    ITEMS_KEY_PREFIX = "hubspot_items"
+    WEBHOOK_INDEX_PREFIX = "hubspot_webhook_index"
+    WEBHOOK_TOKEN_PREFIX = "hubspot_webhook_token"
     
     # Expiration Time (in seconds)
     REDIS_EXPIRE_TIME = 600
     
+    # Webhooks
+    WEBHOOK_SIGNATURE_HEADER = "X-HubSpot-Signature-v3"
+    WEBHOOK_TIMESTAMP_HEADER = "X-HubSpot-Request-Timestamp"
+    WEBHOOK_UPSERT_EVENTS = ("contact.creation", "contact.propertyChange", "contact.restore", "contact.merge")
+    WEBHOOK_DELETE_EVENTS = ("contact.deletion", "contact.privacyDeletion")
+    
     # HTTP Headers
     CONTENT_TYPE = "application/x-www-form-urlencoded"
 
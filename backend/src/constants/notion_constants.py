@@ -7,6 +7,9 @@ class NotionConstants:
     
     # API Endpoints
     SEARCH_API_URL = "https://api.notion.com/v1/search"
+    PAGES_API_URL = "https://api.notion.com/v1/pages"
+    DATABASES_API_URL = "https://api.notion.com/v1/databases"
+    BLOCKS_API_URL = "https://api.notion.com/v1/blocks"
     
     # OAuth Parameters
     REDIRECT_URI = "http://localhost:8000/api/v1/integrations/notion/oauth2callback"
@@ -17,10 +20,26 @@ class NotionConstants:
     STATE_KEY_PREFIX = "notion_state"
     VERIFIER_KEY_PREFIX = "notion_verifier"
     CREDENTIALS_KEY_PREFIX = "notion_credentials"
+    NONCE_KEY_PREFIX = "notion_oauth_nonce"
+    ITEMS_KEY_PREFIX = "notion_items"
+    WEBHOOK_INDEX_PREFIX = "notion_webhook_index"
+    WEBHOOK_TOKEN_PREFIX = "notion_webhook_token"
+    CONTENT_STATE_PREFIX = "notion_content_state"
     
     # Expiration Time (in seconds)
     REDIS_EXPIRE_TIME = 600
     
+    # Block crawling
+    BLOCK_PAGE_SIZE = 100
+    # Child pages and databases are crawled as pages of their own, not as part of their parent
+    UNCRAWLED_CHILD_TYPES = ("child_page", "child_database")
+    
+    # Webhooks
+    WEBHOOK_SIGNATURE_HEADER = "X-Notion-Signature"
+    WEBHOOK_DELETE_EVENTS = ("page.deleted", "database.deleted")
+    WEBHOOK_VERIFICATION_KEY = "notion_webhook_verification_token"
+    WEBHOOK_VERIFICATION_EXPIRE = 86400
+    
     # HTTP Headers
     AUTH_HEADER = "Basic"
     CONTENT_TYPE = "application/json"
@@ -0,0 +1,16 @@
+class ProfileConstants:
+    # Redis key prefixes and index keys per kind of stored capture
+    PROFILE_KEY_PREFIX = "profile"
+    PROFILE_INDEX_KEY = "profile_index"
+    TRACE_KEY_PREFIX = "trace"
+    TRACE_INDEX_KEY = "trace_index"
+    KINDS = {
+        "profile": (PROFILE_KEY_PREFIX, PROFILE_INDEX_KEY),
+        "trace": (TRACE_KEY_PREFIX, TRACE_INDEX_KEY),
+    }
+
+    # Captures are downloaded by hand, so a page of recent ones is enough
+    LIST_LIMIT = 100
+
+# Export the constants class for use
+PROFILE_CONSTANTS = ProfileConstants()
\ No newline at end of file
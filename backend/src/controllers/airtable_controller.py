@@ -1,7 +1,9 @@
 from fastapi import Request, HTTPException, Response
 from fastapi.responses import HTMLResponse
-from ..utils.response import return_error, return_success
+from ..utils.response import return_error, return_success, return_partial
 from ..middleware.context import VectorShiftContext
+from ..utils.circuit_breaker import CircuitOpenError, UpstreamUnavailableError
+from ..utils.tracing import traced
 from ..services.airtable_service import (
     authorize_airtable as service_authorize_airtable,
     oauth2callback_airtable as service_oauth2callback_airtable,
@@ -36,12 +38,22 @@ async def get_airtable_credentials(ctx: VectorShiftContext, response: Response):
         return return_error(response, [str(e)])
 
 
-async def get_items_airtable(ctx: VectorShiftContext, credentials: dict, response: Response):
+@traced("controller")
+async def get_items_airtable(ctx: VectorShiftContext, credentials: dict, response: Response, cursor: str = None, refresh: bool = False):
     """Fetch Airtable items."""
     if not ctx.user_id or not ctx.org_id:
         return return_error(response, ["user_id and org_id are required"], 400)
     try:
-        items = await service_get_items_airtable(ctx, credentials)
+        items = await service_get_items_airtable(ctx, credentials, cursor, refresh)
+        if ctx.stale:
+            response.headers["X-Data-Stale"] = "true"
+        if ctx.partial:
+            return return_partial(response, items, ctx.cursor)
         return return_success(response, items)
+    except (CircuitOpenError, UpstreamUnavailableError) as e:
+        response.headers["Retry-After"] = str(e.retry_after)
+        return return_error(response, [str(e)], 503)
+    except HTTPException as e:
+        return return_error(response, [e.detail], e.status_code)
     except Exception as e:
         return return_error(response, [str(e)])
\ No newline at end of file
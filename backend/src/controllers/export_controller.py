@@ -0,0 +1,57 @@
+import os
+from fastapi import Request, Response, HTTPException
+from ..utils.response import return_error, return_success
+from ..utils.file_response import FileRangeResponse
+from ..middleware.context import VectorShiftContext
+from ..repositories.export_repository import export_path
+from ..services.export_service import export_runner, get_owned_export, ExportUnavailableError
+from ..constants.export_constants import EXPORT_CONSTANTS
+
+async def start_export(ctx: VectorShiftContext, provider: str, fmt: str, credentials: dict, response: Response):
+    """Start exporting the caller's items of a provider to a gzip-compressed NDJSON or CSV file."""
+    try:
+        export = await export_runner.start(ctx, provider, fmt, credentials)
+        return return_success(response, export, 202)
+    except ExportUnavailableError as e:
+        response.headers["Retry-After"] = "30"
+        return return_error(response, [str(e)], 503)
+    except HTTPException as e:
+        return return_error(response, [e.detail], e.status_code)
+
+async def resume_export(ctx: VectorShiftContext, export_id: str, credentials: dict, response: Response):
+    """Continue a failed or interrupted export from its last completed chunk."""
+    try:
+        export = await export_runner.resume(ctx, export_id, credentials)
+        return return_success(response, export, 202)
+    except ExportUnavailableError as e:
+        response.headers["Retry-After"] = "30"
+        return return_error(response, [str(e)], 503)
+    except HTTPException as e:
+        return return_error(response, [e.detail], e.status_code)
+
+async def get_export_status(ctx: VectorShiftContext, export_id: str, response: Response):
+    """Return an export's manifest: status, item count and the byte range of every completed chunk."""
+    try:
+        return return_success(response, await get_owned_export(ctx, export_id))
+    except HTTPException as e:
+        return return_error(response, [e.detail], e.status_code)
+
+async def download_export(ctx: VectorShiftContext, export_id: str, request: Request, response: Response):
+    """Serve the completed chunks of an export file, honouring Range requests."""
+    try:
+        export = await get_owned_export(ctx, export_id)
+    except HTTPException as e:
+        return return_error(response, [e.detail], e.status_code)
+    path = export_path(export_id, export["format"])
+    if not os.path.isfile(path):
+        # Files live on the disk of the host that ran the export and are pruned after EXPORT_TTL
+        return return_error(response, ["Export file not found"], 404)
+    return FileRangeResponse(
+        path,
+        export["size"],
+        f'"{export_id}-{export["size"]}"',
+        request.headers,
+        media_type="application/gzip",
+        filename=f"{export_id}.{EXPORT_CONSTANTS.FORMATS[export['format']]}.gz",
+        headers={"X-Export-Status": export["status"]},
+    )
\ No newline at end of file
@@ -0,0 +1,34 @@
+import re
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+from ..utils.response import return_error
+from ..middleware.context import VectorShiftContext
+from ..services.item_feed_service import item_feed, FeedUnavailableError
+
+EVENT_ID_PATTERN = re.compile(r"\d+-\d+")
+
+async def stream_item_changes(ctx: VectorShiftContext, request: Request, response: Response, last_event_id: str = None):
+    """Open an SSE stream of item upserts and deletes for the caller, resuming after Last-Event-ID when given."""
+    if not ctx.user_id or not ctx.org_id:
+        return return_error(response, ["user_id and org_id are required"], 400)
+    last_event_id = request.headers.get("Last-Event-ID") or last_event_id
+    if last_event_id and not EVENT_ID_PATTERN.fullmatch(last_event_id):
+        return return_error(response, ["Invalid Last-Event-ID"], 400)
+    try:
+        frames = item_feed.stream(ctx, last_event_id)
+        # Subscribe now, so a full worker is reported as 503 rather than mid-stream
+        first = await frames.__anext__()
+    except FeedUnavailableError as e:
+        response.headers["Retry-After"] = "5"
+        return return_error(response, [str(e)], 503)
+
+    async def body():
+        yield first
+        async for frame in frames:
+            yield frame
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
\ No newline at end of file
@@ -1,7 +1,9 @@
 from fastapi import Request, HTTPException, Response
 
-from ..utils.response import return_error, return_success
+from ..utils.response import return_error, return_success, return_partial
 from ..middleware.context import VectorShiftContext
+from ..utils.circuit_breaker import CircuitOpenError, UpstreamUnavailableError
+from ..utils.tracing import traced
 from ..services.hubspot_service import (
     authorize_hubspot as service_authorize,
     oauth2callback_hubspot as service_oauth2callback_hubspot,
@@ -37,11 +39,21 @@ async def get_hubspot_credentials(ctx: VectorShiftContext, response: Response):
     except Exception as e:
         return return_error(response, [str(e)])
 
-async def get_hubspot_items(ctx: VectorShiftContext, credentials: dict, response: Response):
+@traced("controller")
+async def get_hubspot_items(ctx: VectorShiftContext, credentials: dict, response: Response, cursor: str = None):
     """Fetch HubSpot items."""
     try:
-        items = await service_get_hubspot_items(ctx, credentials)
+        items = await service_get_hubspot_items(ctx, credentials, cursor)
+        if ctx.stale:
+            response.headers["X-Data-Stale"] = "true"
+        if ctx.partial:
+            return return_partial(response, items, ctx.cursor)
         return return_success(response, items)
+    except (CircuitOpenError, UpstreamUnavailableError) as e:
+        response.headers["Retry-After"] = str(e.retry_after)
+        return return_error(response, [str(e)], 503)
+    except HTTPException as e:
+        return return_error(response, [e.detail], e.status_code)
     except Exception as e:
         return return_error(response, [str(e)])
         
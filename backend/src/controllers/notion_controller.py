@@ -1,13 +1,20 @@
 from fastapi import Request, HTTPException, Form, Response
-from fastapi.responses import HTMLResponse
-from ..utils.response import return_error, return_success
+from fastapi.responses import HTMLResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from contextlib import AsyncExitStack
+from typing import AsyncContextManager
+from ..utils.response import return_error, return_success, return_partial
 from ..middleware.context import VectorShiftContext
+from ..utils.circuit_breaker import CircuitOpenError, UpstreamUnavailableError
+from ..utils.tracing import traced
 from ..services.notion_service import (
     authorize_notion as service_authorize_notion,
     oauth2callback_notion as service_oauth2callback_notion,
     get_notion_credentials as service_get_notion_credentials,
     get_items_notion as service_get_items_notion,
 )
+from ..services.notion_content_service import crawl_notion_content as service_crawl_notion_content
+import json
 
 
 async def authorize_notion(ctx: VectorShiftContext, response: Response):
@@ -37,12 +44,61 @@ async def get_notion_credentials(ctx: VectorShiftContext, response: Response):
         return return_error(response, [str(e)])
 
 
-async def get_items_notion(ctx: VectorShiftContext, credentials: dict, response: Response):
+@traced("controller")
+async def get_items_notion(ctx: VectorShiftContext, credentials: dict, response: Response, cursor: str = None):
     """Fetch Notion items."""
     if not ctx.user_id or not ctx.org_id:
         return return_error(response, ["user_id and org_id are required"], 400)
     try:
-        items = await service_get_items_notion(ctx, credentials)
+        items = await service_get_items_notion(ctx, credentials, cursor)
+        if ctx.stale:
+            response.headers["X-Data-Stale"] = "true"
+        if ctx.partial:
+            return return_partial(response, items, ctx.cursor)
         return return_success(response, items)
+    except (CircuitOpenError, UpstreamUnavailableError) as e:
+        response.headers["Retry-After"] = str(e.retry_after)
+        return return_error(response, [str(e)], 503)
+    except HTTPException as e:
+        return return_error(response, [e.detail], e.status_code)
     except Exception as e:
-        return return_error(response, [str(e)])
\ No newline at end of file
+        return return_error(response, [str(e)])
+
+
+async def crawl_notion_content(ctx: VectorShiftContext, credentials: dict, response: Response, page_ids: list = None, force: bool = False, admission: AsyncContextManager = None):
+    """Stream Notion page content as newline-delimited JSON.
+
+    The admission slot, when given, is held until the stream has ended or the client has gone, not just
+    until the response is returned.
+    """
+    if not ctx.user_id or not ctx.org_id:
+        return return_error(response, ["user_id and org_id are required"], 400)
+    slot = AsyncExitStack()
+    if admission is not None:
+        await slot.enter_async_context(admission)
+    records = service_crawl_notion_content(ctx, credentials, page_ids, force)
+    try:
+        # Run up to the first record here, so search failures still get a proper status code
+        first = await records.__anext__()
+    except StopAsyncIteration:
+        first = None
+    except (CircuitOpenError, UpstreamUnavailableError) as e:
+        await slot.aclose()
+        response.headers["Retry-After"] = str(e.retry_after)
+        return return_error(response, [str(e)], 503)
+    except HTTPException as e:
+        await slot.aclose()
+        return return_error(response, [e.detail], e.status_code)
+    except BaseException:
+        await slot.aclose()
+        raise
+
+    async def body():
+        if first is None:
+            return
+        yield json.dumps(first) + "\n"
+        async for record in records:
+            yield json.dumps(record) + "\n"
+
+    # Runs after the body completes and also after a client disconnect cancels it
+    return StreamingResponse(body(), media_type="application/x-ndjson", background=BackgroundTask(slot.aclose))
\ No newline at end of file
@@ -0,0 +1,45 @@
+from fastapi import Request, Response
+from fastapi.responses import PlainTextResponse, JSONResponse
+from ..utils.response import return_error, return_success
+from ..repositories.profile_repository import get_capture, list_captures
+from ..config.config import config
+
+def _authorized(request: Request) -> bool:
+    # A bearer token rather than the opt-in headers, so downloads are not themselves profiled
+    return bool(config.PROFILE_TOKEN) and request.headers.get("Authorization") == f"Bearer {config.PROFILE_TOKEN}"
+
+async def get_profiles(request: Request, response: Response):
+    """List stored request profiles."""
+    if not _authorized(request):
+        return return_error(response, ["Invalid profile token"], 401)
+    return return_success(response, await list_captures("profile"))
+
+async def download_profile(request: Request, response: Response, profile_id: str):
+    """Download one profile as folded stacks, ready for flamegraph.pl or speedscope."""
+    if not _authorized(request):
+        return return_error(response, ["Invalid profile token"], 401)
+    profile = await get_capture("profile", profile_id)
+    if profile is None:
+        return return_error(response, ["Profile not found"], 404)
+    return PlainTextResponse(
+        profile["payload"],
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.folded"'},
+    )
+
+async def get_traces(request: Request, response: Response):
+    """List stored request traces."""
+    if not _authorized(request):
+        return return_error(response, ["Invalid profile token"], 401)
+    return return_success(response, await list_captures("trace"))
+
+async def download_trace(request: Request, response: Response, trace_id: str):
+    """Download one trace as Chrome trace-event JSON, ready for chrome://tracing or Perfetto."""
+    if not _authorized(request):
+        return return_error(response, ["Invalid profile token"], 401)
+    trace = await get_capture("trace", trace_id)
+    if trace is None:
+        return return_error(response, ["Trace not found"], 404)
+    return JSONResponse(
+        trace["payload"],
+        headers={"Content-Disposition": f'attachment; filename="{trace_id}.json"'},
+    )
\ No newline at end of file
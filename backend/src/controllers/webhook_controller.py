@@ -0,0 +1,76 @@
+import json
+from fastapi import Request, Response
+from ..utils.response import return_error, return_success
+from ..utils.webhook_signatures import decode_mac_secret, verify_hubspot_signature, verify_notion_signature, verify_airtable_signature
+from ..services.webhook_service import webhook_processor, store_notion_verification_token
+from ..constants.hubspot_constants import HUBSPOT_CONSTANTS
+from ..constants.airtable_constants import AIRTABLE_CONSTANTS
+from ..constants.notion_constants import NOTION_CONSTANTS
+from ..oplog.oplog import info
+from ..config.config import config
+
+def _public_url(request: Request) -> str:
+    """The URL as the provider called it; behind a proxy or load balancer request.url has the internal scheme and host."""
+    url = config.PUBLIC_BASE_URL.rstrip("/") + request.url.path
+    return f"{url}?{request.url.query}" if request.url.query else url
+
+# Decoded once at startup; a malformed secret is logged here instead of failing every delivery
+AIRTABLE_MAC_KEY = decode_mac_secret(config.AIRTABLE_WEBHOOK_MAC_SECRET)
+
+def _queued(response: Response, provider: str, events: list):
+    if not webhook_processor.enqueue(provider, events):
+        response.headers["Retry-After"] = "5"
+        return return_error(response, ["Webhook queue is full"], 503)
+    return return_success(response, {"accepted": len(events)})
+
+async def receive_hubspot_webhook(request: Request, response: Response):
+    """Verify and queue a HubSpot contact event delivery."""
+    body = await request.body()
+    if not verify_hubspot_signature(
+        config.HUBSPOT_CLIENT_SECRET,
+        request.method,
+        _public_url(request),
+        body,
+        request.headers.get(HUBSPOT_CONSTANTS.WEBHOOK_SIGNATURE_HEADER),
+        request.headers.get(HUBSPOT_CONSTANTS.WEBHOOK_TIMESTAMP_HEADER),
+    ):
+        return return_error(response, ["Invalid signature"], 401)
+    try:
+        events = json.loads(body)
+    except json.JSONDecodeError:
+        return return_error(response, ["Invalid payload"], 400)
+    if not isinstance(events, list) or not all(isinstance(event, dict) for event in events):
+        return return_error(response, ["Payload must be a list of events"], 400)
+    return _queued(response, "hubspot", [(str(event.get("portalId")), event) for event in events])
+
+async def receive_notion_webhook(request: Request, response: Response):
+    """Verify and queue a Notion event, answering the one-time subscription verification request."""
+    body = await request.body()
+    try:
+        event = json.loads(body)
+    except json.JSONDecodeError:
+        return return_error(response, ["Invalid payload"], 400)
+    if not isinstance(event, dict):
+        return return_error(response, ["Payload must be an event object"], 400)
+    if "verification_token" in event and not config.NOTION_WEBHOOK_VERIFICATION_TOKEN:
+        # Notion sends the token once; it must be copied into NOTION_WEBHOOK_VERIFICATION_TOKEN. Once it is
+        # set, every request, including another verification, has to carry a valid signature.
+        await store_notion_verification_token(str(event["verification_token"]))
+        info(f"Received Notion webhook verification token; read it from Redis key {NOTION_CONSTANTS.WEBHOOK_VERIFICATION_KEY}")
+        return return_success(response, {"verified": True})
+    if not verify_notion_signature(config.NOTION_WEBHOOK_VERIFICATION_TOKEN, body, request.headers.get(NOTION_CONSTANTS.WEBHOOK_SIGNATURE_HEADER)):
+        return return_error(response, ["Invalid signature"], 401)
+    return _queued(response, "notion", [(event.get("workspace_id"), event)])
+
+async def receive_airtable_webhook(request: Request, response: Response):
+    """Verify and queue an Airtable base webhook notification."""
+    body = await request.body()
+    if not verify_airtable_signature(AIRTABLE_MAC_KEY, body, request.headers.get(AIRTABLE_CONSTANTS.WEBHOOK_SIGNATURE_HEADER)):
+        return return_error(response, ["Invalid signature"], 401)
+    try:
+        notification = json.loads(body)
+    except json.JSONDecodeError:
+        return return_error(response, ["Invalid payload"], 400)
+    if not isinstance(notification, dict) or not isinstance(notification.get("base", {}), dict):
+        return return_error(response, ["Payload must be a notification object"], 400)
+    return _queued(response, "airtable", [(notification.get("base", {}).get("id"), notification)])
\ No newline at end of file
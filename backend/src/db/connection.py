@@ -1,6 +1,12 @@
+import asyncio
 import redis.asyncio as redis
 import os
 from ..config.config import config
+from ..constants.cache_constants import CACHE_CONSTANTS
+from ..oplog.oplog import error
+from ..oplog.metrics import metrics
+from ..utils.tracing import span
+from .local_cache import LocalCache
 
 class RedisClient:
     _instance = None
@@ -13,6 +19,9 @@ class RedisClient:
             password=config.REDIS_PASSWORD,
             username="default"
         )
+        self.local_cache = LocalCache(config.L1_CACHE_MAX_ENTRIES, config.L1_CACHE_MAX_BYTES) if config.L1_CACHE_ENABLED else None
+        self._listening = False
+        self._listener = None
 
     @classmethod
     def get_instance(cls):
@@ -20,19 +29,89 @@ class RedisClient:
             cls._instance = RedisClient()
         return cls._instance
 
+    def _local_ttl(self, key: str) -> float:
+        """Local cache TTL for a key, or 0 when it must always be read from Redis."""
+        if self.local_cache is None or not self._listening:
+            return 0
+        return CACHE_CONSTANTS.PREFIX_TTLS.get(key.split(":", 1)[0], config.L1_CACHE_TTL)
+
     async def set(self, key: str, value: str, expire: int = None):
-        await self.client.set(key, value)
-        if expire:
-            await self.client.expire(key, expire)
+        with span("redis.set", "redis", prefix=key.split(":", 1)[0], bytes=len(value)):
+            if self.local_cache is None:
+                await self.client.set(key, value, ex=expire)
+                return
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.set(key, value, ex=expire)
+                pipe.publish(CACHE_CONSTANTS.INVALIDATION_CHANNEL, key)
+                await pipe.execute()
+            self.local_cache.invalidate(key)
+
+    async def set_if_absent(self, key: str, value: str, expire: int = None) -> bool:
+        """Set the key only if it does not exist yet; returns True when the key was written."""
+        with span("redis.set_if_absent", "redis", prefix=key.split(":", 1)[0]):
+            return bool(await self.client.set(key, value, ex=expire, nx=True))
 
     async def get(self, key: str):
-        return await self.client.get(key)
+        prefix = key.split(":", 1)[0]
+        with span("redis.get", "redis", prefix=prefix) as get_span:
+            ttl = self._local_ttl(key)
+            if not ttl:
+                return await self.client.get(key)
+            value = self.local_cache.get(key)
+            if value is not None:
+                metrics.inc("l1_cache_hits_total", prefix=prefix)
+                get_span.set(l1_hit=True)
+                return value
+            metrics.inc("l1_cache_misses_total", prefix=prefix)
+            generation = self.local_cache.generation
+            value = await self.client.get(key)
+            if value is not None:
+                self.local_cache.set(key, value, ttl, generation)
+            return value
 
     async def delete(self, key: str):
-        await self.client.delete(key)
+        with span("redis.delete", "redis", prefix=key.split(":", 1)[0]):
+            await self.client.delete(key)
+            await self.invalidate(key)
+
+    async def invalidate(self, key: str):
+        """Drop a key from the local cache of every worker; call after writing it through self.client directly."""
+        if self.local_cache is None:
+            return
+        self.local_cache.invalidate(key)
+        await self.client.publish(CACHE_CONSTANTS.INVALIDATION_CHANNEL, key)
+
+    async def start_invalidation_listener(self):
+        """Subscribe to invalidations from other workers; the local cache is bypassed until subscribed."""
+        if self.local_cache is not None and self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def _listen(self):
+        while True:
+            pubsub = self.client.pubsub()
+            try:
+                await pubsub.subscribe(CACHE_CONSTANTS.INVALIDATION_CHANNEL)
+                # Anything cached while unsubscribed may have missed an invalidation
+                self.local_cache.clear()
+                self._listening = True
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self.local_cache.invalidate(message["data"].decode("utf-8"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                error(f"Local cache invalidation listener failed: {str(e)}")
+            finally:
+                self._listening = False
+                self.local_cache.clear()
+                await pubsub.reset()
+            await asyncio.sleep(1)
 
     async def close(self):
         """Close the Redis connection (useful for cleanup)."""
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
         await self.client.close()
 
     async def ping(self):
@@ -0,0 +1,73 @@
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+class LocalCache:
+    """LRU with per-entry TTL, bounded by entry count and value bytes, used as the in-process tier in front of Redis.
+
+    A read that misses takes the current generation before going to Redis and passes it to set(),
+    which drops the value if that key was invalidated in between. Only the last max_entries
+    invalidations are remembered; a read older than the ones forgotten is not cached.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int = 0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._clock = 0
+        # Generation at which each recently invalidated key was last invalidated, oldest first
+        self._invalidated: "OrderedDict[str, int]" = OrderedDict()
+        self._forgotten = 0
+
+    @property
+    def generation(self) -> int:
+        return self._clock
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at, _ = entry
+        if expires_at <= time.monotonic():
+            self._pop(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: float, generation: int = None):
+        if generation is not None and (generation < self._forgotten or self._invalidated.get(key, 0) > generation):
+            return
+        size = len(value) if isinstance(value, (bytes, str)) else sys.getsizeof(value)
+        if self.max_bytes and size > self.max_bytes:
+            return
+        self._pop(key)
+        self._entries[key] = (value, time.monotonic() + ttl, size)
+        self.bytes += size
+        while len(self._entries) > self.max_entries or (self.max_bytes and self.bytes > self.max_bytes):
+            _, (_, _, evicted) = self._entries.popitem(last=False)
+            self.bytes -= evicted
+
+    def invalidate(self, key: str):
+        self._clock += 1
+        self._invalidated[key] = self._clock
+        self._invalidated.move_to_end(key)
+        if len(self._invalidated) > self.max_entries:
+            _, self._forgotten = self._invalidated.popitem(last=False)
+        self._pop(key)
+
+    def clear(self):
+        self._clock += 1
+        self._invalidated.clear()
+        self._forgotten = self._clock
+        self._entries.clear()
+        self.bytes = 0
+
+    def _pop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[2]
+
+    def __len__(self):
+        return len(self._entries)
\ No newline at end of file
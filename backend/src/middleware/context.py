@@ -1,7 +1,12 @@
-
+import time
 from fastapi import Request, Response
+from starlette.background import BackgroundTasks
 from starlette.middleware.base import BaseHTTPMiddleware
+from ..config.config import config
 from ..db.connection import RedisClient
+from ..utils.profiler import profiler, PROFILE_ID_HEADER
+from ..utils.tracing import should_trace, start_trace, end_trace, span, TRACE_ID_HEADER
+from ..repositories.profile_repository import store_capture
 from typing import Optional
 
 class VectorShiftContext:
@@ -10,8 +15,19 @@ class VectorShiftContext:
     def __init__(self):
         self.user_id: Optional[str] = None
         self.org_id: Optional[str] = None
+        self.stale: bool = False
+        # time.monotonic() by which upstream work must stop; None means unbounded
+        self.deadline: Optional[float] = None
+        self.partial: bool = False
+        self.cursor: Optional[str] = None
         self.redis_client = RedisClient.get_instance()
 
+    def set_deadline(self, timeout: Optional[float] = None):
+        """Start the request's budget from the caller's timeout, or REQUEST_DEADLINE when none was sent."""
+        budget = timeout if timeout is not None else config.REQUEST_DEADLINE
+        # Part of the budget is kept back for transforming and returning what was fetched
+        self.deadline = time.monotonic() + budget - config.REQUEST_DEADLINE_RESERVE if budget > 0 else None
+
     @classmethod
     async def get(cls, request: Request = None, user_id: Optional[str] = None, org_id: Optional[str] = None) -> 'VectorShiftContext':
         request_id = id(request) if request else None
@@ -33,7 +49,58 @@ class VectorShiftContext:
         return ctx
 
 class VectorShiftContextMiddleware(BaseHTTPMiddleware):
+    def __init__(self, app, server_state=None):
+        super().__init__(app)
+        self.server_state = server_state
+
     async def dispatch(self, request: Request, call_next):
         ctx = await VectorShiftContext.get(request)
-        response = await call_next(request)
+        if profiler.should_profile(request.headers):
+            return await self._profiled(request, call_next)
+        return await self._observed(request, call_next)
+
+    async def _observed(self, request: Request, call_next):
+        if should_trace(request.headers):
+            return await self._traced(request, call_next)
+        return await self._tracked(request, call_next)
+
+    async def _tracked(self, request: Request, call_next):
+        if self.server_state is None:
+            return await call_next(request)
+        self.server_state.in_flight += 1
+        try:
+            response = await call_next(request)
+        except BaseException:
+            self.server_state.in_flight -= 1
+            raise
+        # The body (SSE, NDJSON, downloads) is still being sent after call_next returns; the
+        # response's background runs once it is done, or once a client disconnect cancelled it
+        tasks = BackgroundTasks([response.background] if response.background else None)
+        tasks.add_task(self._request_done)
+        response.background = tasks
+        return response
+
+    async def _request_done(self):
+        self.server_state.in_flight -= 1
+
+    async def _profiled(self, request: Request, call_next):
+        profile = profiler.start(request.method, request.url.path)
+        try:
+            response = await self._observed(request, call_next)
+        finally:
+            profiler.stop(profile)
+        await store_capture("profile", profile.to_dict(), profile.folded())
+        response.headers[PROFILE_ID_HEADER] = profile.id
+        return response
+
+    async def _traced(self, request: Request, call_next):
+        trace = start_trace(request.method, request.url.path)
+        try:
+            with span(f"{request.method} {request.url.path}", "request") as request_span:
+                response = await self._tracked(request, call_next)
+                request_span.set(status=response.status_code)
+        finally:
+            end_trace(trace)
+        await store_capture("trace", trace.to_dict(), trace.chrome_events())
+        response.headers[TRACE_ID_HEADER] = trace.id
         return response
\ No newline at end of file
@@ -0,0 +1,48 @@
+from collections import defaultdict
+from typing import Dict, Tuple
+
+def _label_key(labels: Dict[str, str]) -> Tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+class Metrics:
+    """In-process counters, gauges and summaries rendered in the Prometheus text format (per worker)."""
+
+    def __init__(self):
+        self._counters = defaultdict(float)
+        self._gauges = {}
+        self._summaries = defaultdict(lambda: [0, 0.0])
+
+    def inc(self, name: str, value: float = 1, **labels):
+        self._counters[(name, _label_key(labels))] += value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        self._gauges[(name, _label_key(labels))] = value
+
+    def observe(self, name: str, value: float, **labels):
+        summary = self._summaries[(name, _label_key(labels))]
+        summary[0] += 1
+        summary[1] += value
+
+    def get(self, name: str, **labels) -> float:
+        key = (name, _label_key(labels))
+        if key in self._counters:
+            return self._counters[key]
+        return self._gauges.get(key, 0)
+
+    def render(self) -> str:
+        lines = []
+        for (name, labels), value in sorted(self._counters.items()):
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+        for (name, labels), value in sorted(self._gauges.items()):
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+        for (name, labels), (count, total) in sorted(self._summaries.items()):
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+        return "\n".join(lines) + "\n"
+
+def _format_labels(labels: Tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+metrics = Metrics()
\ No newline at end of file
@@ -1,7 +1,11 @@
+import json
 from ..middleware.context import VectorShiftContext
-from typing import List, Dict
+from fastapi import HTTPException
+from typing import AsyncIterator, List, Dict, Optional, Tuple
 from ..oplog.oplog import error
-import httpx
+from ..utils.circuit_breaker import get_breaker
+from ..utils.deadline import DeadlineExceededError
+from ..utils.tracing import span, traced
 
 async def store_credentials(ctx: VectorShiftContext, key: str, value: str, expire: int = 600):
     """Store a value in Redis with an optional expiration time."""
@@ -14,18 +18,87 @@ async def get_credentials(ctx: VectorShiftContext, key: str) -> str:
         await ctx.redis_client.delete(key)
     return value
 
-async def fetch_airtable_items(ctx: VectorShiftContext, access_token: str, url: str, aggregated_response: List[Dict], offset: str = None) -> None:
-    """Fetch Airtable bases with pagination and aggregate results."""
-    params = {"offset": offset} if offset else {}
+async def iter_airtable_base_pages(ctx: VectorShiftContext, access_token: str, url: str, offset: str = None) -> AsyncIterator[Tuple[List[Dict], Optional[str]]]:
+    """Yield pages of Airtable bases with the offset of the page after each.
+
+    Stops with DeadlineExceededError, carrying the offset of the unfetched page, once ctx's deadline passes.
+    """
+    headers = {"Authorization": f"Bearer {access_token}"}
+    fetched = 0
+    while True:
+        params = {"offset": offset} if offset else {}
+        with span("airtable.bases_page", "pagination", fetched=fetched):
+            try:
+                response = await get_breaker("airtable", "bases").request("GET", url, deadline=ctx.deadline, headers=headers, params=params)
+            except DeadlineExceededError as e:
+                e.cursor = offset
+                raise
+        if response.status_code != 200:
+            error(f"Failed to fetch Airtable items: {response.status_code} - {response.text}")
+            # 401/403 mean the token was revoked or lacks a scope, which the client fixes by reconnecting
+            raise HTTPException(status_code=response.status_code if response.status_code in (401, 403) else 400, detail=f"Fetch failed: {response.status_code}")
+        data = response.json()
+        bases = data.get("bases", [])
+        fetched += len(bases)
+        offset = data.get("offset")
+        yield bases, offset
+        if not offset:
+            return
+
+@traced("repository")
+async def fetch_airtable_tables(ctx: VectorShiftContext, access_token: str, url: str, base_id: str) -> Optional[List[Dict]]:
+    """Fetch the table schema of a single Airtable base, or None when the request fails."""
+    headers = {"Authorization": f"Bearer {access_token}"}
+    response = await get_breaker("airtable", "tables").request("GET", f"{url}/{base_id}/tables", deadline=ctx.deadline, headers=headers)
+    if response.status_code == 200:
+        return response.json().get("tables", [])
+    error(f"Failed to fetch Airtable tables for base {base_id}: {response.status_code}")
+    return None
+
+@traced("repository")
+async def get_base_schemas(ctx: VectorShiftContext, key: str, version_prefix: str, base_ids: List[str]) -> Tuple[Dict[str, Dict], Dict[str, str]]:
+    """The cached table schemas of some bases, and each base's current schema version, in one round trip."""
+    if not base_ids:
+        return {}, {}
+    async with ctx.redis_client.client.pipeline(transaction=False) as pipe:
+        pipe.hmget(key, base_ids)
+        pipe.mget([f"{version_prefix}:{base_id}" for base_id in base_ids])
+        schemas, versions = await pipe.execute()
+    return (
+        {base_id: json.loads(schema) for base_id, schema in zip(base_ids, schemas) if schema},
+        {base_id: version.decode("utf-8") for base_id, version in zip(base_ids, versions) if version},
+    )
+
+async def store_base_schemas(ctx: VectorShiftContext, key: str, schemas: Dict[str, Dict], expire: int) -> None:
+    """Cache freshly fetched table schemas, keyed by base id."""
+    if not schemas:
+        return
+    async with ctx.redis_client.client.pipeline(transaction=False) as pipe:
+        pipe.hset(key, mapping={base_id: json.dumps(schema) for base_id, schema in schemas.items()})
+        pipe.expire(key, expire)
+        await pipe.execute()
+
+async def bump_base_schema_version(ctx: VectorShiftContext, key: str, expire: int) -> None:
+    """Mark every cached schema of a base as outdated, for all users who cached it."""
+    async with ctx.redis_client.client.pipeline(transaction=False) as pipe:
+        pipe.incr(key)
+        pipe.expire(key, expire)
+        await pipe.execute()
+
+@traced("repository")
+async def fetch_airtable_webhook_payloads(ctx: VectorShiftContext, access_token: str, url: str, cursor: Optional[int] = None) -> Tuple[List[Dict], Optional[int]]:
+    """Fetch all pending payloads of an Airtable webhook, returning them with the cursor to resume from next time."""
     headers = {"Authorization": f"Bearer {access_token}"}
-    async with ctx.redis_client.client.get() as session:
-        async with session.get(url, headers=headers, params=params) as response:
-            if response.status == 200:
-                data = await response.json()
-                results = data.get("bases", {})
-                offset = data.get("offset")
-                aggregated_response.extend(results.values())  # Extend with dictionary values
-                if offset:
-                    await fetch_airtable_items(ctx, access_token, url, aggregated_response, offset)
-            else:
-                error(f"Failed to fetch Airtable items: {response.status}")
\ No newline at end of file
+    payloads = []
+    while True:
+        params = {"cursor": cursor} if cursor else {}
+        with span("airtable.payloads_page", "pagination", cursor=cursor):
+            response = await get_breaker("airtable", "webhooks").request("GET", url, deadline=ctx.deadline, headers=headers, params=params)
+        if response.status_code != 200:
+            error(f"Failed to fetch Airtable webhook payloads: {response.status_code}")
+            return payloads, cursor
+        data = response.json()
+        payloads.extend(data.get("payloads", []))
+        cursor = data.get("cursor", cursor)
+        if not data.get("mightHaveMore"):
+            return payloads, cursor
@@ -0,0 +1,38 @@
+import json
+import os
+import re
+import time
+from typing import Dict, Optional
+from ..middleware.context import VectorShiftContext
+from ..constants.export_constants import EXPORT_CONSTANTS
+from ..config.config import config
+from ..oplog.oplog import error
+
+EXPORT_ID_PATTERN = re.compile(r"[0-9a-f]{32}")
+
+def export_path(export_id: str, fmt: str) -> str:
+    return os.path.join(config.EXPORT_DIR, f"{export_id}.{EXPORT_CONSTANTS.FORMATS[fmt]}.gz")
+
+async def store_export(ctx: VectorShiftContext, export: Dict, expire: int) -> None:
+    """Save an export's manifest: status, resume cursor and the byte range of every completed chunk."""
+    await ctx.redis_client.set(f"{EXPORT_CONSTANTS.EXPORT_KEY_PREFIX}:{export['id']}", json.dumps(export), expire)
+
+async def get_export(ctx: VectorShiftContext, export_id: str) -> Optional[Dict]:
+    """Load an export's manifest, or None when the id is malformed, unknown or expired."""
+    if not EXPORT_ID_PATTERN.fullmatch(export_id):
+        return None
+    value = await ctx.redis_client.get(f"{EXPORT_CONSTANTS.EXPORT_KEY_PREFIX}:{export_id}")
+    return json.loads(value) if value else None
+
+def prune_export_files(max_age: int) -> None:
+    """Remove export files whose manifests have expired."""
+    if not os.path.isdir(config.EXPORT_DIR):
+        return
+    cutoff = time.time() - max_age
+    for name in os.listdir(config.EXPORT_DIR):
+        path = os.path.join(config.EXPORT_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError as e:
+            error(f"Failed to prune export file {name}: {str(e)}")
\ No newline at end of file
@@ -1,8 +1,14 @@
+import time
 from fastapi import HTTPException
-import httpx
 from ..middleware.context import VectorShiftContext
-from typing import List
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
 from ..oplog.oplog import error
+from ..oplog.metrics import metrics
+from ..constants.hubspot_constants import HUBSPOT_CONSTANTS
+from ..utils.circuit_breaker import get_breaker
+from ..utils.deadline import DeadlineExceededError
+from ..utils.page_size import AdaptivePageSize
+from ..utils.tracing import span, traced
 
 async def store_credentials(ctx: VectorShiftContext, key: str, value: str, expire: int = 600):
     await ctx.redis_client.set(key, value, expire)
@@ -13,20 +19,78 @@ async def get_credentials(ctx: VectorShiftContext, key: str) -> str:
         await ctx.redis_client.delete(key)
     return value
 
-async def fetch_hubspot_items(ctx: VectorShiftContext, access_token: str, url: str, after: str = None) -> List[dict]:
-    """Fetch HubSpot items with pagination using httpx.AsyncClient."""
-    params = {"after": after} if after else {}
+def _rate_limit_headroom(response) -> Optional[float]:
+    """Share of the current rate-limit window still unused, from HubSpot's headers when present."""
+    try:
+        remaining = int(response.headers[HUBSPOT_CONSTANTS.RATE_LIMIT_REMAINING_HEADER])
+        limit = int(response.headers[HUBSPOT_CONSTANTS.RATE_LIMIT_MAX_HEADER])
+    except (KeyError, ValueError):
+        return None
+    return remaining / limit if limit > 0 else None
+
+async def iter_hubspot_pages(ctx: VectorShiftContext, access_token: str, url: str, after: str = None,
+                             properties: Sequence[str] = (), page_size: AdaptivePageSize = None) -> AsyncIterator[Tuple[List[dict], Optional[str]]]:
+    """Yield HubSpot result pages one at a time with the after cursor of the page following each.
+
+    Only the given properties are requested. With page_size, each request asks for its current size
+    and reports its latency and rate-limit headroom back; after cursors are record positions, so the
+    size may change between pages. Stops with DeadlineExceededError, carrying the after cursor of the
+    unfetched page, once ctx's deadline passes.
+    """
+    headers = {"Authorization": f"Bearer {access_token}"}
+    page = 0
+    while True:
+        params = {"after": after} if after else {}
+        if properties:
+            params["properties"] = ",".join(properties)
+        if page_size:
+            params["limit"] = page_size.size
+        with span("hubspot.page", "pagination", page=page, limit=params.get("limit")) as page_span:
+            started = time.monotonic()
+            try:
+                response = await get_breaker("hubspot", "contacts").request("GET", url, deadline=ctx.deadline, headers=headers, params=params)
+            except DeadlineExceededError as e:
+                e.cursor = after
+                raise
+            if response.status_code != 200:
+                error(f"Failed to fetch HubSpot items: {response.status_code} - {response.text}")
+                # 401/403 mean the token was revoked or lacks a scope, which the client fixes by reconnecting
+                raise HTTPException(status_code=response.status_code if response.status_code in (401, 403) else 400, detail=f"Fetch failed: {response.status_code}")
+            
+            data = response.json()
+            page_span.set(records=len(data.get("results", [])))
+        metrics.inc("hubspot_contact_pages_total")
+        if page_size:
+            size = page_size.size
+            if page_size.observe(time.monotonic() - started, _rate_limit_headroom(response)) != size:
+                metrics.inc("hubspot_page_size_changes_total", direction="up" if page_size.size > size else "down")
+        page += 1
+        after = data.get("paging", {}).get("next", {}).get("after")
+        yield data.get("results", []), after
+        if not after:
+            return
+
+@traced("repository")
+async def fetch_hubspot_items(ctx: VectorShiftContext, access_token: str, url: str, after: str = None,
+                              properties: Sequence[str] = (), page_size: AdaptivePageSize = None) -> List[dict]:
+    """Fetch HubSpot items with pagination through the contacts circuit breaker."""
+    results = []
+    async for page, _ in iter_hubspot_pages(ctx, access_token, url, after, properties, page_size):
+        results.extend(page)
+    return results
+
+
+@traced("repository")
+async def fetch_hubspot_contacts_by_id(ctx: VectorShiftContext, access_token: str, url: str, contact_ids: List[str], properties: Sequence[str]) -> List[dict]:
+    """Fetch specific HubSpot contacts with the batch read API, 100 ids per call."""
     headers = {"Authorization": f"Bearer {access_token}"}
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, headers=headers, params=params)
-        if response.status_code != 200:
-            error(f"Failed to fetch HubSpot items: {response.status_code} - {response.text}")
-            raise HTTPException(status_code=400, detail=f"Fetch failed: {response.text}")
-        
-        data = response.json()
-        results = data.get("results", [])
-        paging = data.get("paging", {}).get("next", {}).get("after")
-        if paging:
-            additional_results = await fetch_hubspot_items(ctx, access_token, url, paging)
-            results.extend(additional_results)
-        return results
\ No newline at end of file
+    results = []
+    for start in range(0, len(contact_ids), 100):
+        body = {"inputs": [{"id": contact_id} for contact_id in contact_ids[start:start + 100]], "properties": list(properties)}
+        with span("hubspot.batch_read", "pagination", offset=start):
+            response = await get_breaker("hubspot", "contacts").request("POST", url, deadline=ctx.deadline, headers=headers, json=body)
+        if response.status_code not in (200, 207):
+            error(f"Failed to batch read HubSpot contacts: {response.status_code} - {response.text}")
+            continue
+        results.extend(response.json().get("results", []))
+    return results
@@ -0,0 +1,29 @@
+from ..middleware.context import VectorShiftContext
+from typing import List, Optional, Tuple
+from ..constants.feed_constants import FEED_CONSTANTS
+from ..utils.tracing import traced
+
+@traced("repository")
+async def append_feed_event(ctx: VectorShiftContext, feed_key: str, data: str, max_events: int, expire: int) -> str:
+    """Append an event to a capped feed stream and announce it to every worker; returns the event id."""
+    async with ctx.redis_client.client.pipeline(transaction=True) as pipe:
+        pipe.xadd(feed_key, {"data": data}, maxlen=max_events, approximate=True)
+        pipe.expire(feed_key, expire)
+        event_id = (await pipe.execute())[0].decode("utf-8")
+    await ctx.redis_client.client.publish(FEED_CONSTANTS.CHANNEL, f"{feed_key}\n{event_id}\n{data}")
+    return event_id
+
+async def read_feed_events(ctx: VectorShiftContext, feed_key: str, after_id: str, count: int) -> List[Tuple[str, str]]:
+    """Events strictly after after_id, oldest first, as (event_id, data) pairs."""
+    entries = await ctx.redis_client.client.xrange(feed_key, min=f"({after_id}", max="+", count=count)
+    return [(event_id.decode("utf-8"), fields[b"data"].decode("utf-8")) for event_id, fields in entries]
+
+async def get_oldest_feed_event_id(ctx: VectorShiftContext, feed_key: str) -> Optional[str]:
+    """Id of the oldest event still retained, or None when the feed is empty or expired."""
+    entries = await ctx.redis_client.client.xrange(feed_key, min="-", max="+", count=1)
+    return entries[0][0].decode("utf-8") if entries else None
+
+async def get_latest_feed_event_id(ctx: VectorShiftContext, feed_key: str) -> Optional[str]:
+    """Id of the newest event, or None when the feed is empty or expired."""
+    entries = await ctx.redis_client.client.xrevrange(feed_key, max="+", min="-", count=1)
+    return entries[0][0].decode("utf-8") if entries else None
\ No newline at end of file
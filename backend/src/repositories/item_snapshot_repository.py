@@ -0,0 +1,228 @@
+from ..middleware.context import VectorShiftContext
+from typing import AsyncIterator, List, Dict, Optional, Tuple
+from ..oplog.oplog import error
+from ..utils.tracing import traced
+from ..utils.snapshot_codec import SNAPSHOT_FORMAT, encode_chunk, decode_chunk, chunk_id
+from ..config.config import config
+import asyncio
+import json
+import zlib
+
+# Snapshots are stored as a manifest at the snapshot key listing content-addressed chunk keys.
+# Rewrites only upload chunks whose content changed; chunks a rewrite drops linger for
+# SNAPSHOT_CHUNK_GRACE seconds so readers holding the previous manifest can finish.
+
+class SnapshotChangedError(Exception):
+    """A chunk listed in the manifest vanished, because the snapshot was rewritten mid-read."""
+
+def _chunk_key(key: str, chunk: str) -> str:
+    return f"{key}:chunk:{chunk}"
+
+def _fingerprints_key(key: str) -> str:
+    return f"{key}:fingerprints"
+
+def _parse_manifest(value: bytes) -> Tuple[Optional[Dict], Optional[List[Dict]]]:
+    """Split a stored value into (manifest, None), or (None, items) for a legacy JSON list."""
+    document = json.loads(value)
+    if isinstance(document, dict) and document.get("format") == SNAPSHOT_FORMAT:
+        return document, None
+    return None, document
+
+async def _encode_items(items: List[Dict]) -> List[Tuple[str, bytes]]:
+    chunks = []
+    size = config.SNAPSHOT_CHUNK_ITEMS
+    for start in range(0, len(items), size):
+        blob = encode_chunk(items[start:start + size], config.SNAPSHOT_COMPRESSION_LEVEL)
+        chunks.append((chunk_id(blob), blob))
+        # Let other requests run between chunks of a large snapshot
+        await asyncio.sleep(0)
+    return chunks
+
+def _queue_write(pipe, key: str, previous: List[str], chunks: List[Tuple[str, bytes]], count: int, expire: int):
+    ids = [chunk for chunk, _ in chunks]
+    for chunk, blob in chunks:
+        if chunk in previous:
+            pipe.expire(_chunk_key(key, chunk), expire)
+        else:
+            pipe.set(_chunk_key(key, chunk), blob, ex=expire)
+    pipe.set(key, json.dumps({"format": SNAPSHOT_FORMAT, "count": count, "chunks": ids}), ex=expire)
+    for chunk in set(previous) - set(ids):
+        pipe.expire(_chunk_key(key, chunk), config.SNAPSHOT_CHUNK_GRACE)
+
+@traced("repository")
+async def store_item_snapshot(ctx: VectorShiftContext, key: str, items: List[Dict], expire: int,
+                              fingerprints: Optional[Dict[str, str]] = None) -> Optional[Dict[str, str]]:
+    """Store the last good item list for a provider so it can be served while the provider is down.
+
+    With fingerprints (item id -> item_fingerprint), they replace the ones kept next to the snapshot
+    in the same transaction, and the replaced ones are returned; None when there were none.
+    """
+    fingerprints_key = _fingerprints_key(key)
+    previous_fingerprints = None
+    try:
+        chunks = await _encode_items(items)
+        blob = zlib.compress(json.dumps(fingerprints, separators=(",", ":")).encode("utf-8")) if fingerprints is not None else None
+
+        async def write(pipe):
+            nonlocal previous_fingerprints
+            value = await pipe.get(key)
+            manifest = _parse_manifest(value)[0] if value else None
+            previous_blob = await pipe.get(fingerprints_key) if blob is not None else None
+            previous_fingerprints = json.loads(zlib.decompress(previous_blob)) if previous_blob else None
+            pipe.multi()
+            _queue_write(pipe, key, manifest["chunks"] if manifest else [], chunks, len(items), expire)
+            if blob is not None:
+                pipe.set(fingerprints_key, blob, ex=expire)
+
+        await ctx.redis_client.client.transaction(write, key, fingerprints_key)
+    except Exception as e:
+        error(f"Failed to store item snapshot {key}: {str(e)}")
+        return None
+    return previous_fingerprints
+
+async def iter_item_snapshot(ctx: VectorShiftContext, key: str) -> AsyncIterator[List[Dict]]:
+    """Yield a stored snapshot chunk by chunk, fetching the next chunk while the current one is decoded."""
+    client = ctx.redis_client.client
+    value = await client.get(key)
+    if not value:
+        return
+    manifest, items = _parse_manifest(value)
+    if manifest is None:
+        yield items
+        return
+    chunks = manifest["chunks"]
+    if not chunks:
+        yield []
+        return
+    pending = asyncio.ensure_future(client.get(_chunk_key(key, chunks[0])))
+    try:
+        for index in range(len(chunks)):
+            blob = await pending
+            if blob is None:
+                raise SnapshotChangedError(key)
+            if index + 1 < len(chunks):
+                pending = asyncio.ensure_future(client.get(_chunk_key(key, chunks[index + 1])))
+            yield decode_chunk(blob)
+    finally:
+        pending.cancel()
+
+@traced("repository")
+async def get_item_snapshot(ctx: VectorShiftContext, key: str) -> Optional[List[Dict]]:
+    """Retrieve the last good item list, or None when there is none."""
+    for _ in range(2):
+        items = None
+        try:
+            async for chunk in iter_item_snapshot(ctx, key):
+                if items is None:
+                    items = chunk
+                else:
+                    items.extend(chunk)
+            return items
+        except SnapshotChangedError:
+            continue
+        except Exception as e:
+            error(f"Failed to read item snapshot {key}: {str(e)}")
+            return None
+    error(f"Item snapshot {key} kept changing while being read")
+    return None
+
+@traced("repository")
+async def index_item_snapshot(ctx: VectorShiftContext, index_key: str, snapshot_key: str, token_key: str, access_token: str, token_expire: int, expire: int) -> None:
+    """Record which snapshot belongs to a provider account, plus a token the webhook processor can use to refetch changes."""
+    try:
+        async with ctx.redis_client.client.pipeline(transaction=False) as pipe:
+            pipe.sadd(index_key, snapshot_key)
+            pipe.expire(index_key, expire)
+            pipe.set(token_key, access_token, ex=token_expire)
+            await pipe.execute()
+        await ctx.redis_client.invalidate(token_key)
+    except Exception as e:
+        error(f"Failed to index item snapshot {snapshot_key}: {str(e)}")
+
+async def get_indexed_snapshot_keys(ctx: VectorShiftContext, index_key: str) -> List[str]:
+    """List the snapshot keys registered for a provider account."""
+    members = await ctx.redis_client.client.smembers(index_key)
+    return [member.decode("utf-8") for member in members]
+
+def _merge_chunk(items: List[Dict], upserts: Dict[str, Dict], deletes: set) -> Optional[List[Dict]]:
+    """Apply changes to one chunk's items, consuming matched upserts; None when nothing in it changed."""
+    changed = False
+    merged = []
+    for item in items:
+        if item["id"] in deletes:
+            changed = True
+        elif item["id"] in upserts:
+            merged.append({**item, **upserts.pop(item["id"])})
+            changed = True
+        else:
+            merged.append(item)
+    return merged if changed else None
+
+@traced("repository")
+async def apply_item_changes(ctx: VectorShiftContext, key: str, upserts: List[Dict], deletes: List[str], expire: int) -> bool:
+    """Merge upserts into and drop deletes from a stored snapshot atomically; returns False when the snapshot no longer exists or is missing a chunk.
+
+    Only chunks holding changed items are re-encoded and uploaded; new items fill the last chunk.
+    """
+    applied = False
+
+    async def update(pipe):
+        nonlocal applied
+        value = await pipe.get(key)
+        if not value:
+            applied = False
+            return
+        pending = {item["id"]: item for item in upserts}
+        deleted = set(deletes)
+        manifest, legacy_items = _parse_manifest(value)
+        if manifest is None:
+            previous = []
+            merged = _merge_chunk(legacy_items, pending, deleted)
+            entries = [legacy_items if merged is None else merged]
+        else:
+            previous = manifest["chunks"]
+            blobs = await pipe.mget([_chunk_key(key, chunk) for chunk in previous]) if previous else []
+            if any(blob is None for blob in blobs):
+                # The manifest is unchanged (it is watched), so the chunk expired and the snapshot can
+                # no longer be read; drop it like an expired one and let the next fetch rebuild it
+                error(f"Item snapshot {key} lost a chunk; dropping it")
+                pipe.multi()
+                pipe.delete(key)
+                applied = False
+                return
+            # Unchanged chunks stay (id, blob); changed ones become item lists to re-encode
+            entries = []
+            for chunk, blob in zip(previous, blobs):
+                items = decode_chunk(blob)
+                merged = _merge_chunk(items, pending, deleted)
+                entries.append((chunk, blob, len(items)) if merged is None else merged)
+        if pending:
+            last = entries[-1] if entries else []
+            if isinstance(last, tuple):
+                last = decode_chunk(last[1])
+            if len(last) < config.SNAPSHOT_CHUNK_ITEMS:
+                entries[-1:] = [last + list(pending.values())]
+            else:
+                entries.append(list(pending.values()))
+        chunks, count = [], 0
+        for entry in entries:
+            if isinstance(entry, tuple):
+                chunks.append(entry[:2])
+                count += entry[2]
+            elif entry:
+                chunks.extend(await _encode_items(entry))
+                count += len(entry)
+        pipe.multi()
+        _queue_write(pipe, key, previous, chunks, count, expire)
+        applied = True
+
+    await ctx.redis_client.client.transaction(update, key)
+    return applied
+
+async def remove_snapshot_from_index(ctx: VectorShiftContext, index_key: str, snapshot_key: str) -> None:
+    await ctx.redis_client.client.srem(index_key, snapshot_key)
+
+async def get_webhook_token(ctx: VectorShiftContext, key: str) -> Optional[str]:
+    """Retrieve the access token registered for a provider account, if it has not expired."""
+    value = await ctx.redis_client.get(key)
+    return value.decode("utf-8") if value else None
@@ -1,7 +1,11 @@
 from ..middleware.context import VectorShiftContext
-from typing import List, Dict
+from fastapi import HTTPException
+from typing import AsyncIterator, List, Dict, Optional, Tuple
 from ..oplog.oplog import error
-import httpx
+from ..utils.circuit_breaker import get_breaker
+from ..utils.deadline import DeadlineExceededError
+from ..utils.rate_limiter import RateLimiter
+from ..utils.tracing import span, traced
 
 async def store_credentials(ctx: VectorShiftContext, key: str, value: str, expire: int = 600):
     """Store a value in Redis with an optional expiration time."""
@@ -14,18 +18,87 @@ async def get_credentials(ctx: VectorShiftContext, key: str) -> str:
         await ctx.redis_client.delete(key)
     return value
 
-async def fetch_notion_items(ctx: VectorShiftContext, access_token: str, url: str) -> List[Dict]:
-    """Fetch Notion items via the search API."""
+async def iter_notion_search_pages(ctx: VectorShiftContext, access_token: str, url: str, cursor: str = None,
+                                   limiter: RateLimiter = None) -> AsyncIterator[Tuple[List[Dict], Optional[str]]]:
+    """Yield pages of Notion search results with the cursor of the page after each, waiting for limiter before each request.
+
+    Stops with DeadlineExceededError, carrying the cursor of the unfetched page, once ctx's deadline passes.
+    """
     headers = {
         "Authorization": f"Bearer {access_token}",
         "Notion-Version": "2022-06-28",
         "Content-Type": "application/json",
     }
-    async with ctx.redis_client.client.get() as session:
-        async with session.post(url, headers=headers) as response:
-            if response.status == 200:
-                data = await response.json()
-                return data.get("results", [])
-            else:
-                error(f"Failed to fetch Notion items: {response.status}")
-                return []
\ No newline at end of file
+    page = 0
+    while True:
+        body = {"start_cursor": cursor} if cursor else None
+        if limiter is not None:
+            await limiter.acquire()
+        with span("notion.search_page", "pagination", page=page):
+            try:
+                response = await get_breaker("notion", "search").request("POST", url, deadline=ctx.deadline, headers=headers, json=body)
+            except DeadlineExceededError as e:
+                e.cursor = cursor
+                raise
+        if response.status_code != 200:
+            error(f"Failed to fetch Notion items: {response.status_code} - {response.text}")
+            # 401/403 mean the token was revoked or lacks a scope, which the client fixes by reconnecting
+            raise HTTPException(status_code=response.status_code if response.status_code in (401, 403) else 400, detail=f"Fetch failed: {response.status_code}")
+        data = response.json()
+        page += 1
+        cursor = data.get("next_cursor") if data.get("has_more") else None
+        yield data.get("results", []), cursor
+        if not cursor:
+            return
+
+@traced("repository")
+async def fetch_notion_items(ctx: VectorShiftContext, access_token: str, url: str, limiter: RateLimiter = None) -> List[Dict]:
+    """Fetch Notion items via the search API."""
+    results = []
+    async for page, _ in iter_notion_search_pages(ctx, access_token, url, limiter=limiter):
+        results.extend(page)
+    return results
+
+@traced("repository")
+async def fetch_notion_object(ctx: VectorShiftContext, access_token: str, url: str, object_id: str) -> Optional[Dict]:
+    """Fetch a single Notion page or database by id."""
+    headers = {
+        "Authorization": f"Bearer {access_token}",
+        "Notion-Version": "2022-06-28",
+    }
+    response = await get_breaker("notion", "objects").request("GET", f"{url}/{object_id}", deadline=ctx.deadline, headers=headers)
+    if response.status_code == 200:
+        return response.json()
+    error(f"Failed to fetch Notion object {object_id}: {response.status_code}")
+    return None
+
+
+async def fetch_notion_block_children(ctx: VectorShiftContext, access_token: str, url: str, block_id: str, page_size: int, cursor: str = None) -> Tuple[List[Dict], Optional[str]]:
+    """Fetch one page of a block's children, returning them with the cursor of the next page."""
+    headers = {
+        "Authorization": f"Bearer {access_token}",
+        "Notion-Version": "2022-06-28",
+    }
+    params = {"page_size": page_size}
+    if cursor:
+        params["start_cursor"] = cursor
+    response = await get_breaker("notion", "blocks").request("GET", f"{url}/{block_id}/children", deadline=ctx.deadline, headers=headers, params=params)
+    if response.status_code != 200:
+        error(f"Failed to fetch Notion block children of {block_id}: {response.status_code}")
+        raise HTTPException(status_code=400, detail=f"Fetch failed for block {block_id}: {response.status_code}")
+    data = response.json()
+    return data.get("results", []), data.get("next_cursor") if data.get("has_more") else None
+
+async def get_crawled_versions(ctx: VectorShiftContext, key: str, page_ids: List[str]) -> Dict[str, str]:
+    """The last_edited_time each page had when its content was last crawled."""
+    if not page_ids:
+        return {}
+    values = await ctx.redis_client.client.hmget(key, page_ids)
+    return {page_id: value.decode("utf-8") for page_id, value in zip(page_ids, values) if value}
+
+async def store_crawled_version(ctx: VectorShiftContext, key: str, page_id: str, last_edited_time: str, expire: int) -> None:
+    """Record the last_edited_time a page had when its content was crawled."""
+    async with ctx.redis_client.client.pipeline(transaction=False) as pipe:
+        pipe.hset(key, page_id, last_edited_time)
+        pipe.expire(key, expire)
+        await pipe.execute()
\ No newline at end of file
@@ -0,0 +1,111 @@
+import asyncio
+import json
+import os
+import re
+import secrets
+import time
+from typing import Any, Dict, List, Optional
+from ..db.connection import RedisClient
+from ..constants.profile_constants import PROFILE_CONSTANTS
+from ..config.config import config
+from ..oplog.oplog import error
+
+CAPTURE_ID_PATTERN = re.compile(r"[0-9a-f]{16}")
+
+def _capture_path(kind: str, capture_id: str) -> str:
+    return os.path.join(config.PROFILE_DIR, f"{kind}-{capture_id}.json")
+
+def _meta_path(kind: str, capture_id: str) -> str:
+    # Listing reads only these, not whole captures
+    return os.path.join(config.PROFILE_DIR, f"{kind}-{capture_id}.meta")
+
+def _replace(path: str, document: str) -> None:
+    """Write through a temporary file so readers never see a partial document."""
+    temporary = f"{path}.{secrets.token_hex(4)}.tmp"
+    with open(temporary, "w") as f:
+        f.write(document)
+    os.replace(temporary, path)
+
+def _write_capture(kind: str, meta: Dict, document: str) -> None:
+    os.makedirs(config.PROFILE_DIR, exist_ok=True)
+    _replace(_capture_path(kind, meta["id"]), document)
+    # The capture is complete before it can be listed
+    _replace(_meta_path(kind, meta["id"]), json.dumps(meta))
+
+def _read_capture(path: str) -> Optional[Dict]:
+    try:
+        if os.path.getmtime(path) < time.time() - config.PROFILE_TTL:
+            return None
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def _list_disk_captures(kind: str) -> List[Dict]:
+    if not os.path.isdir(config.PROFILE_DIR):
+        return []
+    cutoff = time.time() - config.PROFILE_TTL
+    captures = []
+    for name in os.listdir(config.PROFILE_DIR):
+        path = os.path.join(config.PROFILE_DIR, name)
+        # Files can be replaced or removed by concurrent requests at any point
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                continue
+            if name.startswith(f"{kind}-") and name.endswith(".meta"):
+                with open(path) as f:
+                    captures.append(json.load(f))
+        except (FileNotFoundError, json.JSONDecodeError):
+            continue
+    captures.sort(key=lambda capture: capture["started_at"], reverse=True)
+    return captures[:PROFILE_CONSTANTS.LIST_LIMIT]
+
+async def store_capture(kind: str, meta: Dict, payload: Any) -> None:
+    """Persist a profile or trace in Redis or under PROFILE_DIR, expiring after PROFILE_TTL.
+
+    Disk storage reads and writes run in a thread, off the event loop of the request being captured.
+    """
+    document = json.dumps({**meta, "payload": payload})
+    try:
+        if config.PROFILE_STORAGE == "disk":
+            await asyncio.to_thread(_write_capture, kind, meta, document)
+            return
+        key_prefix, index_key = PROFILE_CONSTANTS.KINDS[kind]
+        client = RedisClient.get_instance().client
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.set(f"{key_prefix}:{meta['id']}", document, ex=config.PROFILE_TTL)
+            pipe.zadd(index_key, {meta["id"]: meta["started_at"]})
+            pipe.zremrangebyscore(index_key, 0, time.time() - config.PROFILE_TTL)
+            await pipe.execute()
+    except Exception as e:
+        error(f"Failed to store {kind} {meta['id']}: {str(e)}")
+
+async def get_capture(kind: str, capture_id: str) -> Optional[Dict]:
+    """Load a stored capture, or None when it is missing or expired."""
+    if not CAPTURE_ID_PATTERN.fullmatch(capture_id):
+        return None
+    if config.PROFILE_STORAGE == "disk":
+        return await asyncio.to_thread(_read_capture, _capture_path(kind, capture_id))
+    key_prefix, _ = PROFILE_CONSTANTS.KINDS[kind]
+    value = await RedisClient.get_instance().client.get(f"{key_prefix}:{capture_id}")
+    return json.loads(value) if value else None
+
+async def list_captures(kind: str) -> List[Dict]:
+    """Metadata of the most recent unexpired captures of a kind, newest first."""
+    if config.PROFILE_STORAGE == "disk":
+        captures = await asyncio.to_thread(_list_disk_captures, kind)
+    else:
+        key_prefix, index_key = PROFILE_CONSTANTS.KINDS[kind]
+        client = RedisClient.get_instance().client
+        ids = await client.zrevrangebyscore(
+            index_key, "+inf", time.time() - config.PROFILE_TTL,
+            start=0, num=PROFILE_CONSTANTS.LIST_LIMIT,
+        )
+        if not ids:
+            return []
+        values = await client.mget([f"{key_prefix}:{capture_id.decode('utf-8')}" for capture_id in ids])
+        captures = [json.loads(value) for value in values if value]
+    for capture in captures:
+        capture.pop("payload", None)
+    return captures
\ No newline at end of file
@@ -1,8 +1,19 @@
 from fastapi.responses import HTMLResponse
 from ..middleware.context import VectorShiftContext
 from ..models.integration_item import IntegrationItem
-from ..repositories.airtable_repository import store_credentials, get_credentials, fetch_airtable_items
-from typing import List, Dict
+from ..repositories.airtable_repository import (
+    store_credentials,
+    get_credentials,
+    iter_airtable_base_pages,
+    fetch_airtable_tables,
+    fetch_airtable_webhook_payloads,
+    get_base_schemas,
+    store_base_schemas,
+    bump_base_schema_version,
+)
+from ..repositories.item_snapshot_repository import get_webhook_token
+from .item_snapshot_service import load_items_with_fallback, index_for_webhooks
+from typing import AsyncIterator, List, Dict, Optional, Tuple
 from datetime import datetime
 import secrets
 import base64
@@ -10,10 +21,15 @@ import hashlib
 import json
 from fastapi import HTTPException, Request
 import asyncio
-import httpx
+import time
 from ..oplog.oplog import info, error
+from ..oplog.metrics import metrics
 from ..config.config import config
 from ..constants.airtable_constants import AIRTABLE_CONSTANTS
+from ..utils.http_client import HttpClient
+from ..utils.oauth_state import issue_state, consume_state
+from ..utils.deadline import DeadlineExceededError, encode_cursor, decode_cursor
+from ..utils.tracing import traced
 
 def create_integration_item_metadata_object(response_json: Dict, item_type: str, parent_id: str = None, parent_name: str = None) -> IntegrationItem:
     """Creates an integration metadata object from the Airtable API response."""
@@ -31,14 +47,17 @@ async def authorize_airtable(ctx: VectorShiftContext) -> str:
     """Authorize Airtable OAuth flow and return the authorization URL."""
     if not ctx.user_id or not ctx.org_id:
         raise HTTPException(status_code=400, detail="user_id and org_id are required")
-    state_data = {"state": secrets.token_urlsafe(32), "user_id": ctx.user_id, "org_id": ctx.org_id}
-    encoded_state = base64.urlsafe_b64encode(json.dumps(state_data).encode("utf-8")).decode("utf-8")
-
     code_verifier = secrets.token_urlsafe(32)
     m = hashlib.sha256()
     m.update(code_verifier.encode("utf-8"))
     code_challenge = base64.urlsafe_b64encode(m.digest()).decode("utf-8").replace("=", "")
 
+    if config.OAUTH_STATELESS_STATE:
+        encoded_state = issue_state("airtable", ctx.user_id, ctx.org_id, code_verifier)
+    else:
+        state_data = {"state": secrets.token_urlsafe(32), "user_id": ctx.user_id, "org_id": ctx.org_id}
+        encoded_state = base64.urlsafe_b64encode(json.dumps(state_data).encode("utf-8")).decode("utf-8")
+
     auth_url = (
         f"{AIRTABLE_CONSTANTS.AUTHORIZATION_URL}"
         f"?client_id={config.AIRTABLE_CLIENT_ID}"
@@ -51,10 +70,11 @@ async def authorize_airtable(ctx: VectorShiftContext) -> str:
         f"&scope={AIRTABLE_CONSTANTS.SCOPE}"
     )
     
-    await asyncio.gather(
-        store_credentials(ctx, f"{AIRTABLE_CONSTANTS.STATE_KEY_PREFIX}:{ctx.org_id}:{ctx.user_id}", json.dumps(state_data), AIRTABLE_CONSTANTS.REDIS_EXPIRE_TIME),
-        store_credentials(ctx, f"{AIRTABLE_CONSTANTS.VERIFIER_KEY_PREFIX}:{ctx.org_id}:{ctx.user_id}", code_verifier, AIRTABLE_CONSTANTS.REDIS_EXPIRE_TIME),
-    )
+    if not config.OAUTH_STATELESS_STATE:
+        await asyncio.gather(
+            store_credentials(ctx, f"{AIRTABLE_CONSTANTS.STATE_KEY_PREFIX}:{ctx.org_id}:{ctx.user_id}", json.dumps(state_data), AIRTABLE_CONSTANTS.REDIS_EXPIRE_TIME),
+            store_credentials(ctx, f"{AIRTABLE_CONSTANTS.VERIFIER_KEY_PREFIX}:{ctx.org_id}:{ctx.user_id}", code_verifier, AIRTABLE_CONSTANTS.REDIS_EXPIRE_TIME),
+        )
     info(f"Generated authorization URL for user {ctx.user_id} and org {ctx.org_id}")
     return auth_url
 
@@ -69,31 +89,36 @@ async def oauth2callback_airtable(ctx: VectorShiftContext, request: Request) ->
         if not code or not encoded_state:
             raise HTTPException(status_code=400, detail="Missing code or state")
 
-        state_data = json.loads(base64.urlsafe_b64decode(encoded_state.encode("utf-8")).decode("utf-8"))
-        saved_state, code_verifier = await asyncio.gather(
-            get_credentials(ctx, f"{AIRTABLE_CONSTANTS.STATE_KEY_PREFIX}:{state_data['org_id']}:{state_data['user_id']}"),
-            get_credentials(ctx, f"{AIRTABLE_CONSTANTS.VERIFIER_KEY_PREFIX}:{state_data['org_id']}:{state_data['user_id']}"),
-        )
+        if config.OAUTH_STATELESS_STATE:
+            state_data = await consume_state(ctx.redis_client, "airtable", encoded_state, AIRTABLE_CONSTANTS.NONCE_KEY_PREFIX, AIRTABLE_CONSTANTS.REDIS_EXPIRE_TIME)
+            code_verifier = state_data["code_verifier"]
+        else:
+            state_data = json.loads(base64.urlsafe_b64decode(encoded_state.encode("utf-8")).decode("utf-8"))
+            saved_state, code_verifier = await asyncio.gather(
+                get_credentials(ctx, f"{AIRTABLE_CONSTANTS.STATE_KEY_PREFIX}:{state_data['org_id']}:{state_data['user_id']}"),
+                get_credentials(ctx, f"{AIRTABLE_CONSTANTS.VERIFIER_KEY_PREFIX}:{state_data['org_id']}:{state_data['user_id']}"),
+            )
 
-        if not saved_state or state_data["state"] != json.loads(saved_state)["state"]:
-            raise HTTPException(status_code=400, detail="State does not match")
+            if not saved_state or state_data["state"] != json.loads(saved_state)["state"]:
+                raise HTTPException(status_code=400, detail="State does not match")
+            if isinstance(code_verifier, bytes):
+                code_verifier = code_verifier.decode("utf-8")
 
         encoded_client_id_secret = base64.b64encode(f"{config.AIRTABLE_CLIENT_ID}:{config.AIRTABLE_CLIENT_SECRET}".encode()).decode()
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                AIRTABLE_CONSTANTS.TOKEN_URL,
-                data={
-                    "grant_type": "authorization_code",
-                    "code": code,
-                    "redirect_uri": AIRTABLE_CONSTANTS.REDIRECT_URI,
-                    "client_id": config.AIRTABLE_CLIENT_ID,
-                    "code_verifier": code_verifier, 
-                },
-                headers={
-                    "Authorization": f"{AIRTABLE_CONSTANTS.AUTH_HEADER} {encoded_client_id_secret}",
-                    "Content-Type": AIRTABLE_CONSTANTS.CONTENT_TYPE,
-                },
-            )
+        response = await HttpClient.get_instance().client.post(
+            AIRTABLE_CONSTANTS.TOKEN_URL,
+            data={
+                "grant_type": "authorization_code",
+                "code": code,
+                "redirect_uri": AIRTABLE_CONSTANTS.REDIRECT_URI,
+                "client_id": config.AIRTABLE_CLIENT_ID,
+                "code_verifier": code_verifier, 
+            },
+            headers={
+                "Authorization": f"{AIRTABLE_CONSTANTS.AUTH_HEADER} {encoded_client_id_secret}",
+                "Content-Type": AIRTABLE_CONSTANTS.CONTENT_TYPE,
+            },
+        )
 
         if response.status_code != 200:
             raise HTTPException(status_code=400, detail=f"Token exchange failed: {response.text}")
@@ -121,40 +146,175 @@ async def get_airtable_credentials(ctx: VectorShiftContext) -> dict:
         raise HTTPException(status_code=400, detail="No credentials found")
     return json.loads(credentials)
 
-async def get_items_airtable(ctx: VectorShiftContext, credentials: dict) -> List[IntegrationItem]:
-    """Fetch and transform Airtable items into IntegrationItem objects."""
+def _schema_fingerprint(base: Dict, version: Optional[str]) -> str:
+    """What a cached table schema was fetched against: the base's list entry and its schema version."""
+    return hashlib.sha1(json.dumps([base, version], sort_keys=True).encode("utf-8")).hexdigest()
+
+class _SchemaPass:
+    """Decides, one page of the base list at a time, which bases need their tables refetched.
+
+    A base's cached tables are reused while its list entry (name, permission level) and schema
+    version are unchanged and the copy is younger than AIRTABLE_SCHEMA_MAX_AGE. Webhook payloads
+    that create, rename or destroy tables bump the version. With refresh every base is refetched.
+    """
+
+    def __init__(self, ctx: VectorShiftContext, access_token: str, refresh: bool = False):
+        self.ctx = ctx
+        self.access_token = access_token
+        self.refresh = refresh
+        self.key = f"{AIRTABLE_CONSTANTS.SCHEMA_KEY_PREFIX}:{ctx.org_id}:{ctx.user_id}"
+        self.schemas: Dict[str, Dict] = {}
+        self.versions: Dict[str, str] = {}
+        self.refreshed: Dict[str, Dict] = {}
+
+    async def load(self, bases: List[Dict]):
+        try:
+            self.schemas, self.versions = await get_base_schemas(
+                self.ctx, self.key, AIRTABLE_CONSTANTS.SCHEMA_VERSION_PREFIX, [base.get("id") for base in bases]
+            )
+        except Exception as e:
+            error(f"Failed to read cached Airtable schemas: {str(e)}")
+            self.schemas, self.versions = {}, {}
+
+    async def save(self):
+        try:
+            await store_base_schemas(self.ctx, self.key, self.refreshed, config.ITEMS_SNAPSHOT_EXPIRE_TIME)
+        except Exception as e:
+            error(f"Failed to cache Airtable schemas: {str(e)}")
+        self.refreshed = {}
+
+    async def base_items(self, base: Dict) -> List[Dict]:
+        """A base and its tables as IntegrationItem dicts."""
+        schema = self.schemas.get(base.get("id"))
+        fingerprint = _schema_fingerprint(base, self.versions.get(base.get("id")))
+        if not self.refresh and schema and schema["fingerprint"] == fingerprint and time.time() - schema["fetched_at"] < config.AIRTABLE_SCHEMA_MAX_AGE:
+            tables = schema["tables"]
+            metrics.inc("airtable_schema_bases_total", result="skipped")
+        else:
+            # Fetch tables for each base
+            tables = await fetch_airtable_tables(self.ctx, self.access_token, AIRTABLE_CONSTANTS.BASES_API_URL, base.get("id"))
+            if tables is None:
+                # Keep listing the last known tables rather than dropping them
+                tables = schema["tables"] if schema else []
+                metrics.inc("airtable_schema_bases_total", result="failed")
+            else:
+                tables = [{"id": table.get("id"), "name": table.get("name")} for table in tables]
+                self.refreshed[base.get("id")] = {"fingerprint": fingerprint, "fetched_at": time.time(), "tables": tables}
+                metrics.inc("airtable_schema_bases_total", result="refreshed")
+        items = [create_integration_item_metadata_object(base, "Base").model_dump(mode="json")]
+        for table in tables:
+            items.append(
+                create_integration_item_metadata_object(
+                    table,
+                    "Table",
+                    base.get("id"),
+                    base.get("name"),
+                ).model_dump(mode="json")
+            )
+        return items
+
+@traced("service")
+async def get_items_airtable(ctx: VectorShiftContext, credentials: dict, cursor: Optional[str] = None, refresh: bool = False) -> List[Dict]:
+    """Fetch and transform Airtable items into IntegrationItem dicts, resuming from cursor when given.
+
+    Table schemas come from the per-base cache unless a base changed; refresh refetches them all.
+
+    When ctx's deadline passes, the bases completed so far (with their tables) are returned with
+    ctx.partial set and ctx.cursor pointing at the first unfinished base.
+    """
     if not ctx.user_id or not ctx.org_id:
         raise HTTPException(status_code=400, detail="user_id and org_id are required")
     access_token = credentials.get("access_token")
     if not access_token:
         raise HTTPException(status_code=400, detail="No access token in credentials")
+    position = decode_cursor(cursor)
     
-    list_of_responses = []
-    await fetch_airtable_items(ctx, access_token, AIRTABLE_CONSTANTS.BASES_API_URL, list_of_responses)
-    list_of_integration_item_metadata = []
+    async def load_items() -> List[Dict]:
+        list_of_integration_item_metadata = []
+        # The page of bases to resume at and how many of its bases are already done
+        offset, skip = position.get("offset"), int(position.get("skip", 0))
+        resume = {"offset": offset, "skip": skip}
+        schema_pass = _SchemaPass(ctx, access_token, refresh)
+        try:
+            async for bases, next_offset in iter_airtable_base_pages(ctx, access_token, AIRTABLE_CONSTANTS.BASES_API_URL, offset):
+                await schema_pass.load(bases[skip:])
+                try:
+                    for index, response in enumerate(bases[skip:], skip):
+                        resume = {"offset": offset, "skip": index}
+                        list_of_integration_item_metadata.extend(await schema_pass.base_items(response))
+                finally:
+                    await schema_pass.save()
+                offset, skip = next_offset, 0
+                resume = {"offset": offset, "skip": 0}
+        except DeadlineExceededError:
+            ctx.partial, ctx.cursor = True, encode_cursor(resume)
+        return list_of_integration_item_metadata
     
-    for response in list_of_responses:
-        list_of_integration_item_metadata.append(
-            create_integration_item_metadata_object(response, "Base")
+    list_of_integration_item_metadata = await load_items_with_fallback(ctx, AIRTABLE_CONSTANTS.ITEMS_KEY_PREFIX, load_items, resumed=bool(cursor))
+    base_ids = [item["id"][:-len("_Base")] for item in list_of_integration_item_metadata if item["type"] == "Base"]
+    # A resumed fetch returns only the tail of the items, so no snapshot was stored to index
+    if not cursor:
+        await index_for_webhooks(ctx, AIRTABLE_CONSTANTS.ITEMS_KEY_PREFIX, AIRTABLE_CONSTANTS.WEBHOOK_INDEX_PREFIX, AIRTABLE_CONSTANTS.WEBHOOK_TOKEN_PREFIX, base_ids, credentials)
+    info(f"Fetched {len(list_of_integration_item_metadata)} Airtable items for user {ctx.user_id}")
+    return list_of_integration_item_metadata
+
+async def iter_airtable_item_pages(ctx: VectorShiftContext, credentials: dict, cursor: Optional[str] = None) -> AsyncIterator[Tuple[List[Dict], Optional[str]]]:
+    """Yield each page of Airtable bases, with their tables, as IntegrationItem dicts and the offset of the page following it."""
+    access_token = credentials.get("access_token")
+    if not access_token:
+        raise HTTPException(status_code=400, detail="No access token in credentials")
+    schema_pass = _SchemaPass(ctx, access_token)
+    async for bases, offset in iter_airtable_base_pages(ctx, access_token, AIRTABLE_CONSTANTS.BASES_API_URL, cursor):
+        await schema_pass.load(bases)
+        items = []
+        try:
+            for base in bases:
+                items.extend(await schema_pass.base_items(base))
+        finally:
+            await schema_pass.save()
+        yield items, offset
+
+@traced("service")
+async def resolve_airtable_webhook_changes(ctx: VectorShiftContext, base_id: str, notifications: List[Dict]) -> Tuple[List[Dict], List[str]]:
+    """Pull the pending payloads behind a batch of notifications for one base and reduce them to table upserts and deletes.
+
+    Airtable notifications only announce that payloads exist, so the payloads are fetched
+    with the base's registered token, resuming from the stored cursor of each webhook.
+    """
+    access_token = await get_webhook_token(ctx, f"{AIRTABLE_CONSTANTS.WEBHOOK_TOKEN_PREFIX}:{base_id}")
+    if not access_token:
+        error(f"No access token for Airtable base {base_id}; changes wait for the next crawl")
+        return [], []
+
+    upserts, deleted = {}, set()
+    schema_changed = False
+    for webhook_id in sorted({notification.get("webhook", {}).get("id") for notification in notifications} - {None}):
+        cursor_key = f"{AIRTABLE_CONSTANTS.WEBHOOK_CURSOR_PREFIX}:{webhook_id}"
+        cursor = await ctx.redis_client.get(cursor_key)
+        payloads, next_cursor = await fetch_airtable_webhook_payloads(
+            ctx,
+            access_token,
+            AIRTABLE_CONSTANTS.WEBHOOK_PAYLOADS_URL.format(base_id=base_id, webhook_id=webhook_id),
+            int(cursor) if cursor else None,
         )
-        # Fetch tables for each base
-        async with httpx.AsyncClient() as client:
-            tables_response = await client.get(
-                f"{AIRTABLE_CONSTANTS.BASES_API_URL}/{response.get('id')}/tables",
-                headers={"Authorization": f"Bearer {access_token}"},
+        for payload in payloads:
+            schema_changed = schema_changed or bool(
+                payload.get("destroyedTableIds") or payload.get("createdTablesById")
+                or any("changedMetadata" in change for change in payload.get("changedTablesById", {}).values())
             )
-            if tables_response.status_code == 200:
-                tables_data = tables_response.json()
-                for table in tables_data.get("tables", []):
-                    list_of_integration_item_metadata.append(
-                        create_integration_item_metadata_object(
-                            table,
-                            "Table",
-                            response.get("id"),
-                            response.get("name"),
-                        )
-                    )
-    
-    info(f"Fetched {len(list_of_integration_item_metadata)} Airtable items for user {ctx.user_id}")
-    print(f"list_of_integration_item_metadata: {list_of_integration_item_metadata}")
-    return list_of_integration_item_metadata
\ No newline at end of file
+            for table_id in payload.get("destroyedTableIds", []):
+                deleted.add(f"{table_id}_Table")
+                upserts.pop(f"{table_id}_Table", None)
+            tables = {table_id: change.get("metadata", {}) for table_id, change in payload.get("createdTablesById", {}).items()}
+            tables.update({table_id: change.get("changedMetadata", {}).get("current", {}) for table_id, change in payload.get("changedTablesById", {}).items()})
+            for table_id, metadata in tables.items():
+                item = create_integration_item_metadata_object({"id": table_id, "name": metadata.get("name")}, "Table", base_id)
+                # Only send the fields the payload actually carries so the stored base name and table name survive
+                upserts[item.id] = item.model_dump(mode="json", include={"id", "type", "parent_id"} | ({"name"} if metadata.get("name") else set()))
+                deleted.discard(item.id)
+        if next_cursor:
+            await ctx.redis_client.set(cursor_key, str(next_cursor), config.ITEMS_SNAPSHOT_EXPIRE_TIME)
+    if schema_changed:
+        # Cached table lists of this base are outdated for every user
+        await bump_base_schema_version(ctx, f"{AIRTABLE_CONSTANTS.SCHEMA_VERSION_PREFIX}:{base_id}", config.ITEMS_SNAPSHOT_EXPIRE_TIME)
+    return list(upserts.values()), sorted(deleted)
\ No newline at end of file
@@ -0,0 +1,165 @@
+import asyncio
+import os
+import secrets
+import time
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+from fastapi import HTTPException
+from ..middleware.context import VectorShiftContext
+from ..repositories.export_repository import store_export, get_export, export_path, prune_export_files
+from ..utils.export_writer import ExportWriter
+from ..constants.export_constants import EXPORT_CONSTANTS
+from ..oplog.oplog import info, error
+from ..oplog.metrics import metrics
+from ..config.config import config
+from .hubspot_service import iter_hubspot_item_pages
+from .airtable_service import iter_airtable_item_pages
+from .notion_service import iter_notion_item_pages
+
+# Provider -> pages of IntegrationItem dicts, each with the provider cursor of the page after it
+PAGE_SOURCES: Dict[str, Callable[..., AsyncIterator[Tuple[List[Dict], Optional[str]]]]] = {
+    "hubspot": iter_hubspot_item_pages,
+    "airtable": iter_airtable_item_pages,
+    "notion": iter_notion_item_pages,
+}
+
+class ExportUnavailableError(Exception):
+    """Raised when a worker already runs EXPORT_MAX_RUNNING exports."""
+
+async def get_owned_export(ctx: VectorShiftContext, export_id: str) -> Dict:
+    """The caller's export manifest; anyone else's is reported as missing."""
+    export = await get_export(ctx, export_id)
+    if export is None or export["org_id"] != ctx.org_id or export["user_id"] != ctx.user_id:
+        raise HTTPException(status_code=404, detail="Export not found")
+    return export
+
+def _restart_if_file_lost(export: Dict):
+    """Start over when the completed chunks are not on this host's disk, e.g. pruned or written by another host."""
+    path = export_path(export["id"], export["format"])
+    size = os.path.getsize(path) if os.path.isfile(path) else 0
+    if size >= export["size"]:
+        return
+    info(f"Export {export['id']} has {size} of {export['size']} bytes on disk; restarting it from the beginning")
+    metrics.inc("export_restarts_total", provider=export["provider"])
+    export.update(size=0, items=0, cursor=None, chunks=[])
+
+class ExportRunner:
+    """Writes a provider's items to a gzip file on disk as background tasks of this worker.
+
+    Pages stream from the provider's paginated fetcher into the file, so memory stays bounded
+    by a page whatever the export's size. Every EXPORT_CHUNK_ITEMS items, at a page boundary,
+    the current gzip member is closed and the manifest records its byte range together with the
+    provider cursor of the next page. A failed, interrupted or orphaned export resumes from the
+    last completed chunk.
+    """
+
+    def __init__(self):
+        self.tasks: Dict[str, asyncio.Task] = {}
+
+    def _launch(self, ctx: VectorShiftContext, export: Dict, credentials: dict):
+        task = asyncio.create_task(self._run(ctx, export, credentials))
+        self.tasks[export["id"]] = task
+        task.add_done_callback(lambda _: self.tasks.pop(export["id"], None))
+
+    def _check_capacity(self):
+        if len(self.tasks) >= config.EXPORT_MAX_RUNNING:
+            raise ExportUnavailableError("Too many exports running")
+
+    async def start(self, ctx: VectorShiftContext, provider: str, fmt: str, credentials: dict) -> Dict:
+        if not ctx.user_id or not ctx.org_id:
+            raise HTTPException(status_code=400, detail="user_id and org_id are required")
+        if provider not in PAGE_SOURCES:
+            raise HTTPException(status_code=400, detail=f"Unknown provider {provider}")
+        if fmt not in EXPORT_CONSTANTS.FORMATS:
+            raise HTTPException(status_code=400, detail=f"Unsupported format {fmt}")
+        if not credentials.get("access_token"):
+            raise HTTPException(status_code=400, detail="No access token in credentials")
+        self._check_capacity()
+        await asyncio.to_thread(prune_export_files, config.EXPORT_TTL)
+        now = time.time()
+        export = {
+            "id": secrets.token_hex(16),
+            "provider": provider,
+            "format": fmt,
+            "org_id": ctx.org_id,
+            "user_id": ctx.user_id,
+            "status": EXPORT_CONSTANTS.RUNNING,
+            "items": 0,
+            "size": 0,
+            "cursor": None,
+            "chunks": [],
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        await store_export(ctx, export, config.EXPORT_TTL)
+        self._launch(ctx, export, credentials)
+        info(f"Started {provider} {fmt} export {export['id']} for user {ctx.user_id}")
+        return export
+
+    async def resume(self, ctx: VectorShiftContext, export_id: str, credentials: dict) -> Dict:
+        export = await get_owned_export(ctx, export_id)
+        if export["status"] == EXPORT_CONSTANTS.COMPLETED:
+            raise HTTPException(status_code=409, detail="Export already completed")
+        # A running export whose worker died stops updating its manifest
+        orphaned = time.time() - export["updated_at"] >= config.EXPORT_STALE_AFTER
+        if export_id in self.tasks or (export["status"] == EXPORT_CONSTANTS.RUNNING and not orphaned):
+            raise HTTPException(status_code=409, detail="Export is still running")
+        if not credentials.get("access_token"):
+            raise HTTPException(status_code=400, detail="No access token in credentials")
+        self._check_capacity()
+        _restart_if_file_lost(export)
+        export.update(status=EXPORT_CONSTANTS.RUNNING, error=None, updated_at=time.time())
+        await store_export(ctx, export, config.EXPORT_TTL)
+        self._launch(ctx, export, credentials)
+        info(f"Resuming export {export_id} after {len(export['chunks'])} chunks")
+        return export
+
+    async def _end_chunk(self, ctx: VectorShiftContext, export: Dict, writer: ExportWriter, items: int, cursor: Optional[str]):
+        size = await asyncio.to_thread(writer.end_chunk)
+        export["chunks"].append({"offset": export["size"], "length": size - export["size"], "items": items})
+        export.update(size=size, items=export["items"] + items, cursor=cursor, updated_at=time.time())
+        await store_export(ctx, export, config.EXPORT_TTL)
+        metrics.inc("export_items_total", items, provider=export["provider"])
+
+    async def _run(self, ctx: VectorShiftContext, export: Dict, credentials: dict):
+        writer = None
+        pending = 0
+        try:
+            writer = await asyncio.to_thread(
+                ExportWriter, export_path(export["id"], export["format"]), export["format"], config.EXPORT_COMPRESSION_LEVEL, export["size"]
+            )
+            async for items, cursor in PAGE_SOURCES[export["provider"]](ctx, credentials, export["cursor"]):
+                if items:
+                    await asyncio.to_thread(writer.write, items)
+                    pending += len(items)
+                if pending >= config.EXPORT_CHUNK_ITEMS:
+                    await self._end_chunk(ctx, export, writer, pending, cursor)
+                    pending = 0
+            if pending:
+                await self._end_chunk(ctx, export, writer, pending, None)
+            export.update(status=EXPORT_CONSTANTS.COMPLETED, cursor=None)
+            info(f"Export {export['id']} completed with {export['items']} items in {export['size']} bytes")
+        except asyncio.CancelledError:
+            export["status"] = EXPORT_CONSTANTS.INTERRUPTED
+            raise
+        except Exception as e:
+            error(f"Export {export['id']} failed: {str(e)}")
+            export.update(status=EXPORT_CONSTANTS.FAILED, error=str(getattr(e, "detail", e)))
+        finally:
+            if writer is not None:
+                await asyncio.to_thread(writer.close)
+            metrics.inc("exports_total", provider=export["provider"], status=export["status"])
+            export["updated_at"] = time.time()
+            try:
+                await store_export(ctx, export, config.EXPORT_TTL)
+            except Exception as e:
+                error(f"Failed to store manifest of export {export['id']}: {str(e)}")
+
+    async def stop(self):
+        """Interrupt every running export; each can be resumed from its last completed chunk."""
+        tasks = list(self.tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+export_runner = ExportRunner()
\ No newline at end of file
@@ -3,18 +3,25 @@ import asyncio
 from fastapi.responses import HTMLResponse
 from ..middleware.context import VectorShiftContext
 from ..models.integration_item import IntegrationItem
-from ..repositories.hubspot_repository import store_credentials, get_credentials, fetch_hubspot_items
-from typing import List, Dict
+from ..repositories.hubspot_repository import store_credentials, get_credentials, iter_hubspot_pages, fetch_hubspot_contacts_by_id
+from ..repositories.item_snapshot_repository import get_webhook_token
+from .item_snapshot_service import load_items_with_fallback, index_for_webhooks
+from typing import AsyncIterator, List, Dict, Optional, Tuple
 from datetime import datetime
 import secrets
 import base64
 import hashlib
 import json
 from fastapi import HTTPException
-import httpx
 from ..oplog.oplog import info, error
 from ..config.config import config
 from ..constants.hubspot_constants import HUBSPOT_CONSTANTS
+from ..utils.http_client import HttpClient
+from ..utils.oauth_state import issue_state, consume_state
+from ..utils.deadline import DeadlineExceededError, encode_cursor, decode_cursor
+from ..utils.tracing import traced
+from ..utils.transform_pool import TransformStage
+from ..utils.page_size import AdaptivePageSize
 
 def create_integration_item_metadata_object(response_json: Dict, item_type: str, parent_id: str = None, parent_name: str = None) -> IntegrationItem:
     """Creates an integration metadata object from the HubSpot API response."""
@@ -32,19 +39,30 @@ def create_integration_item_metadata_object(response_json: Dict, item_type: str,
     )
     return integration_item
 
+def _contact_pages(ctx: VectorShiftContext, access_token: str, after: Optional[str]) -> AsyncIterator[Tuple[List[Dict], Optional[str]]]:
+    """Crawl contacts with the largest page size the portal keeps up with, projected to the properties items use."""
+    page_size = AdaptivePageSize(
+        HUBSPOT_CONSTANTS.MIN_PAGE_SIZE, HUBSPOT_CONSTANTS.MAX_PAGE_SIZE,
+        config.HUBSPOT_PAGE_TARGET_LATENCY, config.HUBSPOT_RATE_LIMIT_RESERVE,
+    )
+    return iter_hubspot_pages(ctx, access_token, HUBSPOT_CONSTANTS.CONTACTS_API_URL, after, HUBSPOT_CONSTANTS.CONTACT_PROPERTIES, page_size)
+
 async def authorize_hubspot(ctx: VectorShiftContext) -> str:
     """Authorize HubSpot OAuth flow and return the authorization URL."""
     user_id = ctx.user_id
     org_id = ctx.org_id
     
-    state_data = {"state": secrets.token_urlsafe(32), "user_id": user_id, "org_id": org_id}
-    encoded_state = base64.urlsafe_b64encode(json.dumps(state_data).encode("utf-8")).decode("utf-8")
-
     code_verifier = secrets.token_urlsafe(32)
     m = hashlib.sha256()
     m.update(code_verifier.encode("utf-8"))
     code_challenge = base64.urlsafe_b64encode(m.digest()).decode("utf-8").replace("=", "")
 
+    if config.OAUTH_STATELESS_STATE:
+        encoded_state = issue_state("hubspot", user_id, org_id, code_verifier)
+    else:
+        state_data = {"state": secrets.token_urlsafe(32), "user_id": user_id, "org_id": org_id}
+        encoded_state = base64.urlsafe_b64encode(json.dumps(state_data).encode("utf-8")).decode("utf-8")
+
     auth_url = (
         f"{HUBSPOT_CONSTANTS.AUTHORIZATION_URL}"
         f"?client_id={config.HUBSPOT_CLIENT_ID}"
@@ -56,10 +74,11 @@ async def authorize_hubspot(ctx: VectorShiftContext) -> str:
         f"&scope={HUBSPOT_CONSTANTS.SCOPE}"
     )
     
-    await asyncio.gather(
-        store_credentials(ctx, f"{HUBSPOT_CONSTANTS.STATE_KEY_PREFIX}:{org_id}:{user_id}", json.dumps(state_data), HUBSPOT_CONSTANTS.REDIS_EXPIRE_TIME),
-        store_credentials(ctx, f"{HUBSPOT_CONSTANTS.VERIFIER_KEY_PREFIX}:{org_id}:{user_id}", code_verifier, HUBSPOT_CONSTANTS.REDIS_EXPIRE_TIME),
-    )
+    if not config.OAUTH_STATELESS_STATE:
+        await asyncio.gather(
+            store_credentials(ctx, f"{HUBSPOT_CONSTANTS.STATE_KEY_PREFIX}:{org_id}:{user_id}", json.dumps(state_data), HUBSPOT_CONSTANTS.REDIS_EXPIRE_TIME),
+            store_credentials(ctx, f"{HUBSPOT_CONSTANTS.VERIFIER_KEY_PREFIX}:{org_id}:{user_id}", code_verifier, HUBSPOT_CONSTANTS.REDIS_EXPIRE_TIME),
+        )
     info(f"Generated authorization URL for user {user_id} and org {org_id}")
     return auth_url
 
@@ -72,41 +91,53 @@ async def oauth2callback_hubspot(ctx: VectorShiftContext, request) -> str:
         if not code or not state:
             raise HTTPException(status_code=400, detail="Missing code or state")
         
-        state_data = json.loads(base64.urlsafe_b64decode(state.encode("utf-8")).decode("utf-8"))
-        saved_state = await get_credentials(ctx, f"{HUBSPOT_CONSTANTS.STATE_KEY_PREFIX}:{state_data['org_id']}:{state_data['user_id']}")
-        if not saved_state or state_data["state"] != json.loads(saved_state)["state"]:
-            raise HTTPException(status_code=400, detail="State does not match")
+        if config.OAUTH_STATELESS_STATE:
+            state_data = await consume_state(ctx.redis_client, "hubspot", state, HUBSPOT_CONSTANTS.NONCE_KEY_PREFIX, HUBSPOT_CONSTANTS.REDIS_EXPIRE_TIME)
+            code_verifier = state_data["code_verifier"]
+        else:
+            state_data = json.loads(base64.urlsafe_b64decode(state.encode("utf-8")).decode("utf-8"))
+            saved_state = await get_credentials(ctx, f"{HUBSPOT_CONSTANTS.STATE_KEY_PREFIX}:{state_data['org_id']}:{state_data['user_id']}")
+            if not saved_state or state_data["state"] != json.loads(saved_state)["state"]:
+                raise HTTPException(status_code=400, detail="State does not match")
+            code_verifier = await get_credentials(ctx, f"{HUBSPOT_CONSTANTS.VERIFIER_KEY_PREFIX}:{state_data['org_id']}:{state_data['user_id']}")
+            if isinstance(code_verifier, bytes):
+                code_verifier = code_verifier.decode("utf-8")
 
-        code_verifier = await get_credentials(ctx, f"{HUBSPOT_CONSTANTS.VERIFIER_KEY_PREFIX}:{state_data['org_id']}:{state_data['user_id']}")
         if not code_verifier:
             raise HTTPException(status_code=400, detail="Code verifier not found")
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                HUBSPOT_CONSTANTS.TOKEN_URL,
-                data={
-                    "grant_type": "authorization_code",
-                    "code": code,
-                    "redirect_uri": HUBSPOT_CONSTANTS.REDIRECT_URI,
-                    "client_id": config.HUBSPOT_CLIENT_ID,
-                    "client_secret": config.HUBSPOT_CLIENT_SECRET,
-                    "code_verifier": code_verifier,
-                },
-                headers={"Content-Type": HUBSPOT_CONSTANTS.CONTENT_TYPE},
-            )
-            if response.status_code != 200:
-                raise HTTPException(status_code=400, detail=f"OAuth token exchange failed: {response.text}")
-            credentials = response.json()
-            await store_credentials(ctx, f"{HUBSPOT_CONSTANTS.CREDENTIALS_KEY_PREFIX}:{state_data['org_id']}:{state_data['user_id']}", json.dumps(credentials))
-            info(f"Successfully stored credentials for user {state_data['user_id']} and org {state_data['org_id']}")
-            close_window_script = """
-            <html>
-               <script>
-                  window.close();
-               </script>
-            </html>
-            """
-            return HTMLResponse(content=close_window_script)
+        response = await HttpClient.get_instance().client.post(
+            HUBSPOT_CONSTANTS.TOKEN_URL,
+            data={
+                "grant_type": "authorization_code",
+                "code": code,
+                "redirect_uri": HUBSPOT_CONSTANTS.REDIRECT_URI,
+                "client_id": config.HUBSPOT_CLIENT_ID,
+                "client_secret": config.HUBSPOT_CLIENT_SECRET,
+                "code_verifier": code_verifier,
+            },
+            headers={"Content-Type": HUBSPOT_CONSTANTS.CONTENT_TYPE},
+        )
+        if response.status_code != 200:
+            raise HTTPException(status_code=400, detail=f"OAuth token exchange failed: {response.text}")
+        credentials = response.json()
+        # The portal id is what webhook events are keyed by; look it up once per login
+        try:
+            token_info = await HttpClient.get_instance().client.get(f"{HUBSPOT_CONSTANTS.TOKEN_INFO_URL}/{credentials.get('access_token')}")
+            if token_info.status_code == 200:
+                credentials["hub_id"] = token_info.json().get("hub_id")
+        except Exception as e:
+            error(f"HubSpot token info lookup failed: {str(e)}")
+        await store_credentials(ctx, f"{HUBSPOT_CONSTANTS.CREDENTIALS_KEY_PREFIX}:{state_data['org_id']}:{state_data['user_id']}", json.dumps(credentials))
+        info(f"Successfully stored credentials for user {state_data['user_id']} and org {state_data['org_id']}")
+        close_window_script = """
+        <html>
+           <script>
+              window.close();
+           </script>
+        </html>
+        """
+        return HTMLResponse(content=close_window_script)
     except Exception as e:
         error(f"OAuth callback failed: {str(e)}")
         raise HTTPException(status_code=400, detail=f"Callback error: {str(e)}")
@@ -121,17 +152,65 @@ async def get_hubspot_credentials(ctx: VectorShiftContext) -> dict:
         raise HTTPException(status_code=400, detail="No credentials found")
     return json.loads(credentials)
 
-async def get_hubspot_items(ctx: VectorShiftContext, credentials: dict) -> List[IntegrationItem]:
-    """Fetch and transform HubSpot items into IntegrationItem objects."""
+@traced("service")
+async def get_hubspot_items(ctx: VectorShiftContext, credentials: dict, cursor: Optional[str] = None) -> List[Dict]:
+    """Fetch and transform HubSpot items into IntegrationItem dicts, resuming from cursor when given.
+
+    When ctx's deadline passes, the contacts fetched so far are returned with ctx.partial set and
+    ctx.cursor pointing at the first unfetched page.
+    """
     access_token = credentials.get("access_token")
     if not access_token:
         raise HTTPException(status_code=400, detail="No access token in credentials")
+    after = decode_cursor(cursor).get("after")
     
-    items = await fetch_hubspot_items(ctx, access_token, HUBSPOT_CONSTANTS.CONTACTS_API_URL)
-    integration_items = [
-        create_integration_item_metadata_object(item, "Contact")
-        for item in items
-    ]
+    async def load_items() -> List[Dict]:
+        # Pages are transformed while the next one is fetched; large pages go to the process pool
+        stage = TransformStage(create_integration_item_metadata_object, "Contact")
+        try:
+            async for page, _ in _contact_pages(ctx, access_token, after):
+                await stage.submit(page)
+        except DeadlineExceededError as e:
+            ctx.partial, ctx.cursor = True, encode_cursor({"after": e.cursor})
+        except BaseException:
+            stage.cancel()
+            raise
+        return await stage.results()
+
+    integration_items = await load_items_with_fallback(ctx, HUBSPOT_CONSTANTS.ITEMS_KEY_PREFIX, load_items, resumed=bool(cursor))
+    # A resumed fetch returns only the tail of the items, so no snapshot was stored to index
+    if not cursor:
+        await index_for_webhooks(ctx, HUBSPOT_CONSTANTS.ITEMS_KEY_PREFIX, HUBSPOT_CONSTANTS.WEBHOOK_INDEX_PREFIX, HUBSPOT_CONSTANTS.WEBHOOK_TOKEN_PREFIX, [str(credentials.get("hub_id") or "")], credentials)
     info(f"Fetched {len(integration_items)} HubSpot items for user {ctx.user_id}")
-    print(f"list_of_integration_item_metadata: {integration_items}")
-    return integration_items
\ No newline at end of file
+    return integration_items
+
+async def iter_hubspot_item_pages(ctx: VectorShiftContext, credentials: dict, cursor: Optional[str] = None) -> AsyncIterator[Tuple[List[Dict], Optional[str]]]:
+    """Yield pages of HubSpot contacts as IntegrationItem dicts, each with the after cursor of the page following it."""
+    access_token = credentials.get("access_token")
+    if not access_token:
+        raise HTTPException(status_code=400, detail="No access token in credentials")
+    async for page, after in _contact_pages(ctx, access_token, cursor):
+        yield [create_integration_item_metadata_object(record, "Contact").model_dump(mode="json") for record in page], after
+
+@traced("service")
+async def resolve_hubspot_webhook_changes(ctx: VectorShiftContext, portal_id: str, events: List[Dict]) -> Tuple[List[Dict], List[str]]:
+    """Reduce a batch of contact events for one portal to item upserts and deleted item ids."""
+    changed, deleted = set(), set()
+    for event in sorted(events, key=lambda e: e.get("occurredAt", 0)):
+        object_id = str(event.get("objectId"))
+        if event.get("subscriptionType") in HUBSPOT_CONSTANTS.WEBHOOK_DELETE_EVENTS:
+            deleted.add(object_id)
+            changed.discard(object_id)
+        elif event.get("subscriptionType") in HUBSPOT_CONSTANTS.WEBHOOK_UPSERT_EVENTS:
+            changed.add(object_id)
+            deleted.discard(object_id)
+
+    upserts = []
+    if changed:
+        access_token = await get_webhook_token(ctx, f"{HUBSPOT_CONSTANTS.WEBHOOK_TOKEN_PREFIX}:{portal_id}")
+        if access_token:
+            contacts = await fetch_hubspot_contacts_by_id(ctx, access_token, HUBSPOT_CONSTANTS.CONTACTS_BATCH_READ_URL, sorted(changed), HUBSPOT_CONSTANTS.CONTACT_PROPERTIES)
+            upserts = [create_integration_item_metadata_object(contact, "Contact").model_dump(mode="json") for contact in contacts]
+        else:
+            error(f"No access token for HubSpot portal {portal_id}; {len(changed)} contact changes wait for the next crawl")
+    return upserts, [f"{object_id}_Contact" for object_id in deleted]
\ No newline at end of file
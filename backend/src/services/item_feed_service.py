@@ -0,0 +1,216 @@
+import asyncio
+import json
+from collections import defaultdict
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+from ..middleware.context import VectorShiftContext
+from ..db.connection import RedisClient
+from ..repositories.item_feed_repository import append_feed_event, read_feed_events, get_oldest_feed_event_id, get_latest_feed_event_id
+from ..constants.feed_constants import FEED_CONSTANTS
+from ..utils.snapshot_codec import item_fingerprint
+from ..oplog.oplog import error
+from ..oplog.metrics import metrics
+from ..config.config import config
+
+# Resume position meaning "everything still retained"
+START_ID = "0-0"
+
+def feed_key(org_id: str, user_id: str) -> str:
+    return f"{FEED_CONSTANTS.FEED_KEY_PREFIX}:{org_id}:{user_id}"
+
+async def fingerprint_items(items: List[Dict]) -> Dict[str, str]:
+    fingerprints = {}
+    for start in range(0, len(items), config.SNAPSHOT_CHUNK_ITEMS):
+        for item in items[start:start + config.SNAPSHOT_CHUNK_ITEMS]:
+            fingerprints[item["id"]] = item_fingerprint(item)
+        # Let other requests run between slices of a large sync
+        await asyncio.sleep(0)
+    return fingerprints
+
+def diff_items(previous: Dict[str, str], current: Dict[str, str], items: List[Dict]) -> Tuple[List[Dict], List[str]]:
+    """Items added or changed since the previous snapshot, and ids that disappeared from it, by fingerprint."""
+    upserts = [item for item in items if previous.get(item["id"]) != current[item["id"]]]
+    deletes = [item_id for item_id in previous if item_id not in current]
+    return upserts, deletes
+
+async def publish_item_changes(ctx: VectorShiftContext, snapshot_key: str, upserts: List[Dict], deletes: List[str]) -> None:
+    """Append the changes applied to a snapshot to its owner's feed, split into bounded events."""
+    if not upserts and not deletes:
+        return
+    prefix, org_id, user_id = snapshot_key.split(":", 2)
+    provider = FEED_CONSTANTS.PROVIDER_BY_SNAPSHOT_PREFIX.get(prefix, prefix)
+    size = config.FEED_EVENT_MAX_ITEMS
+    changes = [("upserts", item) for item in upserts] + [("deletes", item_id) for item_id in deletes]
+    try:
+        for start in range(0, len(changes), size):
+            event = {"provider": provider, "upserts": [], "deletes": []}
+            for kind, change in changes[start:start + size]:
+                event[kind].append(change)
+            await append_feed_event(
+                ctx, feed_key(org_id, user_id), json.dumps(event),
+                config.FEED_MAX_EVENTS, config.ITEMS_SNAPSHOT_EXPIRE_TIME,
+            )
+            metrics.inc("feed_events_published_total", provider=provider)
+    except Exception as e:
+        # The snapshot is already updated; subscribers catch up on their next full fetch
+        error(f"Failed to publish {provider} changes for {snapshot_key}: {str(e)}")
+
+def _frame(event_id: str, data: str, event: str = FEED_CONSTANTS.ITEMS_EVENT) -> str:
+    return f"id: {event_id}\nevent: {event}\ndata: {data}\n\n"
+
+def _id_tuple(event_id: str) -> Tuple[int, int]:
+    milliseconds, _, sequence = event_id.partition("-")
+    return int(milliseconds), int(sequence or 0)
+
+class FeedUnavailableError(Exception):
+    """Raised when a worker already holds FEED_MAX_SUBSCRIBERS open streams, or is shutting down."""
+
+class FeedSubscriber:
+    """One open SSE stream; lagged is set when live frames were dropped and the stream must replay."""
+
+    def __init__(self, key: str):
+        self.key = key
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=config.FEED_SUBSCRIBER_QUEUE_SIZE)
+        self.lagged = False
+
+class ItemFeed:
+    """Fans item change events out to the SSE streams open on this worker.
+
+    Every event is appended to a capped Redis stream per (org, user), which serves resume by
+    Last-Event-ID, and published once on a shared channel. Each worker holds a single pub/sub
+    connection, started with its first stream, and hands the preformatted frame to its local
+    subscribers of that feed. A subscriber that falls behind, or misses frames while the
+    listener reconnects, replays from the stream instead of buffering without bound.
+    """
+
+    def __init__(self):
+        self.subscribers: Dict[str, Set[FeedSubscriber]] = defaultdict(set)
+        self.count = 0
+        self.closed = False
+        self._listener: Optional[asyncio.Task] = None
+
+    def subscribe(self, key: str) -> FeedSubscriber:
+        if self.closed:
+            # The worker is draining; the client retries and lands on another one
+            raise FeedUnavailableError("Worker is shutting down")
+        if self.count >= config.FEED_MAX_SUBSCRIBERS:
+            raise FeedUnavailableError("Too many open change streams")
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+        subscriber = FeedSubscriber(key)
+        self.subscribers[key].add(subscriber)
+        self.count += 1
+        metrics.set_gauge("feed_subscribers", self.count)
+        return subscriber
+
+    def unsubscribe(self, subscriber: FeedSubscriber):
+        subscribers = self.subscribers.get(subscriber.key)
+        if subscribers is None or subscriber not in subscribers:
+            return
+        subscribers.discard(subscriber)
+        if not subscribers:
+            del self.subscribers[subscriber.key]
+        self.count -= 1
+        metrics.set_gauge("feed_subscribers", self.count)
+
+    def _deliver(self, subscriber: FeedSubscriber, item):
+        try:
+            subscriber.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            subscriber.lagged = True
+            metrics.inc("feed_subscribers_lagged_total")
+
+    async def _listen(self):
+        client = RedisClient.get_instance().client
+        while True:
+            pubsub = client.pubsub()
+            try:
+                await pubsub.subscribe(FEED_CONSTANTS.CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    key, event_id, data = message["data"].decode("utf-8").split("\n", 2)
+                    subscribers = self.subscribers.get(key)
+                    if not subscribers:
+                        continue
+                    frame = _frame(event_id, data)
+                    for subscriber in list(subscribers):
+                        self._deliver(subscriber, (event_id, frame))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                error(f"Item feed listener failed: {str(e)}")
+            finally:
+                await pubsub.reset()
+            # Frames published while disconnected are only in the streams
+            for subscribers in self.subscribers.values():
+                for subscriber in subscribers:
+                    subscriber.lagged = True
+            await asyncio.sleep(1)
+
+    async def stop(self):
+        """End every open stream and the listener; clients reconnect to another worker with Last-Event-ID."""
+        self.closed = True
+        for subscribers in list(self.subscribers.values()):
+            for subscriber in list(subscribers):
+                subscriber.lagged = False
+                while not subscriber.queue.empty():
+                    subscriber.queue.get_nowait()
+                subscriber.queue.put_nowait(None)
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    async def _replay(self, ctx: VectorShiftContext, key: str, last_id: str) -> AsyncIterator[Tuple[str, str]]:
+        oldest = await get_oldest_feed_event_id(ctx, key)
+        if last_id != START_ID and (oldest is None or _id_tuple(last_id) < _id_tuple(oldest)):
+            # Events after last_id may have been trimmed or expired; the client must refetch
+            metrics.inc("feed_resets_total")
+            yield last_id, _frame(last_id, "{}", FEED_CONSTANTS.RESET_EVENT)
+        if oldest is None:
+            return
+        while True:
+            events = await read_feed_events(ctx, key, last_id, 500)
+            for event_id, data in events:
+                last_id = event_id
+                yield event_id, _frame(event_id, data)
+            if len(events) < 500:
+                return
+
+    async def stream(self, ctx: VectorShiftContext, last_event_id: Optional[str] = None) -> AsyncIterator[str]:
+        """SSE frames for the caller's feed: a replay after last_event_id, then live events and heartbeats."""
+        key = feed_key(ctx.org_id, ctx.user_id)
+        subscriber = self.subscribe(key)
+        try:
+            # Subscribed first, so nothing published after this position can be missed
+            last_id = last_event_id or await get_latest_feed_event_id(ctx, key) or START_ID
+            subscriber.lagged = bool(last_event_id)
+            yield f"retry: {int(config.FEED_HEARTBEAT_INTERVAL * 1000)}\n\n"
+            while not self.closed:
+                if subscriber.lagged:
+                    subscriber.lagged = False
+                    while not subscriber.queue.empty():
+                        subscriber.queue.get_nowait()
+                    async for event_id, frame in self._replay(ctx, key, last_id):
+                        last_id = event_id
+                        yield frame
+                try:
+                    item = await asyncio.wait_for(subscriber.queue.get(), config.FEED_HEARTBEAT_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                if item is None:
+                    return
+                event_id, frame = item
+                # Frames may also have arrived through a replay
+                if _id_tuple(event_id) <= _id_tuple(last_id):
+                    continue
+                last_id = event_id
+                yield frame
+        finally:
+            self.unsubscribe(subscriber)
+
+item_feed = ItemFeed()
\ No newline at end of file
@@ -0,0 +1,66 @@
+from ..middleware.context import VectorShiftContext
+from ..repositories.item_snapshot_repository import store_item_snapshot, get_item_snapshot, index_item_snapshot
+from ..utils.circuit_breaker import CircuitOpenError, UpstreamUnavailableError
+from ..utils.tracing import traced
+from .item_feed_service import fingerprint_items, diff_items, publish_item_changes
+from typing import Awaitable, Callable, Dict, List, Optional
+from ..oplog.oplog import info
+from ..oplog.metrics import metrics
+from ..config.config import config
+
+def snapshot_key(ctx: VectorShiftContext, key_prefix: str) -> Optional[str]:
+    """Snapshots are scoped per org and user; anonymous item requests are not cached."""
+    if not ctx.user_id or not ctx.org_id:
+        return None
+    return f"{key_prefix}:{ctx.org_id}:{ctx.user_id}"
+
+@traced("service")
+async def load_items_with_fallback(ctx: VectorShiftContext, key_prefix: str, load_items: Callable[[], Awaitable[List[Dict]]], resumed: bool = False) -> List[Dict]:
+    """Run load_items, refreshing the snapshot on success and serving it (marked stale) when the provider is unavailable.
+
+    Items are JSON-ready IntegrationItem dicts, the same shape that is stored and returned by the API.
+    A load cut short by the deadline (ctx.partial) or resumed from a cursor covers only part of
+    the items, so it neither replaces the snapshot nor falls back to it.
+    """
+    key = snapshot_key(ctx, key_prefix)
+    try:
+        items = await load_items()
+    except (CircuitOpenError, UpstreamUnavailableError):
+        cached = await get_item_snapshot(ctx, key) if key and not resumed else None
+        if cached is None:
+            raise
+        ctx.stale = True
+        metrics.inc("items_stale_served_total", snapshot=key_prefix)
+        info(f"Serving stale {key_prefix} snapshot for user {ctx.user_id}")
+        return cached
+    if ctx.partial:
+        metrics.inc("items_partial_served_total", snapshot=key_prefix)
+        info(f"Serving {len(items)} {key_prefix} items gathered before the deadline for user {ctx.user_id}")
+    elif key and not resumed:
+        fingerprints = await fingerprint_items(items)
+        previous = await store_item_snapshot(ctx, key, items, config.ITEMS_SNAPSHOT_EXPIRE_TIME, fingerprints)
+        if previous is None:
+            # A first sync has nothing to diff against; publishing every item as an upsert would flood the capped feed
+            metrics.inc("feed_diffs_skipped_total", snapshot=key_prefix)
+        else:
+            await publish_item_changes(ctx, key, *diff_items(previous, fingerprints, items))
+    return items
+
+@traced("service")
+async def index_for_webhooks(ctx: VectorShiftContext, key_prefix: str, index_prefix: str, token_prefix: str, account_ids: List[str], credentials: dict) -> None:
+    """Register the caller's snapshot under each provider account so webhook events can be applied to it."""
+    key = snapshot_key(ctx, key_prefix)
+    if not key or ctx.stale or ctx.partial:
+        return
+    token_expire = int(credentials.get("expires_in") or config.ITEMS_SNAPSHOT_EXPIRE_TIME)
+    for account_id in account_ids:
+        if account_id:
+            await index_item_snapshot(
+                ctx,
+                f"{index_prefix}:{account_id}",
+                key,
+                f"{token_prefix}:{account_id}",
+                credentials["access_token"],
+                token_expire,
+                config.ITEMS_SNAPSHOT_EXPIRE_TIME,
+            )
\ No newline at end of file
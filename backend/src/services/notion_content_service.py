@@ -0,0 +1,175 @@
+import asyncio
+import hashlib
+from typing import AsyncIterator, Dict, List, Optional
+from fastapi import HTTPException
+from ..middleware.context import VectorShiftContext
+from ..repositories.notion_repository import fetch_notion_items, fetch_notion_block_children, get_crawled_versions, store_crawled_version
+from ..utils.circuit_breaker import CircuitOpenError, UpstreamUnavailableError
+from ..utils.deadline import DeadlineExceededError
+from ..utils.rate_limiter import RateLimiter, get_rate_limiter
+from ..constants.notion_constants import NOTION_CONSTANTS
+from ..oplog.oplog import info, error
+from ..oplog.metrics import metrics
+from ..config.config import config
+
+def _block_text(block: Dict) -> str:
+    content = block.get(block.get("type"), None) or {}
+    text = "".join(part.get("plain_text", "") for part in content.get("rich_text", []) if isinstance(part, dict))
+    return text or content.get("title", "")
+
+def _simplify(block: Dict) -> Dict:
+    return {
+        "id": block.get("id"),
+        "type": block.get("type"),
+        "has_children": block.get("has_children", False),
+        "text": _block_text(block),
+    }
+
+class _PageCrawl:
+    def __init__(self, page: Dict):
+        self.page_id = page["id"]
+        self.last_edited_time = page.get("last_edited_time", "")
+        self.blocks = 0
+        self.pending = 0
+        self.truncated = False
+        self.error: Optional[str] = None
+
+class NotionBlockCrawler:
+    """Breadth-first crawl of the block trees of many pages, streamed as the blocks arrive.
+
+    A fixed number of workers share one FIFO frontier of (page, block, cursor) fetches, so
+    pages proceed in parallel level by level, and every call waits for the workspace's
+    rate limiter. Results go through a bounded queue: a slow reader stalls the workers
+    instead of buffering the crawl. Per page, descent stops at max_depth levels and
+    fetching stops after max_blocks blocks; either is reported as truncated.
+    """
+
+    def __init__(self, ctx: VectorShiftContext, access_token: str, limiter: RateLimiter, state_key: str,
+                 workers: int = None, max_depth: int = None, max_blocks: int = None):
+        self.ctx = ctx
+        self.access_token = access_token
+        self.limiter = limiter
+        self.state_key = state_key
+        self.workers = workers or config.NOTION_CRAWL_WORKERS
+        self.max_depth = max_depth or config.NOTION_CRAWL_MAX_DEPTH
+        self.max_blocks = max_blocks or config.NOTION_CRAWL_MAX_BLOCKS
+        self.frontier: asyncio.Queue = asyncio.Queue()
+        self.output: asyncio.Queue = asyncio.Queue(maxsize=self.workers * 4)
+
+    def _schedule(self, page: _PageCrawl, block_id: str, depth: int, cursor: str = None):
+        page.pending += 1
+        self.frontier.put_nowait((page, block_id, depth, cursor))
+
+    async def _fetch(self, block_id: str, cursor: Optional[str]):
+        for attempt in range(3):
+            await self.limiter.acquire()
+            try:
+                return await fetch_notion_block_children(
+                    self.ctx, self.access_token, NOTION_CONSTANTS.BLOCKS_API_URL, block_id, NOTION_CONSTANTS.BLOCK_PAGE_SIZE, cursor
+                )
+            except UpstreamUnavailableError:
+                # Mostly 429s from other clients of the same workspace; back off and retry
+                if attempt == 2:
+                    raise
+                await asyncio.sleep(2 ** attempt)
+
+    async def _visit(self, page: _PageCrawl, block_id: str, depth: int, cursor: Optional[str]):
+        blocks, next_cursor = await self._fetch(block_id, cursor)
+        remaining = self.max_blocks - page.blocks
+        if len(blocks) >= remaining:
+            page.truncated = page.truncated or len(blocks) > remaining or bool(next_cursor)
+            blocks, next_cursor = blocks[:remaining], None
+        page.blocks += len(blocks)
+        metrics.inc("notion_crawl_blocks_total", len(blocks))
+        await self.output.put({"page_id": page.page_id, "parent_id": block_id, "depth": depth, "blocks": [_simplify(block) for block in blocks]})
+        if next_cursor:
+            self._schedule(page, block_id, depth, next_cursor)
+        for block in blocks:
+            if not block.get("has_children") or block.get("type") in NOTION_CONSTANTS.UNCRAWLED_CHILD_TYPES:
+                continue
+            if depth >= self.max_depth or page.blocks >= self.max_blocks:
+                page.truncated = True
+                continue
+            self._schedule(page, block["id"], depth + 1)
+
+    async def _finish(self, page: _PageCrawl):
+        if page.error is None:
+            try:
+                await store_crawled_version(self.ctx, self.state_key, page.page_id, page.last_edited_time, config.ITEMS_SNAPSHOT_EXPIRE_TIME)
+            except Exception as e:
+                # The content was streamed; the page is only crawled again next time
+                error(f"Failed to record crawled version of Notion page {page.page_id}: {str(e)}")
+        metrics.inc("notion_crawl_pages_total", status="failed" if page.error else "crawled")
+        await self.output.put({
+            "page_id": page.page_id,
+            "status": "failed" if page.error else "crawled",
+            "blocks": page.blocks,
+            "truncated": page.truncated,
+            "error": page.error,
+        })
+
+    async def _work(self):
+        while True:
+            page, block_id, depth, cursor = await self.frontier.get()
+            try:
+                # Skip the rest of a page once one of its fetches failed
+                if page.error is None:
+                    await self._visit(page, block_id, depth, cursor)
+            except (CircuitOpenError, UpstreamUnavailableError, DeadlineExceededError, HTTPException) as e:
+                page.error = str(getattr(e, "detail", e))
+            except Exception as e:
+                # E.g. a non-JSON response or a malformed block; a dead worker would leave frontier.join() hanging
+                error(f"Crawling Notion block {block_id} of page {page.page_id} failed: {str(e)}")
+                page.error = str(e) or type(e).__name__
+            finally:
+                try:
+                    page.pending -= 1
+                    if page.pending == 0:
+                        await self._finish(page)
+                except Exception as e:
+                    error(f"Failed to finish crawl of Notion page {page.page_id}: {str(e)}")
+                finally:
+                    self.frontier.task_done()
+
+    async def _close_when_done(self):
+        await self.frontier.join()
+        await self.output.put(None)
+
+    async def crawl(self, pages: List[Dict], force: bool = False) -> AsyncIterator[Dict]:
+        """Yield block batches and per-page summaries; pages unchanged since their last crawl are reported and skipped."""
+        versions = {} if force else await get_crawled_versions(self.ctx, self.state_key, [page["id"] for page in pages])
+        for page in pages:
+            if versions.get(page["id"]) == page.get("last_edited_time"):
+                metrics.inc("notion_crawl_pages_total", status="unchanged")
+                yield {"page_id": page["id"], "status": "unchanged"}
+            else:
+                self._schedule(_PageCrawl(page), page["id"], 1)
+        tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        tasks.append(asyncio.create_task(self._close_when_done()))
+        try:
+            while True:
+                record = await self.output.get()
+                if record is None:
+                    return
+                yield record
+        finally:
+            for task in tasks:
+                task.cancel()
+
+async def crawl_notion_content(ctx: VectorShiftContext, credentials: dict, page_ids: Optional[List[str]] = None, force: bool = False) -> AsyncIterator[Dict]:
+    """Stream the block content of the caller's Notion pages, optionally limited to page_ids."""
+    if not ctx.user_id or not ctx.org_id:
+        raise HTTPException(status_code=400, detail="user_id and org_id are required")
+    access_token = credentials.get("access_token")
+    if not access_token:
+        raise HTTPException(status_code=400, detail="No access token in credentials")
+
+    # Notion's limit applies per integration token, i.e. per workspace; the token is never put in a Redis key
+    workspace = credentials.get("workspace_id") or hashlib.sha256(access_token.encode("utf-8")).hexdigest()[:16]
+    limiter = get_rate_limiter(f"notion:{workspace}", config.NOTION_RATE_LIMIT)
+    results = await fetch_notion_items(ctx, access_token, NOTION_CONSTANTS.SEARCH_API_URL, limiter)
+    pages = [result for result in results if result.get("object") == "page" and (not page_ids or result.get("id") in page_ids)]
+    info(f"Crawling content of {len(pages)} Notion pages for user {ctx.user_id}")
+    crawler = NotionBlockCrawler(ctx, access_token, limiter, f"{NOTION_CONSTANTS.CONTENT_STATE_PREFIX}:{ctx.org_id}:{ctx.user_id}")
+    async for record in crawler.crawl(pages, force):
+        yield record
\ No newline at end of file
@@ -1,17 +1,23 @@
 from fastapi.responses import HTMLResponse
 from ..middleware.context import VectorShiftContext
 from ..models.integration_item import IntegrationItem
-from ..repositories.notion_repository import store_credentials, get_credentials, fetch_notion_items
-from typing import List, Dict
+from ..repositories.notion_repository import store_credentials, get_credentials, iter_notion_search_pages, fetch_notion_object
+from ..repositories.item_snapshot_repository import get_webhook_token
+from .item_snapshot_service import load_items_with_fallback, index_for_webhooks
+from typing import AsyncIterator, List, Dict, Optional, Tuple
 from datetime import datetime
 import secrets
 import base64
 import json
 from fastapi import HTTPException, Request
-import httpx
 from ..oplog.oplog import info, error
 from ..config.config import config
 from ..constants.notion_constants import NOTION_CONSTANTS
+from ..utils.http_client import HttpClient
+from ..utils.oauth_state import issue_state, consume_state
+from ..utils.deadline import DeadlineExceededError, encode_cursor, decode_cursor
+from ..utils.tracing import traced
+from ..utils.transform_pool import TransformStage
 
 def create_integration_item_metadata_object(response_json: Dict) -> IntegrationItem:
     """Creates an integration metadata object from the Notion API response."""
@@ -70,8 +76,11 @@ async def authorize_notion(ctx: VectorShiftContext) -> str:
     if not ctx.user_id or not ctx.org_id:
         raise HTTPException(status_code=400, detail="user_id and org_id are required")
     
-    state_data = {"state": secrets.token_urlsafe(32), "user_id": ctx.user_id, "org_id": ctx.org_id}
-    encoded_state = json.dumps(state_data)
+    if config.OAUTH_STATELESS_STATE:
+        encoded_state = issue_state("notion", ctx.user_id, ctx.org_id)
+    else:
+        state_data = {"state": secrets.token_urlsafe(32), "user_id": ctx.user_id, "org_id": ctx.org_id}
+        encoded_state = json.dumps(state_data)
 
     auth_url = (
         f"{NOTION_CONSTANTS.AUTHORIZATION_URL}"
@@ -83,7 +92,8 @@ async def authorize_notion(ctx: VectorShiftContext) -> str:
         f"&scope={NOTION_CONSTANTS.SCOPE}"
     )
     
-    await store_credentials(ctx, f"{NOTION_CONSTANTS.STATE_KEY_PREFIX}:{ctx.org_id}:{ctx.user_id}", encoded_state, NOTION_CONSTANTS.REDIS_EXPIRE_TIME)
+    if not config.OAUTH_STATELESS_STATE:
+        await store_credentials(ctx, f"{NOTION_CONSTANTS.STATE_KEY_PREFIX}:{ctx.org_id}:{ctx.user_id}", encoded_state, NOTION_CONSTANTS.REDIS_EXPIRE_TIME)
     info(f"Generated authorization URL for user {ctx.user_id} and org {ctx.org_id}")
     return auth_url
 
@@ -98,27 +108,29 @@ async def oauth2callback_notion(ctx: VectorShiftContext, request: Request) -> HT
         if not code or not encoded_state:
             raise HTTPException(status_code=400, detail="Missing code or state")
 
-        state_data = json.loads(encoded_state)
-        saved_state = await get_credentials(ctx, f"{NOTION_CONSTANTS.STATE_KEY_PREFIX}:{state_data['org_id']}:{state_data['user_id']}")
-        
-        if not saved_state or state_data["state"] != json.loads(saved_state)["state"]:
-            raise HTTPException(status_code=400, detail="State does not match")
+        if config.OAUTH_STATELESS_STATE:
+            state_data = await consume_state(ctx.redis_client, "notion", encoded_state, NOTION_CONSTANTS.NONCE_KEY_PREFIX, NOTION_CONSTANTS.REDIS_EXPIRE_TIME)
+        else:
+            state_data = json.loads(encoded_state)
+            saved_state = await get_credentials(ctx, f"{NOTION_CONSTANTS.STATE_KEY_PREFIX}:{state_data['org_id']}:{state_data['user_id']}")
+            
+            if not saved_state or state_data["state"] != json.loads(saved_state)["state"]:
+                raise HTTPException(status_code=400, detail="State does not match")
 
         encoded_client_id_secret = base64.b64encode(f"{config.NOTION_CLIENT_ID}:{config.NOTION_CLIENT_SECRET}".encode()).decode()
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                NOTION_CONSTANTS.TOKEN_URL,
-                json={
-                    "grant_type": "authorization_code",
-                    "code": code,
-                    "redirect_uri": NOTION_CONSTANTS.REDIRECT_URI,
-                },
-                headers={
-                    "Authorization": f"{NOTION_CONSTANTS.AUTH_HEADER} {encoded_client_id_secret}",
-                    "Content-Type": NOTION_CONSTANTS.CONTENT_TYPE,
-                    "Notion-Version": NOTION_CONSTANTS.VERSION,
-                },
-            )
+        response = await HttpClient.get_instance().client.post(
+            NOTION_CONSTANTS.TOKEN_URL,
+            json={
+                "grant_type": "authorization_code",
+                "code": code,
+                "redirect_uri": NOTION_CONSTANTS.REDIRECT_URI,
+            },
+            headers={
+                "Authorization": f"{NOTION_CONSTANTS.AUTH_HEADER} {encoded_client_id_secret}",
+                "Content-Type": NOTION_CONSTANTS.CONTENT_TYPE,
+                "Notion-Version": NOTION_CONSTANTS.VERSION,
+            },
+        )
 
         if response.status_code != 200:
             raise HTTPException(status_code=400, detail=f"Token exchange failed: {response.text}")
@@ -149,18 +161,73 @@ async def get_notion_credentials(ctx: VectorShiftContext) -> dict:
         raise HTTPException(status_code=400, detail="No credentials found")
     return json.loads(credentials)
 
-async def get_items_notion(ctx: VectorShiftContext, credentials: dict) -> List[IntegrationItem]:
-    """Fetch and transform Notion items into IntegrationItem objects."""
+@traced("service")
+async def get_items_notion(ctx: VectorShiftContext, credentials: dict, cursor: Optional[str] = None) -> List[Dict]:
+    """Fetch and transform Notion items into IntegrationItem dicts, resuming from cursor when given.
+
+    When ctx's deadline passes, the search pages fetched so far are returned with ctx.partial set
+    and ctx.cursor pointing at the first unfetched page.
+    """
     if not ctx.user_id or not ctx.org_id:
         raise HTTPException(status_code=400, detail="user_id and org_id are required")
     
     access_token = credentials.get("access_token")
     if not access_token:
         raise HTTPException(status_code=400, detail="No access token in credentials")
+    start_cursor = decode_cursor(cursor).get("start_cursor")
     
-    items = await fetch_notion_items(ctx, access_token, NOTION_CONSTANTS.SEARCH_API_URL)
-    list_of_integration_item_metadata = [create_integration_item_metadata_object(item) for item in items]
+    async def load_items() -> List[Dict]:
+        stage = TransformStage(create_integration_item_metadata_object)
+        try:
+            async for page, _ in iter_notion_search_pages(ctx, access_token, NOTION_CONSTANTS.SEARCH_API_URL, start_cursor):
+                await stage.submit(page)
+        except DeadlineExceededError as e:
+            ctx.partial, ctx.cursor = True, encode_cursor({"start_cursor": e.cursor})
+        except BaseException:
+            stage.cancel()
+            raise
+        return await stage.results()
+
+    list_of_integration_item_metadata = await load_items_with_fallback(ctx, NOTION_CONSTANTS.ITEMS_KEY_PREFIX, load_items, resumed=bool(cursor))
+    # A resumed fetch returns only the tail of the items, so no snapshot was stored to index
+    if not cursor:
+        await index_for_webhooks(ctx, NOTION_CONSTANTS.ITEMS_KEY_PREFIX, NOTION_CONSTANTS.WEBHOOK_INDEX_PREFIX, NOTION_CONSTANTS.WEBHOOK_TOKEN_PREFIX, [credentials.get("workspace_id")], credentials)
     
     info(f"Fetched {len(list_of_integration_item_metadata)} Notion items for user {ctx.user_id}")
-    print(f"list_of_integration_item_metadata: {list_of_integration_item_metadata}")
-    return list_of_integration_item_metadata
\ No newline at end of file
+    return list_of_integration_item_metadata
+
+async def iter_notion_item_pages(ctx: VectorShiftContext, credentials: dict, cursor: Optional[str] = None) -> AsyncIterator[Tuple[List[Dict], Optional[str]]]:
+    """Yield pages of Notion search results as IntegrationItem dicts, each with the start cursor of the page following it."""
+    access_token = credentials.get("access_token")
+    if not access_token:
+        raise HTTPException(status_code=400, detail="No access token in credentials")
+    async for page, next_cursor in iter_notion_search_pages(ctx, access_token, NOTION_CONSTANTS.SEARCH_API_URL, cursor):
+        yield [create_integration_item_metadata_object(result).model_dump(mode="json") for result in page], next_cursor
+
+@traced("service")
+async def resolve_notion_webhook_changes(ctx: VectorShiftContext, workspace_id: str, events: List[Dict]) -> Tuple[List[Dict], List[str]]:
+    """Reduce a batch of page and database events for one workspace to item upserts and deleted item ids."""
+    changed, deleted = {}, set()
+    for event in sorted(events, key=lambda e: e.get("timestamp", "")):
+        entity = event.get("entity", {})
+        if entity.get("type") not in ("page", "database"):
+            continue
+        if event.get("type") in NOTION_CONSTANTS.WEBHOOK_DELETE_EVENTS:
+            deleted.add(entity["id"])
+            changed.pop(entity["id"], None)
+        else:
+            changed[entity["id"]] = entity["type"]
+            deleted.discard(entity["id"])
+
+    upserts = []
+    if changed:
+        access_token = await get_webhook_token(ctx, f"{NOTION_CONSTANTS.WEBHOOK_TOKEN_PREFIX}:{workspace_id}")
+        if access_token:
+            for object_id, object_type in changed.items():
+                url = NOTION_CONSTANTS.PAGES_API_URL if object_type == "page" else NOTION_CONSTANTS.DATABASES_API_URL
+                notion_object = await fetch_notion_object(ctx, access_token, url, object_id)
+                if notion_object:
+                    upserts.append(create_integration_item_metadata_object(notion_object).model_dump(mode="json"))
+        else:
+            error(f"No access token for Notion workspace {workspace_id}; {len(changed)} changes wait for the next crawl")
+    return upserts, sorted(deleted)
\ No newline at end of file
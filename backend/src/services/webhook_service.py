@@ -0,0 +1,123 @@
+import asyncio
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from ..middleware.context import VectorShiftContext
+from ..repositories.item_snapshot_repository import get_indexed_snapshot_keys, apply_item_changes, remove_snapshot_from_index
+from .hubspot_service import resolve_hubspot_webhook_changes
+from .airtable_service import resolve_airtable_webhook_changes
+from .notion_service import resolve_notion_webhook_changes
+from .item_feed_service import publish_item_changes
+from ..constants.hubspot_constants import HUBSPOT_CONSTANTS
+from ..constants.airtable_constants import AIRTABLE_CONSTANTS
+from ..constants.notion_constants import NOTION_CONSTANTS
+from ..oplog.oplog import info, error
+from ..oplog.metrics import metrics
+from ..config.config import config
+
+# provider -> (resolver turning raw events into upserts/deletes, snapshot index prefix)
+PROVIDERS = {
+    "hubspot": (resolve_hubspot_webhook_changes, HUBSPOT_CONSTANTS.WEBHOOK_INDEX_PREFIX),
+    "airtable": (resolve_airtable_webhook_changes, AIRTABLE_CONSTANTS.WEBHOOK_INDEX_PREFIX),
+    "notion": (resolve_notion_webhook_changes, NOTION_CONSTANTS.WEBHOOK_INDEX_PREFIX),
+}
+
+class WebhookProcessor:
+    """Buffers verified webhook events in a bounded in-process queue and applies them to item snapshots in batches.
+
+    Handlers only enqueue, so a burst of deliveries costs the HTTP path nothing but a queue put.
+    The consumer groups each batch by provider account, so one snapshot rewrite covers many events.
+    Events still queued when a worker dies are lost; providers redeliver only on non-2xx responses,
+    and the next crawl repairs the snapshot.
+    """
+
+    def __init__(self, queue_size: int = None, batch_size: int = None, batch_window: float = None):
+        self.queue_size = queue_size or config.WEBHOOK_QUEUE_SIZE
+        self.batch_size = batch_size or config.WEBHOOK_BATCH_SIZE
+        self.batch_window = config.WEBHOOK_BATCH_WINDOW if batch_window is None else batch_window
+        self.queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Apply whatever is still queued, then stop the consumer."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        remaining = []
+        while not self.queue.empty():
+            remaining.append(self.queue.get_nowait())
+        if remaining:
+            await self.process_batch(remaining)
+
+    def enqueue(self, provider: str, events: List[Tuple[str, Dict]]) -> bool:
+        """Queue (account_id, event) pairs for a provider; all or nothing, so a rejected delivery can be retried whole."""
+        if self.queue is None or self.queue.qsize() + len(events) > self.queue_size:
+            metrics.inc("webhook_events_rejected_total", len(events), provider=provider)
+            return False
+        for account_id, event in events:
+            self.queue.put_nowait((provider, account_id, event))
+        metrics.inc("webhook_events_received_total", len(events), provider=provider)
+        metrics.set_gauge("webhook_queue_depth", self.queue.qsize())
+        return True
+
+    async def _run(self):
+        while True:
+            batch = [await self.queue.get()]
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            metrics.set_gauge("webhook_queue_depth", self.queue.qsize())
+            try:
+                await self.process_batch(batch)
+            except Exception as e:
+                error(f"Webhook batch failed: {str(e)}")
+
+    async def process_batch(self, batch: List[Tuple[str, str, Dict]]):
+        started = time.perf_counter()
+        grouped = defaultdict(list)
+        for provider, account_id, event in batch:
+            grouped[(provider, account_id)].append(event)
+        ctx = VectorShiftContext()
+        results = await asyncio.gather(
+            *(self._apply_group(ctx, provider, account_id, events) for (provider, account_id), events in grouped.items()),
+            return_exceptions=True,
+        )
+        for (provider, account_id), result in zip(grouped, results):
+            if isinstance(result, Exception):
+                error(f"Failed to apply {provider} webhook events for {account_id}: {str(result)}")
+        metrics.observe("webhook_batch_seconds", time.perf_counter() - started)
+
+    async def _apply_group(self, ctx: VectorShiftContext, provider: str, account_id: str, events: List[Dict]):
+        resolve_changes, index_prefix = PROVIDERS[provider]
+        upserts, deletes = await resolve_changes(ctx, account_id, events)
+        if not upserts and not deletes:
+            return
+        index_key = f"{index_prefix}:{account_id}"
+        for snapshot_key in await get_indexed_snapshot_keys(ctx, index_key):
+            if not await apply_item_changes(ctx, snapshot_key, upserts, deletes, config.ITEMS_SNAPSHOT_EXPIRE_TIME):
+                await remove_snapshot_from_index(ctx, index_key, snapshot_key)
+                continue
+            await publish_item_changes(ctx, snapshot_key, upserts, deletes)
+        metrics.inc("webhook_events_applied_total", len(events), provider=provider)
+        info(f"Applied {len(upserts)} upserts and {len(deletes)} deletes from {len(events)} {provider} events for {account_id}")
+
+webhook_processor = WebhookProcessor()
+
+async def store_notion_verification_token(token: str):
+    """Keep the one-time Notion subscription token in Redis for the operator to copy, rather than logging a secret."""
+    await VectorShiftContext().redis_client.set(NOTION_CONSTANTS.WEBHOOK_VERIFICATION_KEY, token, NOTION_CONSTANTS.WEBHOOK_VERIFICATION_EXPIRE)
\ No newline at end of file
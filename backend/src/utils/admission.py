@@ -0,0 +1,141 @@
+import asyncio
+import secrets
+import time
+from contextlib import asynccontextmanager
+from collections import defaultdict
+from typing import Optional
+from ..config.config import config
+from ..db.connection import RedisClient
+from ..oplog.oplog import error
+from ..oplog.metrics import metrics
+
+class AdmissionRejectedError(Exception):
+    """Raised when a request cannot be admitted because the wait queue is full or the wait timed out."""
+
+    def __init__(self, scope: str, reason: str, retry_after: int = 1):
+        super().__init__(f"Too many concurrent requests for {scope}: {reason}")
+        self.scope = scope
+        self.retry_after = retry_after
+
+class ConcurrencyLimiter:
+    """Counting semaphore shared across workers as a Redis sorted set of expiring leases.
+
+    A lease is added first and dropped again if that pushed the set over the limit, so no
+    Lua is needed. Held leases are renewed every third of lease_ttl, so long streams keep their
+    slot while a crashed worker's slots free up within lease_ttl. While Redis is unreachable the
+    limit is enforced per worker in memory.
+    """
+
+    def __init__(self, name: str, limit: int, queue_size: int = None, max_wait: float = None, lease_ttl: int = None):
+        self.name = name
+        self.limit = limit
+        self.queue_size = config.ADMISSION_QUEUE_SIZE if queue_size is None else queue_size
+        self.max_wait = config.ADMISSION_MAX_WAIT if max_wait is None else max_wait
+        self.lease_ttl = lease_ttl or config.ADMISSION_LEASE_TTL
+        self._waiting = defaultdict(int)
+        self._local_holders = defaultdict(int)
+        self._released = None
+
+    async def _try_acquire(self, key: str) -> Optional[str]:
+        token = secrets.token_hex(8)
+        now = time.time()
+        try:
+            async with RedisClient.get_instance().client.pipeline(transaction=True) as pipe:
+                pipe.zremrangebyscore(key, "-inf", now)
+                pipe.zadd(key, {token: now + self.lease_ttl})
+                pipe.zcard(key)
+                pipe.expire(key, self.lease_ttl)
+                _, _, holders, _ = await pipe.execute()
+            if holders <= self.limit:
+                return token
+            await RedisClient.get_instance().client.zrem(key, token)
+            return None
+        except Exception as e:
+            error(f"Admission limiter {self.name} falling back to local state: {str(e)}")
+            if self._local_holders[key] < self.limit:
+                self._local_holders[key] += 1
+                return f"local:{token}"
+            return None
+
+    async def _renew(self, key: str, token: str):
+        client = RedisClient.get_instance().client
+        while True:
+            await asyncio.sleep(self.lease_ttl / 3)
+            try:
+                async with client.pipeline(transaction=True) as pipe:
+                    # xx: a lease that already expired is not brought back over the limit
+                    pipe.zadd(key, {token: time.time() + self.lease_ttl}, xx=True)
+                    pipe.expire(key, self.lease_ttl)
+                    await pipe.execute()
+            except Exception as e:
+                error(f"Failed to renew admission lease on {key}: {str(e)}")
+
+    async def _release(self, key: str, token: str):
+        if token.startswith("local:"):
+            self._local_holders[key] -= 1
+        else:
+            try:
+                await RedisClient.get_instance().client.zrem(key, token)
+            except Exception as e:
+                error(f"Failed to release admission lease on {key}: {str(e)}")
+        # Wake local waiters immediately instead of letting them sleep out their poll interval
+        if self._released is not None:
+            self._released.set()
+            self._released = None
+
+    @asynccontextmanager
+    async def acquire(self, scope: str):
+        """Hold one slot of this limiter for the given scope, waiting in a bounded queue if needed."""
+        key = f"admission:{self.name}:{scope}"
+        started = time.monotonic()
+        token = await self._try_acquire(key)
+        if token is None:
+            if self._waiting[key] >= self.queue_size:
+                metrics.inc("admission_rejected_total", limiter=self.name, reason="queue_full")
+                raise AdmissionRejectedError(self.name, "queue full", int(self.max_wait) or 1)
+            self._waiting[key] += 1
+            metrics.set_gauge("admission_waiting", self._waiting[key], limiter=self.name)
+            try:
+                poll_interval = 0.01
+                while token is None:
+                    remaining = self.max_wait - (time.monotonic() - started)
+                    if remaining <= 0:
+                        metrics.inc("admission_rejected_total", limiter=self.name, reason="timeout")
+                        raise AdmissionRejectedError(self.name, "timed out waiting for a slot", int(self.max_wait) or 1)
+                    if self._released is None:
+                        self._released = asyncio.Event()
+                    try:
+                        await asyncio.wait_for(self._released.wait(), min(poll_interval, remaining))
+                    except asyncio.TimeoutError:
+                        pass
+                    poll_interval = min(poll_interval * 2, 0.5)
+                    token = await self._try_acquire(key)
+            finally:
+                self._waiting[key] -= 1
+                metrics.set_gauge("admission_waiting", self._waiting[key], limiter=self.name)
+        metrics.observe("admission_queue_seconds", time.monotonic() - started, limiter=self.name)
+        renewal = None if token.startswith("local:") else asyncio.create_task(self._renew(key, token))
+        try:
+            yield
+        finally:
+            if renewal is not None:
+                renewal.cancel()
+            await self._release(key, token)
+
+global_limiter = ConcurrencyLimiter("global", config.ADMISSION_GLOBAL_LIMIT)
+org_limiter = ConcurrencyLimiter("org", config.ADMISSION_ORG_LIMIT)
+
+@asynccontextmanager
+async def admit(org_id: Optional[str] = None):
+    """Admit a request under the per-org limit (when the org is known) and then the global limit.
+
+    The org slot is taken first so a single busy org queues on its own limit without holding
+    global slots that other tenants could use.
+    """
+    if org_id:
+        async with org_limiter.acquire(org_id):
+            async with global_limiter.acquire("all"):
+                yield
+    else:
+        async with global_limiter.acquire("all"):
+            yield
\ No newline at end of file
@@ -0,0 +1,194 @@
+import time
+import httpx
+from typing import Dict, Optional
+from ..config.config import config
+from ..db.connection import RedisClient
+from ..oplog.oplog import info, error
+from ..oplog.metrics import metrics
+from .http_client import HttpClient
+from .deadline import DeadlineExceededError
+from .tracing import span
+
+STATE_CODES = {"closed": 0, "half_open": 1, "open": 2}
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider endpoint whose circuit is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} is unavailable, retry in {int(retry_after) + 1}s")
+        self.name = name
+        self.retry_after = int(retry_after) + 1
+
+class UpstreamUnavailableError(Exception):
+    """Raised when a provider call fails with a timeout, connection error, 429 or 5xx."""
+
+    def __init__(self, name: str, detail: str):
+        super().__init__(f"{name} failed: {detail}")
+        self.name = name
+        self.retry_after = config.CIRCUIT_RESET_TIMEOUT
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker whose state lives in Redis so every worker shares it.
+
+    Falls back to worker-local state while Redis is unreachable. A closed circuit's state is reused
+    for CIRCUIT_STATE_TTL seconds, so other workers' failures are seen at most that late; an open or
+    half-open one is reloaded on every call.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = None, reset_timeout: int = None):
+        self.name = name
+        self.failure_threshold = failure_threshold or config.CIRCUIT_FAILURE_THRESHOLD
+        self.reset_timeout = reset_timeout or config.CIRCUIT_RESET_TIMEOUT
+        self.state_key = f"circuit:{name}"
+        self.probe_key = f"circuit:{name}:probe"
+        self._local = {"failures": 0, "opened_at": 0.0, "probing": False}
+        self._cached = None
+        self._cached_at = 0.0
+
+    @property
+    def redis(self):
+        return RedisClient.get_instance().client
+
+    async def load_state(self, fresh: bool = False) -> Dict:
+        now = time.monotonic()
+        if not fresh and self._cached is not None and not self._cached["opened_at"] and now - self._cached_at < config.CIRCUIT_STATE_TTL:
+            return dict(self._cached)
+        try:
+            raw = await self.redis.hgetall(self.state_key)
+            state = {"failures": int(raw.get(b"failures", 0)), "opened_at": float(raw.get(b"opened_at", 0))}
+        except Exception:
+            state = dict(self._local)
+        self._cached, self._cached_at = dict(state), now
+        self._report(state)
+        return state
+
+    def _report(self, state: Dict):
+        if not state["opened_at"]:
+            status = "closed"
+        elif time.time() - state["opened_at"] < self.reset_timeout:
+            status = "open"
+        else:
+            status = "half_open"
+        metrics.set_gauge("circuit_breaker_state", STATE_CODES[status], breaker=self.name)
+        metrics.set_gauge("circuit_breaker_failures", state["failures"], breaker=self.name)
+
+    async def _acquire_probe(self) -> bool:
+        try:
+            return bool(await self.redis.set(self.probe_key, "1", ex=self.reset_timeout, nx=True))
+        except Exception:
+            if self._local["probing"]:
+                return False
+            self._local["probing"] = True
+            return True
+
+    async def before_call(self, state: Dict) -> bool:
+        """Raise CircuitOpenError while open; returns True when this call is the half-open probe."""
+        if not state["opened_at"]:
+            return False
+        elapsed = time.time() - state["opened_at"]
+        if elapsed < self.reset_timeout:
+            metrics.inc("circuit_breaker_rejections_total", breaker=self.name)
+            raise CircuitOpenError(self.name, self.reset_timeout - elapsed)
+        if await self._acquire_probe():
+            return True
+        metrics.inc("circuit_breaker_rejections_total", breaker=self.name)
+        raise CircuitOpenError(self.name, 1)
+
+    async def release_probe(self):
+        """Give the half-open probe back without a verdict, e.g. when the call was cut short by a deadline."""
+        self._local["probing"] = False
+        try:
+            await self.redis.delete(self.probe_key)
+        except Exception:
+            pass
+
+    async def record_success(self, state: Dict, probe: bool):
+        if not probe and not state["failures"]:
+            return
+        self._local = {"failures": 0, "opened_at": 0.0, "probing": False}
+        self._cached, self._cached_at = {"failures": 0, "opened_at": 0.0}, time.monotonic()
+        try:
+            await self.redis.delete(self.state_key, self.probe_key)
+        except Exception as e:
+            error(f"Failed to reset circuit {self.name}: {str(e)}")
+        if probe:
+            info(f"Circuit {self.name} closed after successful probe")
+        metrics.set_gauge("circuit_breaker_state", STATE_CODES["closed"], breaker=self.name)
+
+    async def record_failure(self, probe: bool):
+        now = time.time()
+        # The next call reloads, so its success resets the failure count this one leaves behind
+        self._cached = None
+        self._local["failures"] += 1
+        failures = self._local["failures"]
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.hincrby(self.state_key, "failures", 1)
+                pipe.expire(self.state_key, self.reset_timeout * 10)
+                failures = (await pipe.execute())[0]
+        except Exception as e:
+            error(f"Failed to record failure for circuit {self.name}: {str(e)}")
+        if probe or failures >= self.failure_threshold:
+            self._local.update(opened_at=now, probing=False)
+            try:
+                await self.redis.hset(self.state_key, "opened_at", now)
+                await self.redis.delete(self.probe_key)
+            except Exception:
+                pass
+            metrics.inc("circuit_breaker_opened_total", breaker=self.name)
+            metrics.set_gauge("circuit_breaker_state", STATE_CODES["open"], breaker=self.name)
+            error(f"Circuit {self.name} opened after {failures} consecutive failures")
+
+    async def request(self, method: str, url: str, deadline: Optional[float] = None, **kwargs) -> httpx.Response:
+        """Send a request through the shared HTTP client, guarded by this breaker.
+
+        With a deadline (a time.monotonic() value) the call is not started once it has passed and
+        is given at most the remaining time; running out of it raises DeadlineExceededError and
+        says nothing about the provider's health, so it is not counted as a failure.
+        """
+        with span("circuit.load_state", "redis", breaker=self.name):
+            state = await self.load_state()
+        bounded = False
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                metrics.inc("upstream_deadline_exceeded_total", breaker=self.name)
+                raise DeadlineExceededError(self.name)
+            if remaining < config.HTTP_TIMEOUT:
+                kwargs["timeout"] = remaining
+                bounded = True
+        probe = await self.before_call(state)
+        try:
+            with span(f"{method} {httpx.URL(url).host}", "upstream", breaker=self.name, url=url) as upstream_span:
+                response = await HttpClient.get_instance().client.request(method, url, **kwargs)
+                upstream_span.set(status=response.status_code)
+        except httpx.TimeoutException as e:
+            if not bounded:
+                await self.record_failure(probe)
+                raise UpstreamUnavailableError(self.name, type(e).__name__)
+            if probe:
+                await self.release_probe()
+            metrics.inc("upstream_deadline_exceeded_total", breaker=self.name)
+            raise DeadlineExceededError(self.name)
+        except httpx.HTTPError as e:
+            await self.record_failure(probe)
+            raise UpstreamUnavailableError(self.name, type(e).__name__)
+        if response.status_code == 429 or response.status_code >= 500:
+            await self.record_failure(probe)
+            raise UpstreamUnavailableError(self.name, f"HTTP {response.status_code}")
+        await self.record_success(state, probe)
+        return response
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+def get_breaker(provider: str, endpoint: str) -> CircuitBreaker:
+    """Return the shared breaker for a provider endpoint, creating it on first use."""
+    name = f"{provider}:{endpoint}"
+    if name not in _breakers:
+        _breakers[name] = CircuitBreaker(name)
+    return _breakers[name]
+
+async def refresh_breaker_metrics():
+    """Reload every known breaker's state from Redis so metrics reflect all workers."""
+    for breaker in _breakers.values():
+        await breaker.load_state(fresh=True)
\ No newline at end of file
@@ -0,0 +1,34 @@
+import base64
+import json
+from typing import Dict, Optional
+from fastapi import HTTPException
+
+# Request header carrying the caller's budget in seconds
+DEADLINE_HEADER = "X-Request-Timeout"
+
+class DeadlineExceededError(Exception):
+    """Raised instead of starting, or while waiting on, an upstream call the request no longer has time for.
+
+    Pagination loops fill in cursor with the provider's paging position to resume from, so the
+    service can return what it gathered so far.
+    """
+
+    def __init__(self, name: str, cursor: Optional[str] = None):
+        super().__init__(f"Request deadline exceeded before {name} responded")
+        self.name = name
+        self.cursor = cursor
+
+def encode_cursor(position: Dict) -> str:
+    """Opaque continuation cursor handed to clients with a partial response."""
+    return base64.urlsafe_b64encode(json.dumps(position, separators=(",", ":")).encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: Optional[str]) -> Dict:
+    if not cursor:
+        return {}
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(position, dict):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return position
\ No newline at end of file
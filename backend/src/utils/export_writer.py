@@ -0,0 +1,71 @@
+import csv
+import io
+import json
+import os
+import zlib
+from typing import Dict, List
+from .transform_pool import ITEM_FIELDS
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, separators=(",", ":"))
+    return value
+
+class ExportWriter:
+    """Appends items to an export file as a sequence of gzip members, one per chunk.
+
+    The members concatenate into a single valid gzip stream, and each one also decompresses on
+    its own, so a download can resume at any chunk boundary. Items are compressed as they are
+    written; only the compressor's window is held between calls. Opening at an offset drops
+    whatever a crashed run wrote after the last completed chunk, and fails if the file does not
+    hold that many bytes. CSV gets its header row once,
+    at the start of the file.
+    """
+
+    def __init__(self, path: str, fmt: str, level: int = 6, offset: int = 0):
+        self.fmt = fmt
+        self.level = level
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if offset:
+            # Truncating a missing or shorter file would pad it with zeros ahead of the new chunks
+            size = os.path.getsize(path) if os.path.isfile(path) else -1
+            if size < offset:
+                raise ValueError(f"Export file {path} has {max(size, 0)} of the {offset} bytes already written")
+        self.file = open(path, "r+b" if offset else "wb")
+        self.file.truncate(offset)
+        self.file.seek(offset)
+        self.header_pending = fmt == "csv" and offset == 0
+        self._compressor = None
+
+    def _encode(self, items: List[Dict]) -> bytes:
+        if self.fmt == "ndjson":
+            return "".join(json.dumps(item, separators=(",", ":")) + "\n" for item in items).encode("utf-8")
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if self.header_pending:
+            writer.writerow(ITEM_FIELDS)
+            self.header_pending = False
+        writer.writerows([_csv_value(item.get(field)) for field in ITEM_FIELDS] for item in items)
+        return buffer.getvalue().encode("utf-8")
+
+    def write(self, items: List[Dict]) -> None:
+        if self._compressor is None:
+            # wbits 31: gzip header and trailer around the deflate stream
+            self._compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)
+        self.file.write(self._compressor.compress(self._encode(items)))
+
+    def end_chunk(self) -> int:
+        """Finish the current gzip member, make it durable and return the file size after it."""
+        if self._compressor is not None:
+            self.file.write(self._compressor.flush())
+            self._compressor = None
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return self.file.tell()
+
+    def close(self) -> None:
+        self.file.close()
\ No newline at end of file
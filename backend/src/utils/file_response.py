@@ -0,0 +1,73 @@
+import re
+from typing import Mapping, Optional, Tuple
+import anyio
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+RANGE_PATTERN = re.compile(r"bytes=(\d*)-(\d*)")
+
+def parse_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """The inclusive (start, end) of a single-range Range header; None to send everything.
+
+    Raises ValueError when the range cannot be satisfied. Multiple ranges are answered with
+    the whole file, which RFC 9110 allows.
+    """
+    match = RANGE_PATTERN.fullmatch(range_header.strip()) if range_header else None
+    if match is None or not (match[1] or match[2]):
+        return None
+    if match[1]:
+        start = int(match[1])
+        end = min(int(match[2]), size - 1) if match[2] else size - 1
+    else:
+        start, end = max(size - int(match[2]), 0), size - 1
+    if start > end or start >= size:
+        raise ValueError(f"Range not satisfiable for {size} bytes")
+    return start, end
+
+class FileRangeResponse(Response):
+    """Serves the first size bytes of a file, or a byte range of them, straight from disk.
+
+    The file is streamed in fixed-size reads and never decoded. A Range header is honoured
+    unless an If-Range validator no longer matches the etag, in which case the whole content
+    is sent, as for a plain GET.
+    """
+
+    chunk_size = 256 * 1024
+
+    def __init__(self, path: str, size: int, etag: str, request_headers: Mapping[str, str],
+                 media_type: str = "application/octet-stream", filename: Optional[str] = None, headers: Optional[Mapping[str, str]] = None):
+        super().__init__(status_code=200, headers=headers, media_type=media_type)
+        self.path = path
+        self.start, self.length = 0, size
+        if_range = request_headers.get("if-range")
+        try:
+            byte_range = parse_range(request_headers.get("range"), size) if if_range in (None, etag) else None
+        except ValueError:
+            self.status_code, self.length = 416, 0
+            self.headers["content-range"] = f"bytes */{size}"
+            byte_range = None
+        if byte_range is not None:
+            self.start, end = byte_range
+            self.length = end - self.start + 1
+            self.status_code = 206
+            self.headers["content-range"] = f"bytes {self.start}-{end}/{size}"
+        self.headers["content-length"] = str(self.length)
+        self.headers["accept-ranges"] = "bytes"
+        self.headers["etag"] = etag
+        if filename:
+            self.headers["content-disposition"] = f'attachment; filename="{filename}"'
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"].upper() == "HEAD" or not self.length:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(self.start)
+            remaining = self.length
+            while remaining:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    raise RuntimeError(f"{self.path} is shorter than the {self.length} bytes being served")
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": bool(remaining)})
\ No newline at end of file
@@ -0,0 +1,31 @@
+import asyncio
+import httpx
+from typing import List
+from ..config.config import config
+
+class HttpClient:
+    _instance = None
+
+    def __init__(self):
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=config.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=config.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            ),
+            timeout=config.HTTP_TIMEOUT,
+        )
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            cls._instance = HttpClient()
+        return cls._instance
+
+    async def warm_up(self, urls: List[str]):
+        """Open keep-alive connections to the given hosts so the first real call skips the TLS handshake."""
+        await asyncio.gather(*(self.client.head(url, timeout=5) for url in urls), return_exceptions=True)
+
+    async def close(self):
+        """Close the shared connection pool (useful for cleanup)."""
+        await self.client.aclose()
+        HttpClient._instance = None
\ No newline at end of file
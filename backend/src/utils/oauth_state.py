@@ -0,0 +1,35 @@
+import base64
+import hashlib
+import json
+import secrets
+from functools import lru_cache
+from typing import Optional
+from cryptography.fernet import Fernet, InvalidToken
+from fastapi import HTTPException
+from ..config.config import config
+
+@lru_cache(maxsize=4)
+def _fernet(secret: str) -> Fernet:
+    if not secret:
+        raise RuntimeError("OAUTH_STATE_SECRET must be set when OAUTH_STATELESS_STATE is enabled")
+    return Fernet(base64.urlsafe_b64encode(hashlib.sha256(secret.encode("utf-8")).digest()))
+
+def issue_state(provider: str, user_id: str, org_id: str, code_verifier: Optional[str] = None) -> str:
+    """Build an encrypted, HMAC-signed OAuth state token carrying the user, org and PKCE verifier."""
+    payload = {"p": provider, "n": secrets.token_urlsafe(16), "u": user_id, "o": org_id}
+    if code_verifier:
+        payload["v"] = code_verifier
+    return _fernet(config.OAUTH_STATE_SECRET).encrypt(json.dumps(payload, separators=(",", ":")).encode("utf-8")).decode("utf-8")
+
+async def consume_state(redis_client, provider: str, token: str, nonce_key_prefix: str, ttl: int) -> dict:
+    """Verify and decrypt a state token, rejecting expired, foreign or already used tokens."""
+    try:
+        payload = json.loads(_fernet(config.OAUTH_STATE_SECRET).decrypt(token.encode("utf-8"), ttl=ttl))
+    except (InvalidToken, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid or expired state")
+    if payload.get("p") != provider:
+        raise HTTPException(status_code=400, detail="State does not match")
+    # Only the nonce is kept server-side, and only long enough to outlive the token itself
+    if not await redis_client.set_if_absent(f"{nonce_key_prefix}:{payload['n']}", "1", ttl):
+        raise HTTPException(status_code=400, detail="State already used")
+    return {"user_id": payload["u"], "org_id": payload["o"], "code_verifier": payload.get("v")}
\ No newline at end of file
@@ -0,0 +1,27 @@
+from typing import Optional
+
+class AdaptivePageSize:
+    """Page size for a paginated crawl, tuned from each page's latency and the provider's rate-limit headroom.
+
+    Starts at the largest page. A page slower than target_latency halves the size, so a struggling
+    provider still answers within the request deadline; pages faster than half the target double it
+    back. Once the remaining share of the rate-limit window drops below reserve the size returns to
+    the maximum, since every extra request then costs quota.
+    """
+
+    def __init__(self, minimum: int, maximum: int, target_latency: float, reserve: float):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self.reserve = reserve
+        self.size = maximum
+
+    def observe(self, latency: float, headroom: Optional[float] = None) -> int:
+        """Record one page's latency and remaining rate-limit share (None when unknown); return the next size."""
+        if headroom is not None and headroom < self.reserve:
+            self.size = self.maximum
+        elif latency > self.target_latency:
+            self.size = max(self.minimum, self.size // 2)
+        elif latency < self.target_latency / 2:
+            self.size = min(self.maximum, self.size * 2)
+        return self.size
\ No newline at end of file
@@ -0,0 +1,160 @@
+import asyncio
+import secrets
+import sys
+import threading
+import time
+import weakref
+from collections import Counter
+from typing import List, Optional
+from ..config.config import config
+
+PROFILE_HEADER = "X-VectorShift-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})"
+
+def _coroutine_frames(coro) -> List:
+    """Frames of a suspended coroutine chain, outermost first."""
+    frames = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None) or getattr(coro, "ag_frame", None)
+        if frame is None:
+            break
+        frames.append(frame)
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None) or getattr(coro, "ag_await", None)
+    return frames
+
+def _thread_frames(frame) -> List:
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    frames.reverse()
+    return frames
+
+class RequestProfile:
+    """Collapsed-stack samples for every task spawned on behalf of one request.
+
+    Samples of the task running on the loop are prefixed "running", samples of suspended
+    tasks "waiting", so CPU time separates from time spent waiting on upstreams or Redis.
+    """
+
+    def __init__(self, method: str, path: str):
+        self.id = secrets.token_hex(8)
+        self.method = method
+        self.path = path
+        self.started_at = time.time()
+        self.duration_ms = 0.0
+        self.root = None
+        self.tasks = weakref.WeakSet()
+        self.samples = Counter()
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration_ms, 2),
+            "samples": sum(self.samples.values()),
+        }
+
+    def folded(self) -> str:
+        """Samples in the folded format read by flamegraph.pl and speedscope."""
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common()) + "\n"
+
+class Profiler:
+    """Samples the event loop thread while at least one request profile is active.
+
+    Nothing is installed while no profile is active: the sampling thread exits and the
+    loop's task factory is restored, so unprofiled requests pay only the header check.
+    """
+
+    def __init__(self):
+        self._active: List[RequestProfile] = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._loop = None
+        self._loop_thread_id = None
+        self._previous_factory = None
+
+    def should_profile(self, headers) -> bool:
+        if config.PROFILE_TOKEN and headers.get(PROFILE_HEADER) == config.PROFILE_TOKEN:
+            return True
+        return config.PROFILE_SAMPLE_RATE > 0 and secrets.randbelow(1_000_000) < config.PROFILE_SAMPLE_RATE * 1_000_000
+
+    def start(self, method: str, path: str) -> RequestProfile:
+        profile = RequestProfile(method, path)
+        profile.root = asyncio.current_task()
+        profile.tasks.add(profile.root)
+        with self._lock:
+            if not self._active:
+                self._install()
+            self._active.append(profile)
+        return profile
+
+    def stop(self, profile: RequestProfile):
+        profile.duration_ms = (time.time() - profile.started_at) * 1000
+        with self._lock:
+            self._active.remove(profile)
+            if not self._active:
+                self._uninstall()
+
+    def _install(self):
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._previous_factory = self._loop.get_task_factory()
+        self._loop.set_task_factory(self._task_factory)
+        self._thread = threading.Thread(target=self._sample_loop, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def _uninstall(self):
+        self._loop.set_task_factory(self._previous_factory)
+        self._thread = None
+
+    def _task_factory(self, loop, coro, **kwargs):
+        if self._previous_factory is not None:
+            task = self._previous_factory(loop, coro, **kwargs)
+        else:
+            task = asyncio.Task(coro, loop=loop, **kwargs)
+        # Children inherit the profile of the task that created them (e.g. call_next, gather)
+        parent = asyncio.current_task(loop)
+        for profile in list(self._active):
+            if parent in profile.tasks:
+                profile.tasks.add(task)
+        return task
+
+    def _sample_loop(self):
+        interval = config.PROFILE_INTERVAL_MS / 1000
+        current_thread = threading.current_thread()
+        while self._thread is current_thread:
+            self._sample()
+            time.sleep(interval)
+
+    def _sample(self):
+        # With an explicit loop current_task only reads the loop's entry, so it is safe from this thread
+        running_task = asyncio.current_task(self._loop)
+        loop_frame = sys._current_frames().get(self._loop_thread_id)
+        with self._lock:
+            profiles = list(self._active)
+        for profile in profiles:
+            for task in list(profile.tasks):
+                # The middleware task only awaits call_next; its waits are the children's
+                if task.done() or (task is profile.root and task is not running_task):
+                    continue
+                coroutine_frames = _coroutine_frames(task.get_coro())
+                if task is running_task and loop_frame is not None and coroutine_frames:
+                    frames = _thread_frames(loop_frame)
+                    # Drop the event loop machinery below the task's own coroutine
+                    root = coroutine_frames[0]
+                    frames = frames[frames.index(root):] if root in frames else frames
+                    state = "running"
+                else:
+                    frames = coroutine_frames
+                    state = "waiting"
+                if frames:
+                    profile.samples[";".join([state] + [_frame_label(frame) for frame in frames])] += 1
+
+profiler = Profiler()
\ No newline at end of file
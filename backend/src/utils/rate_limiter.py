@@ -0,0 +1,67 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from ..db.connection import RedisClient
+from ..oplog.oplog import error
+
+MAX_LIMITERS = 1024
+WINDOW = 0.25
+
+class RateLimiter:
+    """Limits calls to a rate per second shared by every worker, through Redis.
+
+    Time is cut into windows of about WINDOW seconds holding evenly spaced slots. A caller takes
+    a ticket with INCR on the window's counter and sleeps until its slot, or goes straight away
+    if the slot has passed; a full window sends it on to the next one, so no Lua is needed.
+    Short windows keep the burst from passed slots to about a quarter of a second's calls.
+    While Redis is unreachable calls are spaced per worker in memory.
+    """
+
+    def __init__(self, name: str, rate: float):
+        self.key = f"ratelimit:{name}"
+        self.interval = 1 / rate
+        self.capacity = max(1, math.ceil(rate * WINDOW))
+        self.window = self.capacity * self.interval
+        self._next = 0.0
+
+    async def _reserve(self) -> float:
+        """The wall-clock time of a free slot, reserved in Redis."""
+        client = RedisClient.get_instance().client
+        now = time.time()
+        window = int(now / self.window)
+        while True:
+            async with client.pipeline(transaction=True) as pipe:
+                pipe.incr(f"{self.key}:{window}")
+                pipe.expire(f"{self.key}:{window}", max(2, math.ceil(self.window * 2)))
+                ticket, _ = await pipe.execute()
+            if ticket <= self.capacity:
+                return window * self.window + (ticket - 1) * self.interval
+            window += 1
+
+    async def acquire(self):
+        try:
+            delay = await self._reserve() - time.time()
+        except Exception as e:
+            error(f"Rate limiter {self.key} falling back to local state: {str(e)}")
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+            delay = slot - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+_limiters: "OrderedDict[str, RateLimiter]" = OrderedDict()
+
+def get_rate_limiter(name: str, rate: float) -> RateLimiter:
+    """Return the limiter for a name, e.g. one per provider account, creating it on first use.
+
+    Only the MAX_LIMITERS most recently used are kept; the budget itself lives in Redis.
+    """
+    limiter = _limiters.get(name)
+    if limiter is None:
+        limiter = _limiters[name] = RateLimiter(name, rate)
+        if len(_limiters) > MAX_LIMITERS:
+            _limiters.popitem(last=False)
+    _limiters.move_to_end(name)
+    return limiter
\ No newline at end of file
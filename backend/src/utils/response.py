@@ -7,6 +7,10 @@ class MSResponse(BaseModel):
     data: Any
     errors: List[str]
 
+class MSPartialResponse(MSResponse):
+    partial: bool
+    cursor: Optional[str]
+
 def return_success(response: Response, data: Any, status_code: int = 200) -> dict:
     success_response = MSResponse(
         success=True,
@@ -16,6 +20,18 @@ def return_success(response: Response, data: Any, status_code: int = 200) -> dic
     response.status_code = status_code
     return success_response.model_dump()
 
+def return_partial(response: Response, data: Any, cursor: Optional[str], status_code: int = 200) -> dict:
+    """Success response for a request whose deadline passed; cursor continues where data ends."""
+    partial_response = MSPartialResponse(
+        success=True,
+        data=data,
+        errors=[],
+        partial=True,
+        cursor=cursor
+    )
+    response.status_code = status_code
+    return partial_response.model_dump()
+
 def return_error(response: Response, errors: List[str], status_code: int = 400) -> dict:
     error_response = MSResponse(
         success=False,
@@ -0,0 +1,65 @@
+import hashlib
+import json
+import zlib
+from typing import Any, Dict, List, Tuple
+
+# Written into every manifest; readers treat any other stored value as a legacy JSON list
+SNAPSHOT_FORMAT = "columnar-v1"
+
+def _encode_column(values: List[Any]) -> Dict:
+    """Constant columns collapse to one value, low-cardinality ones (type, parent_id, ...) to a dictionary plus codes."""
+    codes: Dict[Tuple[type, Any], int] = {}
+    try:
+        # Keyed by type too, so True and 1 stay distinct
+        indexes = [codes.setdefault((value.__class__, value), len(codes)) for value in values]
+    except TypeError:
+        return {"v": values}
+    if len(codes) == 1:
+        return {"c": values[0]}
+    if len(codes) <= len(values) // 2:
+        return {"d": [value for _, value in codes], "i": indexes}
+    return {"v": values}
+
+def _decode_column(column: Dict, count: int) -> List[Any]:
+    if "c" in column:
+        return [column["c"]] * count
+    if "d" in column:
+        dictionary = column["d"]
+        return [dictionary[index] for index in column["i"]]
+    return column["v"]
+
+def _encode_field(items: List[Dict], field: str) -> Dict:
+    column = _encode_column([item.get(field) for item in items])
+    # Items without the field, so they decode without it rather than with None
+    absent = [index for index, item in enumerate(items) if field not in item]
+    if absent:
+        column["a"] = absent
+    return column
+
+def encode_chunk(items: List[Dict], level: int = 6) -> bytes:
+    """Encode JSON-ready items as zlib-compressed columns."""
+    fields = list(dict.fromkeys(field for item in items for field in item))
+    document = {
+        "n": len(items),
+        "f": fields,
+        "c": [_encode_field(items, field) for field in fields],
+    }
+    return zlib.compress(json.dumps(document, separators=(",", ":")).encode("utf-8"), level)
+
+def decode_chunk(blob: bytes) -> List[Dict]:
+    document = json.loads(zlib.decompress(blob))
+    count = document["n"]
+    columns = [_decode_column(column, count) for column in document["c"]]
+    items = [dict(zip(document["f"], row)) for row in zip(*columns)]
+    for field, column in zip(document["f"], document["c"]):
+        for index in column.get("a", ()):
+            del items[index][field]
+    return items
+
+def chunk_id(blob: bytes) -> str:
+    """Content address of an encoded chunk, so unchanged chunks keep their key across rewrites."""
+    return hashlib.blake2b(blob, digest_size=12).hexdigest()
+
+def item_fingerprint(item: Dict) -> str:
+    """Short digest of an item's content, compared across syncs instead of the items themselves."""
+    return hashlib.blake2b(json.dumps(item, sort_keys=True, separators=(",", ":")).encode("utf-8"), digest_size=8).hexdigest()
\ No newline at end of file
@@ -0,0 +1,162 @@
+import asyncio
+import functools
+import secrets
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional
+from ..config.config import config
+
+TRACE_HEADER = "X-VectorShift-Trace"
+TRACE_ID_HEADER = "X-Trace-Id"
+
+class Span:
+    """One timed segment of a trace; lane is the asyncio task it ran on."""
+
+    __slots__ = ("trace", "name", "category", "args", "lane", "start", "end")
+
+    def __init__(self, trace: "Trace", name: str, category: str, args: Dict):
+        self.trace = trace
+        self.name = name
+        self.category = category
+        self.args = args
+        self.lane = 0
+        self.start = 0.0
+        self.end = 0.0
+
+    def set(self, **args):
+        self.args.update(args)
+
+    def __enter__(self):
+        self.lane = self.trace.lane(self.name)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end = time.perf_counter()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.trace.add(self)
+        return False
+
+class _NullSpan:
+    """Stand-in returned while no trace is active, so instrumented code needs no checks."""
+
+    def set(self, **args):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class Trace:
+    """Spans recorded for one request, exportable as Chrome trace-event JSON.
+
+    Each asyncio task gets its own lane so concurrent segments (gathered fetches,
+    pool chunks) show side by side instead of being forced into one nested stack.
+    """
+
+    def __init__(self, method: str, path: str):
+        self.id = secrets.token_hex(8)
+        self.method = method
+        self.path = path
+        self.started_at = time.time()
+        self.origin = time.perf_counter()
+        self.duration_ms = 0.0
+        self.spans: List[Span] = []
+        self.dropped = 0
+        self.token = None
+        self._lanes: Dict[int, int] = {}
+        self._lane_names: Dict[int, str] = {}
+
+    def lane(self, span_name: str) -> int:
+        """Lane of the current task, named after the first span it records."""
+        key = id(asyncio.current_task())
+        if key not in self._lanes:
+            self._lanes[key] = len(self._lanes) + 1
+            self._lane_names[self._lanes[key]] = span_name
+        return self._lanes[key]
+
+    def add(self, span: Span):
+        if len(self.spans) < config.TRACE_MAX_SPANS:
+            self.spans.append(span)
+        else:
+            self.dropped += 1
+
+    def finish(self):
+        self.duration_ms = (time.perf_counter() - self.origin) * 1000
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration_ms, 2),
+            "spans": len(self.spans),
+            "dropped": self.dropped,
+        }
+
+    def chrome_events(self) -> dict:
+        """The trace in Chrome trace-event format, loadable in chrome://tracing or Perfetto."""
+        events = [
+            {"name": "thread_name", "ph": "M", "pid": 1, "tid": lane, "args": {"name": name}}
+            for lane, name in self._lane_names.items()
+        ]
+        for span in self.spans:
+            events.append({
+                "name": span.name,
+                "cat": span.category,
+                "ph": "X",
+                "ts": round((span.start - self.origin) * 1_000_000, 1),
+                "dur": round((span.end - span.start) * 1_000_000, 1),
+                "pid": 1,
+                "tid": span.lane,
+                "args": span.args,
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": self.to_dict()}
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("vectorshift_trace", default=None)
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+def start_trace(method: str, path: str) -> Trace:
+    """Make a new trace current; tasks created afterwards inherit it through their context."""
+    trace = Trace(method, path)
+    trace.token = _current_trace.set(trace)
+    return trace
+
+def end_trace(trace: Trace):
+    trace.finish()
+    _current_trace.reset(trace.token)
+
+def should_trace(headers) -> bool:
+    if config.PROFILE_TOKEN and headers.get(TRACE_HEADER) == config.PROFILE_TOKEN:
+        return True
+    return config.TRACE_SAMPLE_RATE > 0 and secrets.randbelow(1_000_000) < config.TRACE_SAMPLE_RATE * 1_000_000
+
+def span(name: str, category: str = "app", **args):
+    """Time a block within the current trace; a no-op when the request is not traced."""
+    trace = _current_trace.get()
+    if trace is None:
+        return _NULL_SPAN
+    return Span(trace, name, category, args)
+
+def traced(category: str) -> Callable:
+    """Record every call of an async function as a span named after it."""
+    def decorator(func: Callable) -> Callable:
+        name = f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            trace = _current_trace.get()
+            if trace is None:
+                return await func(*args, **kwargs)
+            with Span(trace, name, category, {}):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
\ No newline at end of file
@@ -0,0 +1,110 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional
+from ..config.config import config
+from ..models.integration_item import IntegrationItem
+from ..oplog.metrics import metrics
+from .tracing import span
+
+ITEM_FIELDS = tuple(IntegrationItem.model_fields)
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_slots: Optional[asyncio.Semaphore] = None
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool, _pool_slots
+    if _pool is None:
+        # spawn, not fork: forking a process that runs an event loop and open sockets is unsafe
+        _pool = ProcessPoolExecutor(max_workers=config.TRANSFORM_POOL_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        _pool_slots = asyncio.Semaphore(config.TRANSFORM_POOL_WORKERS * 2)
+    return _pool
+
+def shutdown_pool():
+    global _pool, _pool_slots
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool, _pool_slots = None, None
+
+def _to_json_item(transform: Callable, record: Dict, args: tuple) -> Dict:
+    return transform(record, *args).model_dump(mode="json")
+
+def _transform_chunk(transform: Callable, records: List[Dict], args: tuple) -> List[tuple]:
+    """Runs in a pool process; items go back as tuples of JSON-ready values, which pickle far smaller than dicts or models."""
+    return [tuple(_to_json_item(transform, record, args).values()) for record in records]
+
+def _from_rows(rows: List[tuple]) -> List[Dict]:
+    # Rebuilding models here would cost more loop time than the transform saved, so items stay dicts
+    return [dict(zip(ITEM_FIELDS, row)) for row in rows]
+
+async def _offload(transform: Callable, records: List[Dict], args: tuple) -> List[Dict]:
+    pool = _get_pool()
+    slots = _pool_slots
+    loop = asyncio.get_running_loop()
+
+    async def run_chunk(chunk: List[Dict]) -> List[tuple]:
+        async with slots:
+            with span("transform.chunk", "transform", records=len(chunk)):
+                return await loop.run_in_executor(pool, _transform_chunk, transform, chunk, args)
+
+    chunk_size = config.TRANSFORM_CHUNK_SIZE
+    chunks = await asyncio.gather(*(run_chunk(records[i:i + chunk_size]) for i in range(0, len(records), chunk_size)))
+    metrics.inc("transform_offloaded_records_total", len(records))
+    with span("transform.decode", "transform", records=len(records)):
+        return [item for rows in chunks for item in _from_rows(rows)]
+
+class TransformStage:
+    """Transforms provider pages into JSON-ready IntegrationItem dicts as they are fetched, preserving page order.
+
+    Provider pages hold at most 100 records, so pages are gathered into batches of
+    TRANSFORM_OFFLOAD_THRESHOLD records, each sent to a shared process pool so the event loop
+    stays free for other requests; a smaller tail is transformed inline by results(). submit()
+    waits while TRANSFORM_MAX_PENDING_PAGES batches are still being transformed, which holds
+    the fetch loop back instead of buffering pages. With TRANSFORM_POOL_WORKERS at 0 (the
+    default) every page is transformed inline as it is submitted: pool processes only help
+    when there are cores to spare beyond the uvicorn workers.
+    """
+
+    def __init__(self, transform: Callable, *args, max_pending: int = None):
+        self.transform = transform
+        self.args = args
+        self._slots = asyncio.Semaphore(max_pending or config.TRANSFORM_MAX_PENDING_PAGES)
+        self._tasks: List[asyncio.Future] = []
+        self._batch: List[Dict] = []
+
+    async def submit(self, records: List[Dict]):
+        self._batch.extend(records)
+        if config.TRANSFORM_POOL_WORKERS <= 0:
+            self._flush_inline()
+            return
+        if len(self._batch) < config.TRANSFORM_OFFLOAD_THRESHOLD:
+            return
+        batch, self._batch = self._batch, []
+        with span("transform.backpressure", "transform"):
+            await self._slots.acquire()
+        self._tasks.append(asyncio.create_task(self._run(batch)))
+
+    def _flush_inline(self):
+        if not self._batch:
+            return
+        batch, self._batch = self._batch, []
+        future = asyncio.get_running_loop().create_future()
+        with span("transform.inline", "transform", records=len(batch)):
+            future.set_result([_to_json_item(self.transform, record, self.args) for record in batch])
+        self._tasks.append(future)
+
+    async def _run(self, records: List[Dict]) -> List[Dict]:
+        try:
+            return await _offload(self.transform, records, self.args)
+        finally:
+            self._slots.release()
+
+    async def results(self) -> List[Dict]:
+        self._flush_inline()
+        pages = await asyncio.gather(*self._tasks)
+        return [item for page in pages for item in page]
+
+    def cancel(self):
+        self._batch = []
+        for task in self._tasks:
+            task.cancel()
\ No newline at end of file
@@ -0,0 +1,48 @@
+import base64
+import hashlib
+import hmac
+import time
+from typing import Optional
+from ..config.config import config
+from ..oplog.oplog import error
+
+def decode_mac_secret(mac_secret_base64: str) -> Optional[bytes]:
+    """Decode Airtable's macSecretBase64 into the HMAC key, or None (logged) when it is unset or not valid base64."""
+    if not mac_secret_base64:
+        return None
+    try:
+        return base64.b64decode(mac_secret_base64, validate=True)
+    except ValueError:
+        error("AIRTABLE_WEBHOOK_MAC_SECRET is not valid base64; Airtable webhooks will be rejected")
+        return None
+
+def _matches(expected: str, signature: str) -> bool:
+    # Headers are decoded as latin-1, so a junk header can hold characters compare_digest rejects on str
+    return hmac.compare_digest(expected.encode("utf-8"), signature.encode("latin-1"))
+
+def verify_hubspot_signature(secret: str, method: str, uri: str, body: bytes, signature: Optional[str], timestamp: Optional[str]) -> bool:
+    """Verify a HubSpot v3 signature: base64 HMAC-SHA256 over method + uri + body + timestamp."""
+    if not signature or not timestamp:
+        return False
+    try:
+        if abs(time.time() * 1000 - int(timestamp)) > config.WEBHOOK_MAX_AGE * 1000:
+            return False
+    except ValueError:
+        return False
+    message = f"{method}{uri}".encode("utf-8") + body + timestamp.encode("utf-8")
+    expected = base64.b64encode(hmac.new(secret.encode("utf-8"), message, hashlib.sha256).digest()).decode("utf-8")
+    return _matches(expected, signature)
+
+def verify_notion_signature(verification_token: str, body: bytes, signature: Optional[str]) -> bool:
+    """Verify a Notion signature: 'sha256=' + hex HMAC-SHA256 of the body keyed with the verification token."""
+    if not signature or not verification_token:
+        return False
+    expected = "sha256=" + hmac.new(verification_token.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    return _matches(expected, signature)
+
+def verify_airtable_signature(mac_key: Optional[bytes], body: bytes, signature: Optional[str]) -> bool:
+    """Verify an Airtable signature: 'hmac-sha256=' + hex HMAC-SHA256 of the body keyed with the decoded MAC secret."""
+    if not signature or not mac_key:
+        return False
+    expected = "hmac-sha256=" + hmac.new(mac_key, body, hashlib.sha256).hexdigest()
+    return _matches(expected, signature)
\ No newline at end of file
@@ -0,0 +1,32 @@
+from src.utils.snapshot_codec import chunk_id, decode_chunk, encode_chunk, item_fingerprint
+
+def test_round_trip_keeps_values_and_types():
+    items = [
+        {"id": str(i), "type": "Contact", "name": f"Name {i}", "visibility": i % 2 == 0, "parent_id": None, "count": i % 3}
+        for i in range(50)
+    ]
+    assert decode_chunk(encode_chunk(items)) == items
+
+def test_round_trip_keeps_true_and_one_apart():
+    items = [{"id": "1", "value": True}, {"id": "2", "value": 1}, {"id": "3", "value": True}, {"id": "4", "value": 1}]
+    decoded = decode_chunk(encode_chunk(items))
+    assert [type(item["value"]) for item in decoded] == [bool, int, bool, int]
+
+def test_round_trip_drops_fields_items_did_not_have():
+    items = [{"id": "1", "name": "a"}, {"id": "2", "name": "b", "extra": None}, {"id": "3", "extra": "x"}]
+    assert decode_chunk(encode_chunk(items)) == items
+
+def test_round_trip_of_unhashable_values():
+    items = [{"id": str(i), "tags": ["a", str(i)], "meta": {"n": i}} for i in range(4)]
+    assert decode_chunk(encode_chunk(items)) == items
+
+def test_empty_chunk():
+    assert decode_chunk(encode_chunk([])) == []
+
+def test_chunk_id_follows_content():
+    assert chunk_id(encode_chunk([{"id": "1"}])) == chunk_id(encode_chunk([{"id": "1"}]))
+    assert chunk_id(encode_chunk([{"id": "1"}])) != chunk_id(encode_chunk([{"id": "2"}]))
+
+def test_fingerprint_ignores_key_order():
+    assert item_fingerprint({"id": "1", "name": "a"}) == item_fingerprint({"name": "a", "id": "1"})
+    assert item_fingerprint({"id": "1", "name": "a"}) != item_fingerprint({"id": "1", "name": "b"})